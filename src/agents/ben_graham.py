@@ -1,13 +1,11 @@
-from langchain_openai import ChatOpenAI
-from graph.state import AgentState, show_agent_reasoning
+from graph.state import AgentState, create_agent_message, show_agent_reasoning
 from tools.api import get_financial_metrics, get_market_cap, search_line_items
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.messages import HumanMessage
 from pydantic import BaseModel
-import json
 from typing_extensions import Literal
 from utils.progress import progress
-from utils.llm import call_llm
+from utils.llm import call_llm, generate_persona_signals
+from utils.prompt import encode_analysis_data
 import math
 
 
@@ -66,20 +64,22 @@ def ben_graham_agent(state: AgentState):
 
         analysis_data[ticker] = {"signal": signal, "score": total_score, "max_score": max_possible_score, "earnings_analysis": earnings_analysis, "strength_analysis": strength_analysis, "valuation_analysis": valuation_analysis}
 
-        progress.update_status("ben_graham_agent", ticker, "Generating Ben Graham analysis")
-        graham_output = generate_graham_output(
-            ticker=ticker,
-            analysis_data=analysis_data,
-            model_name=state["metadata"]["model_name"],
-            model_provider=state["metadata"]["model_provider"],
-        )
+    graham_outputs = generate_persona_signals(
+        agent_name="ben_graham_agent",
+        tickers=tickers,
+        analysis_data=analysis_data,
+        generate_output=generate_graham_output,
+        prompt_template=get_graham_prompt_template(),
+        pydantic_model=BenGrahamSignal,
+        metadata=state["metadata"],
+        status="Generating Ben Graham analysis",
+    )
 
+    for ticker, graham_output in graham_outputs.items():
         graham_analysis[ticker] = {"signal": graham_output.signal, "confidence": graham_output.confidence, "reasoning": graham_output.reasoning}
 
-        progress.update_status("ben_graham_agent", ticker, "Done")
-
     # Wrap results in a single message for the chain
-    message = HumanMessage(content=json.dumps(graham_analysis), name="ben_graham_agent")
+    message = create_agent_message(graham_analysis, "ben_graham_agent", state["metadata"])
 
     # Optionally display reasoning
     if state["metadata"]["show_reasoning"]:
@@ -276,19 +276,9 @@ def analyze_valuation_graham(metrics: list, financial_line_items: list, market_c
     return {"score": score, "details": "; ".join(details)}
 
 
-def generate_graham_output(
-    ticker: str,
-    analysis_data: dict[str, any],
-    model_name: str,
-    model_provider: str,
-) -> BenGrahamSignal:
-    """
-    Generates an investment decision in the style of Benjamin Graham:
-    - Value emphasis, margin of safety, net-nets, conservative balance sheet, stable earnings.
-    - Return the result in a JSON structure: { signal, confidence, reasoning }.
-    """
-
-    template = ChatPromptTemplate.from_messages([
+def get_graham_prompt_template() -> ChatPromptTemplate:
+    """Single-ticker prompt for Benjamin Graham. Its system message is reused for batched prompts."""
+    return ChatPromptTemplate.from_messages([
         (
             "system",
             """You are a Benjamin Graham AI agent, making investment decisions using his principles:
@@ -329,8 +319,23 @@ def generate_graham_output(
         )
     ])
 
+
+def generate_graham_output(
+    ticker: str,
+    analysis_data: dict[str, any],
+    model_name: str,
+    model_provider: str,
+) -> BenGrahamSignal:
+    """
+    Generates an investment decision in the style of Benjamin Graham:
+    - Value emphasis, margin of safety, net-nets, conservative balance sheet, stable earnings.
+    - Return the result in a JSON structure: { signal, confidence, reasoning }.
+    """
+
+    template = get_graham_prompt_template()
+
     prompt = template.invoke({
-        "analysis_data": json.dumps(analysis_data, indent=2),
+        "analysis_data": encode_analysis_data(analysis_data),
         "ticker": ticker
     })
 
@@ -344,4 +349,5 @@ def generate_graham_output(
         pydantic_model=BenGrahamSignal,
         agent_name="ben_graham_agent",
         default_factory=create_default_ben_graham_signal,
+        ticker=ticker,
     )
@@ -1,13 +1,11 @@
-from langchain_openai import ChatOpenAI
-from graph.state import AgentState, show_agent_reasoning
+from graph.state import AgentState, create_agent_message, show_agent_reasoning
 from tools.api import get_financial_metrics, get_market_cap, search_line_items
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.messages import HumanMessage
 from pydantic import BaseModel
-import json
 from typing_extensions import Literal
 from utils.progress import progress
-from utils.llm import call_llm
+from utils.llm import call_llm, generate_persona_signals
+from utils.prompt import encode_analysis_data
 
 class BillAckmanSignal(BaseModel):
     signal: Literal["bullish", "bearish", "neutral"]
@@ -82,28 +80,27 @@ def bill_ackman_agent(state: AgentState):
             "balance_sheet_analysis": balance_sheet_analysis,
             "valuation_analysis": valuation_analysis
         }
-        
-        progress.update_status("bill_ackman_agent", ticker, "Generating Bill Ackman analysis")
-        ackman_output = generate_ackman_output(
-            ticker=ticker, 
-            analysis_data=analysis_data,
-            model_name=state["metadata"]["model_name"],
-            model_provider=state["metadata"]["model_provider"],
-        )
-        
+
+    ackman_outputs = generate_persona_signals(
+        agent_name="bill_ackman_agent",
+        tickers=tickers,
+        analysis_data=analysis_data,
+        generate_output=generate_ackman_output,
+        prompt_template=get_ackman_prompt_template(),
+        pydantic_model=BillAckmanSignal,
+        metadata=state["metadata"],
+        status="Generating Bill Ackman analysis",
+    )
+
+    for ticker, ackman_output in ackman_outputs.items():
         ackman_analysis[ticker] = {
             "signal": ackman_output.signal,
             "confidence": ackman_output.confidence,
             "reasoning": ackman_output.reasoning
         }
-        
-        progress.update_status("bill_ackman_agent", ticker, "Done")
     
     # Wrap results in a single message for the chain
-    message = HumanMessage(
-        content=json.dumps(ackman_analysis),
-        name="bill_ackman_agent"
-    )
+    message = create_agent_message(ackman_analysis, "bill_ackman_agent", state["metadata"])
     
     # Show reasoning if requested
     if state["metadata"]["show_reasoning"]:
@@ -335,16 +332,9 @@ def analyze_valuation(financial_line_items: list, market_cap: float) -> dict:
     }
 
 
-def generate_ackman_output(
-    ticker: str,
-    analysis_data: dict[str, any],
-    model_name: str,
-    model_provider: str,
-) -> BillAckmanSignal:
-    """
-    Generates investment decisions in the style of Bill Ackman.
-    """
-    template = ChatPromptTemplate.from_messages([
+def get_ackman_prompt_template() -> ChatPromptTemplate:
+    """Single-ticker prompt for Bill Ackman. Its system message is reused for batched prompts."""
+    return ChatPromptTemplate.from_messages([
         (
             "system",
             """You are a Bill Ackman AI agent, making investment decisions using his principles:
@@ -394,8 +384,20 @@ def generate_ackman_output(
         )
     ])
 
+
+def generate_ackman_output(
+    ticker: str,
+    analysis_data: dict[str, any],
+    model_name: str,
+    model_provider: str,
+) -> BillAckmanSignal:
+    """
+    Generates investment decisions in the style of Bill Ackman.
+    """
+    template = get_ackman_prompt_template()
+
     prompt = template.invoke({
-        "analysis_data": json.dumps(analysis_data, indent=2),
+        "analysis_data": encode_analysis_data(analysis_data),
         "ticker": ticker
     })
 
@@ -413,4 +415,5 @@ def generate_ackman_output(
         pydantic_model=BillAckmanSignal, 
         agent_name="bill_ackman_agent", 
         default_factory=create_default_bill_ackman_signal,
+        ticker=ticker,
     )
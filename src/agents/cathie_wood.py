@@ -1,13 +1,11 @@
-from langchain_openai import ChatOpenAI
-from graph.state import AgentState, show_agent_reasoning
+from graph.state import AgentState, create_agent_message, show_agent_reasoning
 from tools.api import get_financial_metrics, get_market_cap, search_line_items
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.messages import HumanMessage
 from pydantic import BaseModel
-import json
 from typing_extensions import Literal
 from utils.progress import progress
-from utils.llm import call_llm
+from utils.llm import call_llm, generate_persona_signals
+from utils.prompt import encode_analysis_data
 
 class CathieWoodSignal(BaseModel):
     signal: Literal["bullish", "bearish", "neutral"]
@@ -90,26 +88,25 @@ def cathie_wood_agent(state: AgentState):
             "valuation_analysis": valuation_analysis
         }
 
-        progress.update_status("cathie_wood_agent", ticker, "Generating Cathie Wood analysis")
-        cw_output = generate_cathie_wood_output(
-            ticker=ticker,
-            analysis_data=analysis_data,
-            model_name=state["metadata"]["model_name"],
-            model_provider=state["metadata"]["model_provider"],
-        )
+    cathie_wood_outputs = generate_persona_signals(
+        agent_name="cathie_wood_agent",
+        tickers=tickers,
+        analysis_data=analysis_data,
+        generate_output=generate_cathie_wood_output,
+        prompt_template=get_cathie_wood_prompt_template(),
+        pydantic_model=CathieWoodSignal,
+        metadata=state["metadata"],
+        status="Generating Cathie Wood analysis",
+    )
 
+    for ticker, cw_output in cathie_wood_outputs.items():
         cw_analysis[ticker] = {
             "signal": cw_output.signal,
             "confidence": cw_output.confidence,
             "reasoning": cw_output.reasoning
         }
 
-        progress.update_status("cathie_wood_agent", ticker, "Done")
-
-    message = HumanMessage(
-        content=json.dumps(cw_analysis),
-        name="cathie_wood_agent"
-    )
+    message = create_agent_message(cw_analysis, "cathie_wood_agent", state["metadata"])
 
     if state["metadata"].get("show_reasoning"):
         show_agent_reasoning(cw_analysis, "Cathie Wood Agent")
@@ -419,16 +416,9 @@ def analyze_cathie_wood_valuation(financial_line_items: list, market_cap: float)
     }
 
 
-def generate_cathie_wood_output(
-    ticker: str,
-    analysis_data: dict[str, any],
-    model_name: str,
-    model_provider: str,
-) -> CathieWoodSignal:
-    """
-    Generates investment decisions in the style of Cathie Wood.
-    """
-    template = ChatPromptTemplate.from_messages([
+def get_cathie_wood_prompt_template() -> ChatPromptTemplate:
+    """Single-ticker prompt for Cathie Wood. Its system message is reused for batched prompts."""
+    return ChatPromptTemplate.from_messages([
         (
             "system",
             """You are a Cathie Wood AI agent, making investment decisions using her principles:
@@ -476,8 +466,20 @@ def generate_cathie_wood_output(
         )
     ])
 
+
+def generate_cathie_wood_output(
+    ticker: str,
+    analysis_data: dict[str, any],
+    model_name: str,
+    model_provider: str,
+) -> CathieWoodSignal:
+    """
+    Generates investment decisions in the style of Cathie Wood.
+    """
+    template = get_cathie_wood_prompt_template()
+
     prompt = template.invoke({
-        "analysis_data": json.dumps(analysis_data, indent=2),
+        "analysis_data": encode_analysis_data(analysis_data),
         "ticker": ticker
     })
 
@@ -495,6 +497,7 @@ def generate_cathie_wood_output(
         pydantic_model=CathieWoodSignal,
         agent_name="cathie_wood_agent",
         default_factory=create_default_cathie_wood_signal,
+        ticker=ticker,
     )
 
 # source: https://ark-invest.com
\ No newline at end of file
@@ -1,12 +1,11 @@
-from graph.state import AgentState, show_agent_reasoning
+from graph.state import AgentState, create_agent_message, show_agent_reasoning
 from tools.api import get_financial_metrics, get_market_cap, search_line_items, get_insider_trades, get_company_news
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.messages import HumanMessage
 from pydantic import BaseModel
-import json
 from typing_extensions import Literal
 from utils.progress import progress
-from utils.llm import call_llm
+from utils.llm import call_llm, generate_persona_signals
+from utils.prompt import encode_analysis_data
 
 class CharlieMungerSignal(BaseModel):
     signal: Literal["bullish", "bearish", "neutral"]
@@ -119,28 +118,27 @@ def charlie_munger_agent(state: AgentState):
             # Include some qualitative assessment from news
             "news_sentiment": analyze_news_sentiment(company_news) if company_news else "No news data available"
         }
-        
-        progress.update_status("charlie_munger_agent", ticker, "Generating Charlie Munger analysis")
-        munger_output = generate_munger_output(
-            ticker=ticker, 
-            analysis_data=analysis_data,
-            model_name=state["metadata"]["model_name"],
-            model_provider=state["metadata"]["model_provider"],
-        )
-        
+
+    munger_outputs = generate_persona_signals(
+        agent_name="charlie_munger_agent",
+        tickers=tickers,
+        analysis_data=analysis_data,
+        generate_output=generate_munger_output,
+        prompt_template=get_munger_prompt_template(),
+        pydantic_model=CharlieMungerSignal,
+        metadata=state["metadata"],
+        status="Generating Charlie Munger analysis",
+    )
+
+    for ticker, munger_output in munger_outputs.items():
         munger_analysis[ticker] = {
             "signal": munger_output.signal,
             "confidence": munger_output.confidence,
             "reasoning": munger_output.reasoning
         }
-        
-        progress.update_status("charlie_munger_agent", ticker, "Done")
     
     # Wrap results in a single message for the chain
-    message = HumanMessage(
-        content=json.dumps(munger_analysis),
-        name="charlie_munger_agent"
-    )
+    message = create_agent_message(munger_analysis, "charlie_munger_agent", state["metadata"])
     
     # Show reasoning if requested
     if state["metadata"]["show_reasoning"]:
@@ -659,16 +657,9 @@ def analyze_news_sentiment(news_items: list) -> str:
     return f"Qualitative review of {len(news_items)} recent news items would be needed"
 
 
-def generate_munger_output(
-    ticker: str,
-    analysis_data: dict[str, any],
-    model_name: str,
-    model_provider: str,
-) -> CharlieMungerSignal:
-    """
-    Generates investment decisions in the style of Charlie Munger.
-    """
-    template = ChatPromptTemplate.from_messages([
+def get_munger_prompt_template() -> ChatPromptTemplate:
+    """Single-ticker prompt for Charlie Munger. Its system message is reused for batched prompts."""
+    return ChatPromptTemplate.from_messages([
         (
             "system",
             """You are a Charlie Munger AI agent, making investment decisions using his principles:
@@ -722,8 +713,20 @@ def generate_munger_output(
         )
     ])
 
+
+def generate_munger_output(
+    ticker: str,
+    analysis_data: dict[str, any],
+    model_name: str,
+    model_provider: str,
+) -> CharlieMungerSignal:
+    """
+    Generates investment decisions in the style of Charlie Munger.
+    """
+    template = get_munger_prompt_template()
+
     prompt = template.invoke({
-        "analysis_data": json.dumps(analysis_data, indent=2),
+        "analysis_data": encode_analysis_data(analysis_data),
         "ticker": ticker
     })
 
@@ -741,4 +744,5 @@ def generate_munger_output(
         pydantic_model=CharlieMungerSignal, 
         agent_name="charlie_munger_agent", 
         default_factory=create_default_charlie_munger_signal,
+        ticker=ticker,
     )
\ No newline at end of file
@@ -1,7 +1,5 @@
-from langchain_core.messages import HumanMessage
-from graph.state import AgentState, show_agent_reasoning
+from graph.state import AgentState, create_agent_message, show_agent_reasoning
 from utils.progress import progress
-import json
 
 from tools.api import get_financial_metrics
 
@@ -141,10 +139,7 @@ def fundamentals_agent(state: AgentState):
         progress.update_status("fundamentals_agent", ticker, "Done")
 
     # Create the fundamental analysis message
-    message = HumanMessage(
-        content=json.dumps(fundamental_analysis),
-        name="fundamentals_agent",
-    )
+    message = create_agent_message(fundamental_analysis, "fundamentals_agent", state["metadata"])
 
     # Print the reasoning if the flag is set
     if state["metadata"]["show_reasoning"]:
@@ -1,4 +1,4 @@
-from graph.state import AgentState, show_agent_reasoning
+from graph.state import AgentState, create_agent_message, show_agent_reasoning
 from tools.api import (
     get_financial_metrics,
     get_market_cap,
@@ -8,12 +8,11 @@ from tools.api import (
     get_prices,
 )
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.messages import HumanMessage
 from pydantic import BaseModel
-import json
 from typing_extensions import Literal
 from utils.progress import progress
-from utils.llm import call_llm
+from utils.llm import call_llm, generate_persona_signals
+from utils.prompt import encode_analysis_data
 import statistics
 
 
@@ -136,24 +135,26 @@ def peter_lynch_agent(state: AgentState):
             "insider_activity": insider_activity,
         }
 
-        progress.update_status("peter_lynch_agent", ticker, "Generating Peter Lynch analysis")
-        lynch_output = generate_lynch_output(
-            ticker=ticker,
-            analysis_data=analysis_data[ticker],
-            model_name=state["metadata"]["model_name"],
-            model_provider=state["metadata"]["model_provider"],
-        )
+    lynch_outputs = generate_persona_signals(
+        agent_name="peter_lynch_agent",
+        tickers=tickers,
+        analysis_data=analysis_data,
+        generate_output=generate_lynch_output,
+        prompt_template=get_lynch_prompt_template(),
+        pydantic_model=PeterLynchSignal,
+        metadata=state["metadata"],
+        status="Generating Peter Lynch analysis",
+    )
 
+    for ticker, lynch_output in lynch_outputs.items():
         lynch_analysis[ticker] = {
             "signal": lynch_output.signal,
             "confidence": lynch_output.confidence,
             "reasoning": lynch_output.reasoning,
         }
 
-        progress.update_status("peter_lynch_agent", ticker, "Done")
-
     # Wrap up results
-    message = HumanMessage(content=json.dumps(lynch_analysis), name="peter_lynch_agent")
+    message = create_agent_message(lynch_analysis, "peter_lynch_agent", state["metadata"])
 
     if state["metadata"].get("show_reasoning"):
         show_agent_reasoning(lynch_analysis, "Peter Lynch Agent")
@@ -437,16 +438,9 @@ def analyze_insider_activity(insider_trades: list) -> dict:
     return {"score": score, "details": "; ".join(details)}
 
 
-def generate_lynch_output(
-    ticker: str,
-    analysis_data: dict[str, any],
-    model_name: str,
-    model_provider: str,
-) -> PeterLynchSignal:
-    """
-    Generates a final JSON signal in Peter Lynch's voice & style.
-    """
-    template = ChatPromptTemplate.from_messages(
+def get_lynch_prompt_template() -> ChatPromptTemplate:
+    """Single-ticker prompt for Peter Lynch. Its system message is reused for batched prompts."""
+    return ChatPromptTemplate.from_messages(
         [
             (
                 "system",
@@ -488,7 +482,19 @@ def generate_lynch_output(
         ]
     )
 
-    prompt = template.invoke({"analysis_data": json.dumps(analysis_data, indent=2), "ticker": ticker})
+
+def generate_lynch_output(
+    ticker: str,
+    analysis_data: dict[str, any],
+    model_name: str,
+    model_provider: str,
+) -> PeterLynchSignal:
+    """
+    Generates a final JSON signal in Peter Lynch's voice & style.
+    """
+    template = get_lynch_prompt_template()
+
+    prompt = template.invoke({"analysis_data": encode_analysis_data(analysis_data), "ticker": ticker})
 
     def create_default_signal():
         return PeterLynchSignal(
@@ -504,4 +510,5 @@ def generate_lynch_output(
         pydantic_model=PeterLynchSignal,
         agent_name="peter_lynch_agent",
         default_factory=create_default_signal,
+        ticker=ticker,
     )
@@ -1,4 +1,4 @@
-from graph.state import AgentState, show_agent_reasoning
+from graph.state import AgentState, create_agent_message, show_agent_reasoning
 from tools.api import (
     get_financial_metrics,
     get_market_cap,
@@ -7,12 +7,11 @@ from tools.api import (
     get_company_news,
 )
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.messages import HumanMessage
 from pydantic import BaseModel
-import json
 from typing_extensions import Literal
 from utils.progress import progress
-from utils.llm import call_llm
+from utils.llm import call_llm, generate_persona_signals
+from utils.prompt import encode_analysis_data
 import statistics
 
 
@@ -139,24 +138,26 @@ def phil_fisher_agent(state: AgentState):
             "sentiment_analysis": sentiment_analysis,
         }
 
-        progress.update_status("phil_fisher_agent", ticker, "Generating Phil Fisher-style analysis")
-        fisher_output = generate_fisher_output(
-            ticker=ticker,
-            analysis_data=analysis_data,
-            model_name=state["metadata"]["model_name"],
-            model_provider=state["metadata"]["model_provider"],
-        )
+    fisher_outputs = generate_persona_signals(
+        agent_name="phil_fisher_agent",
+        tickers=tickers,
+        analysis_data=analysis_data,
+        generate_output=generate_fisher_output,
+        prompt_template=get_fisher_prompt_template(),
+        pydantic_model=PhilFisherSignal,
+        metadata=state["metadata"],
+        status="Generating Phil Fisher-style analysis",
+    )
 
+    for ticker, fisher_output in fisher_outputs.items():
         fisher_analysis[ticker] = {
             "signal": fisher_output.signal,
             "confidence": fisher_output.confidence,
             "reasoning": fisher_output.reasoning,
         }
 
-        progress.update_status("phil_fisher_agent", ticker, "Done")
-
     # Wrap results in a single message
-    message = HumanMessage(content=json.dumps(fisher_analysis), name="phil_fisher_agent")
+    message = create_agent_message(fisher_analysis, "phil_fisher_agent", state["metadata"])
 
     if state["metadata"].get("show_reasoning"):
         show_agent_reasoning(fisher_analysis, "Phil Fisher Agent")
@@ -525,16 +526,9 @@ def analyze_sentiment(news_items: list) -> dict:
     return {"score": score, "details": "; ".join(details)}
 
 
-def generate_fisher_output(
-    ticker: str,
-    analysis_data: dict[str, any],
-    model_name: str,
-    model_provider: str,
-) -> PhilFisherSignal:
-    """
-    Generates a JSON signal in the style of Phil Fisher.
-    """
-    template = ChatPromptTemplate.from_messages(
+def get_fisher_prompt_template() -> ChatPromptTemplate:
+    """Single-ticker prompt for Phil Fisher. Its system message is reused for batched prompts."""
+    return ChatPromptTemplate.from_messages(
         [
             (
               "system",
@@ -582,7 +576,19 @@ def generate_fisher_output(
         ]
     )
 
-    prompt = template.invoke({"analysis_data": json.dumps(analysis_data, indent=2), "ticker": ticker})
+
+def generate_fisher_output(
+    ticker: str,
+    analysis_data: dict[str, any],
+    model_name: str,
+    model_provider: str,
+) -> PhilFisherSignal:
+    """
+    Generates a JSON signal in the style of Phil Fisher.
+    """
+    template = get_fisher_prompt_template()
+
+    prompt = template.invoke({"analysis_data": encode_analysis_data(analysis_data), "ticker": ticker})
 
     def create_default_signal():
         return PhilFisherSignal(
@@ -598,4 +604,5 @@ def generate_fisher_output(
         pydantic_model=PhilFisherSignal,
         agent_name="phil_fisher_agent",
         default_factory=create_default_signal,
+        ticker=ticker,
     )
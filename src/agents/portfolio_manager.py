@@ -1,8 +1,7 @@
 import json
-from langchain_core.messages import HumanMessage
 from langchain_core.prompts import ChatPromptTemplate
 
-from graph.state import AgentState, show_agent_reasoning
+from graph.state import AgentState, create_agent_message, show_agent_reasoning
 from pydantic import BaseModel, Field
 from typing_extensions import Literal
 from utils.progress import progress
@@ -70,20 +69,21 @@ def portfolio_management_agent(state: AgentState):
         model_provider=state["metadata"]["model_provider"],
     )
 
+    # Store the decisions once, as structured data
+    decisions = {ticker: decision.model_dump() for ticker, decision in result.decisions.items()}
+    state["data"]["decisions"] = decisions
+
     # Create the portfolio management message
-    message = HumanMessage(
-        content=json.dumps({ticker: decision.model_dump() for ticker, decision in result.decisions.items()}),
-        name="portfolio_management",
-    )
+    message = create_agent_message(decisions, "portfolio_management", state["metadata"], ref="data.decisions")
 
     # Print the decision if the flag is set
     if state["metadata"]["show_reasoning"]:
-        show_agent_reasoning({ticker: decision.model_dump() for ticker, decision in result.decisions.items()}, "Portfolio Management Agent")
+        show_agent_reasoning(decisions, "Portfolio Management Agent")
 
     progress.update_status("portfolio_management_agent", None, "Done")
 
     return {
-        "messages": state["messages"] + [message],
+        "messages": [message],
         "data": state["data"],
     }
 
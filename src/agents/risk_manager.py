@@ -1,8 +1,6 @@
-from langchain_core.messages import HumanMessage
-from graph.state import AgentState, show_agent_reasoning
+from graph.state import AgentState, create_agent_message, show_agent_reasoning
 from utils.progress import progress
 from tools.api import get_prices, prices_to_df
-import json
 
 
 ##### Risk Management Agent #####
@@ -66,10 +64,7 @@ def risk_management_agent(state: AgentState):
 
         progress.update_status("risk_management_agent", ticker, "Done")
 
-    message = HumanMessage(
-        content=json.dumps(risk_analysis),
-        name="risk_management_agent",
-    )
+    message = create_agent_message(risk_analysis, "risk_management_agent", state["metadata"])
 
     if state["metadata"]["show_reasoning"]:
         show_agent_reasoning(risk_analysis, "Risk Management Agent")
@@ -78,6 +73,6 @@ def risk_management_agent(state: AgentState):
     state["data"]["analyst_signals"]["risk_management_agent"] = risk_analysis
 
     return {
-        "messages": state["messages"] + [message],
+        "messages": [message],
         "data": data,
     }
@@ -1,9 +1,7 @@
-from langchain_core.messages import HumanMessage
-from graph.state import AgentState, show_agent_reasoning
+from graph.state import AgentState, create_agent_message, show_agent_reasoning
 from utils.progress import progress
 import pandas as pd
 import numpy as np
-import json
 
 from tools.api import get_insider_trades, get_company_news
 
@@ -82,10 +80,7 @@ def sentiment_agent(state: AgentState):
         progress.update_status("sentiment_agent", ticker, "Done")
 
     # Create the sentiment message
-    message = HumanMessage(
-        content=json.dumps(sentiment_analysis),
-        name="sentiment_agent",
-    )
+    message = create_agent_message(sentiment_analysis, "sentiment_agent", state["metadata"])
 
     # Print the reasoning if the flag is set
     if state["metadata"]["show_reasoning"]:
@@ -1,4 +1,4 @@
-from graph.state import AgentState, show_agent_reasoning
+from graph.state import AgentState, create_agent_message, show_agent_reasoning
 from tools.api import (
     get_financial_metrics,
     get_market_cap,
@@ -8,12 +8,11 @@ from tools.api import (
     get_prices,
 )
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.messages import HumanMessage
 from pydantic import BaseModel
-import json
 from typing_extensions import Literal
 from utils.progress import progress
-from utils.llm import call_llm
+from utils.llm import call_llm, generate_persona_signals
+from utils.prompt import encode_analysis_data
 import statistics
 
 
@@ -133,24 +132,26 @@ def stanley_druckenmiller_agent(state: AgentState):
             "valuation_analysis": valuation_analysis,
         }
 
-        progress.update_status("stanley_druckenmiller_agent", ticker, "Generating Stanley Druckenmiller analysis")
-        druck_output = generate_druckenmiller_output(
-            ticker=ticker,
-            analysis_data=analysis_data,
-            model_name=state["metadata"]["model_name"],
-            model_provider=state["metadata"]["model_provider"],
-        )
+    druckenmiller_outputs = generate_persona_signals(
+        agent_name="stanley_druckenmiller_agent",
+        tickers=tickers,
+        analysis_data=analysis_data,
+        generate_output=generate_druckenmiller_output,
+        prompt_template=get_druckenmiller_prompt_template(),
+        pydantic_model=StanleyDruckenmillerSignal,
+        metadata=state["metadata"],
+        status="Generating Stanley Druckenmiller analysis",
+    )
 
+    for ticker, druck_output in druckenmiller_outputs.items():
         druck_analysis[ticker] = {
             "signal": druck_output.signal,
             "confidence": druck_output.confidence,
             "reasoning": druck_output.reasoning,
         }
 
-        progress.update_status("stanley_druckenmiller_agent", ticker, "Done")
-
     # Wrap results in a single message
-    message = HumanMessage(content=json.dumps(druck_analysis), name="stanley_druckenmiller_agent")
+    message = create_agent_message(druck_analysis, "stanley_druckenmiller_agent", state["metadata"])
 
     if state["metadata"].get("show_reasoning"):
         show_agent_reasoning(druck_analysis, "Stanley Druckenmiller Agent")
@@ -518,16 +519,9 @@ def analyze_druckenmiller_valuation(financial_line_items: list, market_cap: floa
     return {"score": final_score, "details": "; ".join(details)}
 
 
-def generate_druckenmiller_output(
-    ticker: str,
-    analysis_data: dict[str, any],
-    model_name: str,
-    model_provider: str,
-) -> StanleyDruckenmillerSignal:
-    """
-    Generates a JSON signal in the style of Stanley Druckenmiller.
-    """
-    template = ChatPromptTemplate.from_messages(
+def get_druckenmiller_prompt_template() -> ChatPromptTemplate:
+    """Single-ticker prompt for Stanley Druckenmiller. Its system message is reused for batched prompts."""
+    return ChatPromptTemplate.from_messages(
         [
             (
               "system",
@@ -576,7 +570,19 @@ def generate_druckenmiller_output(
         ]
     )
 
-    prompt = template.invoke({"analysis_data": json.dumps(analysis_data, indent=2), "ticker": ticker})
+
+def generate_druckenmiller_output(
+    ticker: str,
+    analysis_data: dict[str, any],
+    model_name: str,
+    model_provider: str,
+) -> StanleyDruckenmillerSignal:
+    """
+    Generates a JSON signal in the style of Stanley Druckenmiller.
+    """
+    template = get_druckenmiller_prompt_template()
+
+    prompt = template.invoke({"analysis_data": encode_analysis_data(analysis_data), "ticker": ticker})
 
     def create_default_signal():
         return StanleyDruckenmillerSignal(
@@ -592,4 +598,5 @@ def generate_druckenmiller_output(
         pydantic_model=StanleyDruckenmillerSignal,
         agent_name="stanley_druckenmiller_agent",
         default_factory=create_default_signal,
+        ticker=ticker,
     )
@@ -1,10 +1,7 @@
 import math
 
-from langchain_core.messages import HumanMessage
+from graph.state import AgentState, create_agent_message, show_agent_reasoning
 
-from graph.state import AgentState, show_agent_reasoning
-
-import json
 import pandas as pd
 import numpy as np
 
@@ -30,6 +27,7 @@ def technical_analyst_agent(state: AgentState):
     # Initialize analysis for each ticker
     technical_analysis = {}
 
+    prices_dfs = {}
     for ticker in tickers:
         progress.update_status("technical_analyst_agent", ticker, "Analyzing price data")
 
@@ -45,22 +43,19 @@ def technical_analyst_agent(state: AgentState):
             continue
 
         # Convert prices to a DataFrame
-        prices_df = prices_to_df(prices)
-
-        progress.update_status("technical_analyst_agent", ticker, "Calculating trend signals")
-        trend_signals = calculate_trend_signals(prices_df)
-
-        progress.update_status("technical_analyst_agent", ticker, "Calculating mean reversion")
-        mean_reversion_signals = calculate_mean_reversion_signals(prices_df)
+        prices_dfs[ticker] = prices_to_df(prices)
 
-        progress.update_status("technical_analyst_agent", ticker, "Calculating momentum")
-        momentum_signals = calculate_momentum_signals(prices_df)
+    # Run all strategies for all tickers at once on dates × tickers panels
+    for ticker in prices_dfs:
+        progress.update_status("technical_analyst_agent", ticker, "Calculating signals")
+    strategy_signals = calculate_signals_panel(prices_dfs)
 
-        progress.update_status("technical_analyst_agent", ticker, "Analyzing volatility")
-        volatility_signals = calculate_volatility_signals(prices_df)
-
-        progress.update_status("technical_analyst_agent", ticker, "Statistical analysis")
-        stat_arb_signals = calculate_stat_arb_signals(prices_df)
+    for ticker in prices_dfs:
+        trend_signals = strategy_signals[ticker]["trend"]
+        mean_reversion_signals = strategy_signals[ticker]["mean_reversion"]
+        momentum_signals = strategy_signals[ticker]["momentum"]
+        volatility_signals = strategy_signals[ticker]["volatility"]
+        stat_arb_signals = strategy_signals[ticker]["stat_arb"]
 
         # Combine all signals using a weighted ensemble approach
         strategy_weights = {
@@ -118,10 +113,7 @@ def technical_analyst_agent(state: AgentState):
         progress.update_status("technical_analyst_agent", ticker, "Done")
 
     # Create the technical analyst message
-    message = HumanMessage(
-        content=json.dumps(technical_analysis),
-        name="technical_analyst_agent",
-    )
+    message = create_agent_message(technical_analysis, "technical_analyst_agent", state["metadata"])
 
     if state["metadata"]["show_reasoning"]:
         show_agent_reasoning(technical_analysis, "Technical Analyst")
@@ -130,7 +122,7 @@ def technical_analyst_agent(state: AgentState):
     state["data"]["analyst_signals"]["technical_analyst_agent"] = technical_analysis
 
     return {
-        "messages": state["messages"] + [message],
+        "messages": [message],
         "data": data,
     }
 
@@ -499,7 +491,11 @@ def calculate_hurst_exponent(price_series: pd.Series, max_lag: int = 20) -> floa
     lags = range(2, max_lag)
     # Add small epsilon to avoid log(0)
     tau = [max(1e-8, np.sqrt(np.std(np.subtract(price_series[lag:], price_series[:-lag])))) for lag in lags]
+    return fit_hurst_exponent(lags, tau)
+
 
+def fit_hurst_exponent(lags: range, tau: list[float]) -> float:
+    """Slope of log(tau) against log(lag), or 0.5 (random walk) if the fit fails."""
     # Return the Hurst exponent from linear fit
     try:
         reg = np.polyfit(np.log(lags), np.log(tau), 1)
@@ -507,3 +503,225 @@ def calculate_hurst_exponent(price_series: pd.Series, max_lag: int = 20) -> floa
     except (ValueError, RuntimeWarning):
         # Return 0.5 (random walk) if calculation fails
         return 0.5
+
+
+##### Cross-sectional (dates × tickers) versions #####
+# The functions below compute the same indicators and signals as the per-ticker functions
+# above for many tickers at once, on panels: one dates × tickers DataFrame per price field.
+# Rolling and exponentially weighted windows run column by column with the same kernels,
+# so every ticker's result is identical to running the per-ticker function on its prices.
+
+PANEL_FIELDS = ("close", "high", "low", "volume")
+
+
+def prices_to_panels(prices_dfs: dict[str, pd.DataFrame]) -> list[dict[str, pd.DataFrame]]:
+    """
+    Stack per-ticker price DataFrames (from `prices_to_df`) into panels.
+
+    Tickers share a panel only if their dates are identical, since a date missing for one
+    ticker must not become a NaN in another's window. Tickers with duplicate dates get a
+    panel of their own.
+    """
+    groups: list[tuple[pd.Index, list[str]]] = []
+    for ticker, prices_df in prices_dfs.items():
+        index = prices_df.index
+        group = next((tickers for group_index, tickers in groups if index.is_unique and group_index.equals(index)), None)
+        if group is None:
+            groups.append((index, [ticker]))
+        else:
+            group.append(ticker)
+
+    return [
+        {field: pd.DataFrame(np.column_stack([prices_dfs[ticker][field].to_numpy() for ticker in tickers]), index=index, columns=tickers) for field in PANEL_FIELDS}
+        for index, tickers in groups
+    ]
+
+
+def calculate_signals_panel(prices_dfs: dict[str, pd.DataFrame]) -> dict[str, dict[str, dict]]:
+    """
+    Run all five strategies for every ticker, a few vectorized passes per panel.
+
+    Returns, per ticker, the results of the trend, mean reversion, momentum, volatility and
+    statistical arbitrage strategies, keyed like the `weighted_signal_combination` inputs.
+    """
+    strategies = {
+        "trend": calculate_trend_signals_panel,
+        "mean_reversion": calculate_mean_reversion_signals_panel,
+        "momentum": calculate_momentum_signals_panel,
+        "volatility": calculate_volatility_signals_panel,
+        "stat_arb": calculate_stat_arb_signals_panel,
+    }
+    results = {ticker: {} for ticker in prices_dfs}
+    for panel in prices_to_panels(prices_dfs):
+        for strategy, calculate in strategies.items():
+            for ticker, result in calculate(panel).items():
+                results[ticker][strategy] = result
+    return results
+
+
+def _panel_results(panel: dict[str, pd.DataFrame], signal: np.ndarray, confidence: np.ndarray, metrics: dict[str, np.ndarray]) -> dict[str, dict]:
+    """Per-ticker result dicts from the last-day signal, confidence and metric arrays."""
+    tickers = panel["close"].columns
+    metric_values = {name: values.tolist() for name, values in metrics.items()}
+    return {
+        ticker: {
+            "signal": str(signal[i]),
+            "confidence": confidence[i].item(),
+            "metrics": {name: values[i] for name, values in metric_values.items()},
+        }
+        for i, ticker in enumerate(tickers)
+    }
+
+
+def _signal_labels(bullish: np.ndarray, bearish: np.ndarray) -> np.ndarray:
+    return np.select([bullish, bearish], ["bullish", "bearish"], "neutral")
+
+
+def _last(frame: pd.DataFrame) -> np.ndarray:
+    return frame.to_numpy()[-1]
+
+
+def calculate_trend_signals_panel(panel: dict[str, pd.DataFrame]) -> dict[str, dict]:
+    """`calculate_trend_signals` for every ticker of a panel."""
+    ema_8 = calculate_ema_panel(panel, 8)
+    ema_21 = calculate_ema_panel(panel, 21)
+    ema_55 = calculate_ema_panel(panel, 55)
+    adx = calculate_adx_panel(panel, 14)["adx"]
+
+    short_trend = _last(ema_8 > ema_21)
+    medium_trend = _last(ema_21 > ema_55)
+    trend_strength = _last(adx) / 100.0
+
+    bullish = short_trend & medium_trend
+    bearish = ~short_trend & ~medium_trend
+    confidence = np.where(bullish | bearish, trend_strength, 0.5)
+    return _panel_results(panel, _signal_labels(bullish, bearish), confidence, {"adx": _last(adx), "trend_strength": trend_strength})
+
+
+def calculate_mean_reversion_signals_panel(panel: dict[str, pd.DataFrame]) -> dict[str, dict]:
+    """`calculate_mean_reversion_signals` for every ticker of a panel."""
+    close = panel["close"]
+    ma_50 = close.rolling(window=50).mean()
+    std_50 = close.rolling(window=50).std()
+    z_score = _last((close - ma_50) / std_50)
+
+    bb_upper, bb_lower = calculate_bollinger_bands_panel(panel)
+    rsi_14 = calculate_rsi_panel(panel, 14)
+    rsi_28 = calculate_rsi_panel(panel, 28)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        price_vs_bb = (_last(close) - _last(bb_lower)) / (_last(bb_upper) - _last(bb_lower))
+
+    bullish = (z_score < -2) & (price_vs_bb < 0.2)
+    bearish = ~bullish & (z_score > 2) & (price_vs_bb > 0.8)
+    confidence = np.where(bullish | bearish, np.minimum(np.abs(z_score) / 4, 1.0), 0.5)
+    metrics = {"z_score": z_score, "price_vs_bb": price_vs_bb, "rsi_14": _last(rsi_14), "rsi_28": _last(rsi_28)}
+    return _panel_results(panel, _signal_labels(bullish, bearish), confidence, metrics)
+
+
+def calculate_momentum_signals_panel(panel: dict[str, pd.DataFrame]) -> dict[str, dict]:
+    """`calculate_momentum_signals` for every ticker of a panel."""
+    returns = panel["close"].pct_change()
+    mom_1m = _last(returns.rolling(21).sum())
+    mom_3m = _last(returns.rolling(63).sum())
+    mom_6m = _last(returns.rolling(126).sum())
+
+    volume_ma = panel["volume"].rolling(21).mean()
+    volume_momentum = _last(panel["volume"] / volume_ma)
+
+    momentum_score = 0.4 * mom_1m + 0.3 * mom_3m + 0.3 * mom_6m
+    volume_confirmation = volume_momentum > 1.0
+
+    bullish = (momentum_score > 0.05) & volume_confirmation
+    bearish = ~bullish & (momentum_score < -0.05) & volume_confirmation
+    confidence = np.where(bullish | bearish, np.minimum(np.abs(momentum_score) * 5, 1.0), 0.5)
+    metrics = {"momentum_1m": mom_1m, "momentum_3m": mom_3m, "momentum_6m": mom_6m, "volume_momentum": volume_momentum}
+    return _panel_results(panel, _signal_labels(bullish, bearish), confidence, metrics)
+
+
+def calculate_volatility_signals_panel(panel: dict[str, pd.DataFrame]) -> dict[str, dict]:
+    """`calculate_volatility_signals` for every ticker of a panel."""
+    returns = panel["close"].pct_change()
+    hist_vol = returns.rolling(21).std() * math.sqrt(252)
+    vol_ma = hist_vol.rolling(63).mean()
+    vol_regime = _last(hist_vol / vol_ma)
+    vol_z = _last((hist_vol - vol_ma) / hist_vol.rolling(63).std())
+    atr_ratio = _last(calculate_atr_panel(panel) / panel["close"])
+
+    bullish = (vol_regime < 0.8) & (vol_z < -1)
+    bearish = ~bullish & (vol_regime > 1.2) & (vol_z > 1)
+    confidence = np.where(bullish | bearish, np.minimum(np.abs(vol_z) / 3, 1.0), 0.5)
+    metrics = {"historical_volatility": _last(hist_vol), "volatility_regime": vol_regime, "volatility_z_score": vol_z, "atr_ratio": atr_ratio}
+    return _panel_results(panel, _signal_labels(bullish, bearish), confidence, metrics)
+
+
+def calculate_stat_arb_signals_panel(panel: dict[str, pd.DataFrame]) -> dict[str, dict]:
+    """`calculate_stat_arb_signals` for every ticker of a panel."""
+    returns = panel["close"].pct_change()
+    skew = _last(returns.rolling(63).skew())
+    kurt = _last(returns.rolling(63).kurt())
+    hurst = calculate_hurst_exponent_panel(panel["close"])
+
+    bullish = (hurst < 0.4) & (skew > 1)
+    bearish = ~bullish & (hurst < 0.4) & (skew < -1)
+    confidence = np.where(bullish | bearish, (0.5 - hurst) * 2, 0.5)
+    return _panel_results(panel, _signal_labels(bullish, bearish), confidence, {"hurst_exponent": hurst, "skewness": skew, "kurtosis": kurt})
+
+
+def calculate_rsi_panel(panel: dict[str, pd.DataFrame], period: int = 14) -> pd.DataFrame:
+    delta = panel["close"].diff()
+    gain = (delta.where(delta > 0, 0)).fillna(0)
+    loss = (-delta.where(delta < 0, 0)).fillna(0)
+    avg_gain = gain.rolling(window=period).mean()
+    avg_loss = loss.rolling(window=period).mean()
+    rs = avg_gain / avg_loss
+    return 100 - (100 / (1 + rs))
+
+
+def calculate_bollinger_bands_panel(panel: dict[str, pd.DataFrame], window: int = 20) -> tuple[pd.DataFrame, pd.DataFrame]:
+    sma = panel["close"].rolling(window).mean()
+    std_dev = panel["close"].rolling(window).std()
+    return sma + (std_dev * 2), sma - (std_dev * 2)
+
+
+def calculate_ema_panel(panel: dict[str, pd.DataFrame], window: int) -> pd.DataFrame:
+    return panel["close"].ewm(span=window, adjust=False).mean()
+
+
+def _true_range_panel(panel: dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """Largest of the three ranges, skipping the missing previous close on the first day."""
+    high_low = panel["high"] - panel["low"]
+    high_close = abs(panel["high"] - panel["close"].shift())
+    low_close = abs(panel["low"] - panel["close"].shift())
+    return np.fmax(np.fmax(high_low, high_close), low_close)
+
+
+def calculate_adx_panel(panel: dict[str, pd.DataFrame], period: int = 14) -> dict[str, pd.DataFrame]:
+    """ADX and directional indicators (keys "adx", "+di", "-di"), without modifying the panel."""
+    high, low = panel["high"], panel["low"]
+    tr = _true_range_panel(panel)
+
+    up_move = high - high.shift()
+    down_move = low.shift() - low
+    plus_dm = pd.DataFrame(np.where((up_move > down_move) & (up_move > 0), up_move, 0), index=high.index, columns=high.columns)
+    minus_dm = pd.DataFrame(np.where((down_move > up_move) & (down_move > 0), down_move, 0), index=high.index, columns=high.columns)
+
+    tr_ema = tr.ewm(span=period).mean()
+    plus_di = 100 * (plus_dm.ewm(span=period).mean() / tr_ema)
+    minus_di = 100 * (minus_dm.ewm(span=period).mean() / tr_ema)
+    dx = 100 * abs(plus_di - minus_di) / (plus_di + minus_di)
+    return {"adx": dx.ewm(span=period).mean(), "+di": plus_di, "-di": minus_di}
+
+
+def calculate_atr_panel(panel: dict[str, pd.DataFrame], period: int = 14) -> pd.DataFrame:
+    return _true_range_panel(panel).rolling(period).mean()
+
+
+def calculate_hurst_exponent_panel(close: pd.DataFrame, max_lag: int = 20) -> np.ndarray:
+    """`calculate_hurst_exponent` of each column, fitting each distinct set of lag statistics once."""
+    lags = range(2, max_lag)
+    # Differences are taken the same way as for a single ticker (aligned on the dates)
+    tau = np.array([np.fmax(1e-8, np.sqrt((close[lag:] - close[:-lag]).std(ddof=0).to_numpy())) for lag in lags]).reshape(len(lags), close.shape[1])
+    unique_tau, inverse = np.unique(tau.T, axis=0, return_inverse=True)
+    fits = np.array([fit_hurst_exponent(lags, list(column)) for column in unique_tau], dtype=float)
+    return fits[inverse.reshape(-1)]
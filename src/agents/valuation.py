@@ -1,7 +1,5 @@
-from langchain_core.messages import HumanMessage
-from graph.state import AgentState, show_agent_reasoning
+from graph.state import AgentState, create_agent_message, show_agent_reasoning
 from utils.progress import progress
-import json
 
 from tools.api import get_financial_metrics, get_market_cap, search_line_items
 
@@ -120,10 +118,7 @@ def valuation_agent(state: AgentState):
 
         progress.update_status("valuation_agent", ticker, "Done")
 
-    message = HumanMessage(
-        content=json.dumps(valuation_analysis),
-        name="valuation_agent",
-    )
+    message = create_agent_message(valuation_analysis, "valuation_agent", state["metadata"])
 
     # Print the reasoning if the flag is set
     if state["metadata"]["show_reasoning"]:
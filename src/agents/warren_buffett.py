@@ -1,11 +1,10 @@
-from graph.state import AgentState, show_agent_reasoning
+from graph.state import AgentState, create_agent_message, show_agent_reasoning
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.messages import HumanMessage
 from pydantic import BaseModel
-import json
 from typing_extensions import Literal
 from tools.api import get_financial_metrics, get_market_cap, search_line_items
-from utils.llm import call_llm
+from utils.llm import call_llm, generate_persona_signals
+from utils.prompt import encode_analysis_data
 from utils.progress import progress
 
 
@@ -104,25 +103,26 @@ def warren_buffett_agent(state: AgentState):
             "margin_of_safety": margin_of_safety,
         }
 
-        progress.update_status("warren_buffett_agent", ticker, "Generating Warren Buffett analysis")
-        buffett_output = generate_buffett_output(
-            ticker=ticker,
-            analysis_data=analysis_data,
-            model_name=state["metadata"]["model_name"],
-            model_provider=state["metadata"]["model_provider"],
-        )
+    buffett_outputs = generate_persona_signals(
+        agent_name="warren_buffett_agent",
+        tickers=tickers,
+        analysis_data=analysis_data,
+        generate_output=generate_buffett_output,
+        prompt_template=get_buffett_prompt_template(),
+        pydantic_model=WarrenBuffettSignal,
+        metadata=state["metadata"],
+        status="Generating Warren Buffett analysis",
+    )
 
-        # Store analysis in consistent format with other agents
+    for ticker, buffett_output in buffett_outputs.items():
         buffett_analysis[ticker] = {
             "signal": buffett_output.signal,
             "confidence": buffett_output.confidence, # Normalize between 0 to 100
             "reasoning": buffett_output.reasoning,
         }
 
-        progress.update_status("warren_buffett_agent", ticker, "Done")
-
     # Create the message
-    message = HumanMessage(content=json.dumps(buffett_analysis), name="warren_buffett_agent")
+    message = create_agent_message(buffett_analysis, "warren_buffett_agent", state["metadata"])
 
     # Show reasoning if requested
     if state["metadata"]["show_reasoning"]:
@@ -382,14 +382,9 @@ def calculate_intrinsic_value(financial_line_items: list) -> dict[str, any]:
     }
 
 
-def generate_buffett_output(
-    ticker: str,
-    analysis_data: dict[str, any],
-    model_name: str,
-    model_provider: str,
-) -> WarrenBuffettSignal:
-    """Get investment decision from LLM with Buffett's principles"""
-    template = ChatPromptTemplate.from_messages(
+def get_buffett_prompt_template() -> ChatPromptTemplate:
+    """Single-ticker prompt for Warren Buffett. Its system message is reused for batched prompts."""
+    return ChatPromptTemplate.from_messages(
         [
             (
                 "system",
@@ -433,7 +428,17 @@ def generate_buffett_output(
         ]
     )
 
-    prompt = template.invoke({"analysis_data": json.dumps(analysis_data, indent=2), "ticker": ticker})
+
+def generate_buffett_output(
+    ticker: str,
+    analysis_data: dict[str, any],
+    model_name: str,
+    model_provider: str,
+) -> WarrenBuffettSignal:
+    """Get investment decision from LLM with Buffett's principles"""
+    template = get_buffett_prompt_template()
+
+    prompt = template.invoke({"analysis_data": encode_analysis_data(analysis_data), "ticker": ticker})
 
     # Default fallback signal in case parsing fails
     def create_default_warren_buffett_signal():
@@ -446,4 +451,5 @@ def generate_buffett_output(
         pydantic_model=WarrenBuffettSignal,
         agent_name="warren_buffett_agent",
         default_factory=create_default_warren_buffett_signal,
+        ticker=ticker,
     )
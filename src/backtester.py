@@ -1,26 +1,38 @@
+import atexit
 import sys
 
 from datetime import datetime, timedelta
 from dateutil.relativedelta import relativedelta
 import questionary
 
-import matplotlib.pyplot as plt
 import pandas as pd
 from colorama import Fore, Style, init
 import numpy as np
 import itertools
 
+from backtesting.bootstrap import BootstrapResult, bootstrap_performance, print_bootstrap_result
+from backtesting.checkpoint import BacktestCheckpoint
+from backtesting.results import RESULTS_FORMATS, BacktestRecorder, results_schemas
+from backtesting.metrics import StreamingPerformanceMetrics
+from backtesting.portfolio import ACTION_CODES, HOLD, Portfolio
+from backtesting.prices import PricePanel
+from backtesting.signals import SignalStore, options_hash, precompute_signals
+from backtesting.timeseries import PortfolioValueSeries
 from llm.models import LLM_ORDER, get_model_info
-from utils.analysts import ANALYST_ORDER
+from llm.cache import configure_llm_cache
+from utils.analysts import ANALYST_CONFIG, ANALYST_ORDER
 from main import run_hedge_fund
 from tools.api import (
     get_company_news,
-    get_price_data,
     get_prices,
     get_financial_metrics,
     get_insider_trades,
 )
-from utils.display import print_backtest_results, format_backtest_row
+from utils.display import BACKTEST_OUTPUT_MODES, BacktestRow, print_backtest_results
+from utils.llm_metrics import llm_metrics
+from utils.progress import progress
+from utils.rebalance import REBALANCE_FREQUENCIES, filing_dates, filing_limit, rebalance_mask
+from utils.tracing import tracer
 from typing_extensions import Callable
 
 init(autoreset=True)
@@ -38,6 +50,17 @@ class Backtester:
         model_provider: str = "OpenAI",
         selected_analysts: list[str] = [],
         initial_margin_requirement: float = 0.0,
+        agent_options: dict = None,
+        checkpoint_path: str = None,
+        signal_store_path: str = None,
+        signal_workers: int = 8,
+        output_mode: str = "full",
+        output_tail_days: int = 5,
+        rebalance_frequency: str = "daily",
+        bootstrap_resamples: int = 2000,
+        bootstrap_block_length: int = None,
+        results_path: str = None,
+        results_format: str = "parquet",
     ):
         """
         :param agent: The trading agent (Callable).
@@ -49,6 +72,24 @@ class Backtester:
         :param model_provider: Which LLM provider (OpenAI, etc).
         :param selected_analysts: List of analyst names or IDs to incorporate.
         :param initial_margin_requirement: The margin ratio (e.g. 0.5 = 50%).
+        :param agent_options: Extra keyword arguments passed to the agent on every call (e.g. llm_batch_size).
+        :param checkpoint_path: Optional SQLite file to checkpoint each completed day to and resume from.
+        :param signal_store_path: Optional SQLite file of precomputed analyst signals. When set, the backtest runs in
+            two phases: all missing (date, ticker, analyst) signals are computed in parallel first, then the risk and
+            portfolio managers are replayed day by day over the stored signals.
+        :param signal_workers: Worker threads used to compute analyst signals in the first phase.
+        :param output_mode: How each day's results are printed: "full" (whole history), "tail" (last
+            `output_tail_days` days), "new" (only the new day's rows, appended) or "quiet" (nothing at all).
+            In "tail" and "new" modes the whole table is printed once at the end of the backtest.
+        :param output_tail_days: Number of days shown in "tail" mode.
+        :param rebalance_frequency: When the agents run: "daily", "weekly", "monthly" or "filings" (when new
+            financial metrics are reported). The portfolio is marked to market every day either way.
+        :param bootstrap_resamples: Block bootstrap resamples of the daily returns for confidence intervals at the end
+            of the backtest (0 disables them).
+        :param bootstrap_block_length: Bootstrap block length in days (default: cube root of the number of returns).
+        :param results_path: Optional directory to write the daily portfolio values, exposures, trades and analyst
+            signals to as columnar tables (see backtesting.results).
+        :param results_format: "parquet" or "arrow" (Arrow IPC).
         """
         self.agent = agent
         self.tickers = tickers
@@ -58,29 +99,40 @@ class Backtester:
         self.model_name = model_name
         self.model_provider = model_provider
         self.selected_analysts = selected_analysts
+        self.agent_options = agent_options or {}
+        self.checkpoint_path = checkpoint_path
+        self.signal_store_path = signal_store_path
+        self.signal_workers = signal_workers
+        if output_mode not in BACKTEST_OUTPUT_MODES:
+            raise ValueError(f"Unknown output mode: {output_mode}")
+        self.output_mode = output_mode
+        self.output_tail_days = output_tail_days
+        if rebalance_frequency not in REBALANCE_FREQUENCIES:
+            raise ValueError(f"Unknown rebalance frequency: {rebalance_frequency}")
+        self.rebalance_frequency = rebalance_frequency
+        self.bootstrap_resamples = bootstrap_resamples
+        self.bootstrap_block_length = bootstrap_block_length
+        self.bootstrap: BootstrapResult | None = None
+        if results_format not in RESULTS_FORMATS:
+            raise ValueError(f"Unknown results format: {results_format}")
+        if results_path:
+            results_schemas()  # fail before the backtest if pyarrow is missing
+        self.results_path = results_path
+        self.results_format = results_format
+        self.table_rows: list[BacktestRow] = []
 
         # Initialize portfolio with support for long/short positions
-        self.portfolio_values = []
-        self.portfolio = {
-            "cash": initial_capital,
-            "margin_used": 0.0,  # total margin usage across all short positions
-            "margin_requirement": initial_margin_requirement,  # The margin ratio required for shorts
-            "positions": {
-                ticker: {
-                    "long": 0,               # Number of shares held long
-                    "short": 0,              # Number of shares held short
-                    "long_cost_basis": 0.0,  # Average cost basis per share (long)
-                    "short_cost_basis": 0.0, # Average cost basis per share (short)
-                    "short_margin_used": 0.0 # Dollars of margin used for this ticker's short
-                } for ticker in tickers
-            },
-            "realized_gains": {
-                ticker: {
-                    "long": 0.0,   # Realized gains from long positions
-                    "short": 0.0,  # Realized gains from short positions
-                } for ticker in tickers
-            }
-        }
+        self.portfolio_values = PortfolioValueSeries()
+        self._portfolio = Portfolio(tickers, initial_capital, initial_margin_requirement)
+
+    @property
+    def portfolio(self) -> dict:
+        """The portfolio as the nested dict the agents expect (cash, margin, positions, realized gains)."""
+        return self._portfolio.to_dict()
+
+    @portfolio.setter
+    def portfolio(self, portfolio: dict):
+        self._portfolio = Portfolio.from_dict(self.tickers, portfolio)
 
     def execute_trade(self, ticker: str, action: str, quantity: float, current_price: float):
         """
@@ -88,163 +140,7 @@ class Backtester:
         `quantity` is the number of shares the agent wants to buy/sell/short/cover.
         We will only trade integer shares to keep it simple.
         """
-        if quantity <= 0:
-            return 0
-
-        quantity = int(quantity)  # force integer shares
-        position = self.portfolio["positions"][ticker]
-
-        if action == "buy":
-            cost = quantity * current_price
-            if cost <= self.portfolio["cash"]:
-                # Weighted average cost basis for the new total
-                old_shares = position["long"]
-                old_cost_basis = position["long_cost_basis"]
-                new_shares = quantity
-                total_shares = old_shares + new_shares
-
-                if total_shares > 0:
-                    total_old_cost = old_cost_basis * old_shares
-                    total_new_cost = cost
-                    position["long_cost_basis"] = (total_old_cost + total_new_cost) / total_shares
-
-                position["long"] += quantity
-                self.portfolio["cash"] -= cost
-                return quantity
-            else:
-                # Calculate maximum affordable quantity
-                max_quantity = int(self.portfolio["cash"] / current_price)
-                if max_quantity > 0:
-                    cost = max_quantity * current_price
-                    old_shares = position["long"]
-                    old_cost_basis = position["long_cost_basis"]
-                    total_shares = old_shares + max_quantity
-
-                    if total_shares > 0:
-                        total_old_cost = old_cost_basis * old_shares
-                        total_new_cost = cost
-                        position["long_cost_basis"] = (total_old_cost + total_new_cost) / total_shares
-
-                    position["long"] += max_quantity
-                    self.portfolio["cash"] -= cost
-                    return max_quantity
-                return 0
-
-        elif action == "sell":
-            # You can only sell as many as you own
-            quantity = min(quantity, position["long"])
-            if quantity > 0:
-                # Realized gain/loss using average cost basis
-                avg_cost_per_share = position["long_cost_basis"] if position["long"] > 0 else 0
-                realized_gain = (current_price - avg_cost_per_share) * quantity
-                self.portfolio["realized_gains"][ticker]["long"] += realized_gain
-
-                position["long"] -= quantity
-                self.portfolio["cash"] += quantity * current_price
-
-                if position["long"] == 0:
-                    position["long_cost_basis"] = 0.0
-
-                return quantity
-
-        elif action == "short":
-            """
-            Typical short sale flow:
-              1) Receive proceeds = current_price * quantity
-              2) Post margin_required = proceeds * margin_ratio
-              3) Net effect on cash = +proceeds - margin_required
-            """
-            proceeds = current_price * quantity
-            margin_required = proceeds * self.portfolio["margin_requirement"]
-            if margin_required <= self.portfolio["cash"]:
-                # Weighted average short cost basis
-                old_short_shares = position["short"]
-                old_cost_basis = position["short_cost_basis"]
-                new_shares = quantity
-                total_shares = old_short_shares + new_shares
-
-                if total_shares > 0:
-                    total_old_cost = old_cost_basis * old_short_shares
-                    total_new_cost = current_price * new_shares
-                    position["short_cost_basis"] = (total_old_cost + total_new_cost) / total_shares
-
-                position["short"] += quantity
-
-                # Update margin usage
-                position["short_margin_used"] += margin_required
-                self.portfolio["margin_used"] += margin_required
-
-                # Increase cash by proceeds, then subtract the required margin
-                self.portfolio["cash"] += proceeds
-                self.portfolio["cash"] -= margin_required
-                return quantity
-            else:
-                # Calculate maximum shortable quantity
-                margin_ratio = self.portfolio["margin_requirement"]
-                if margin_ratio > 0:
-                    max_quantity = int(self.portfolio["cash"] / (current_price * margin_ratio))
-                else:
-                    max_quantity = 0
-
-                if max_quantity > 0:
-                    proceeds = current_price * max_quantity
-                    margin_required = proceeds * margin_ratio
-
-                    old_short_shares = position["short"]
-                    old_cost_basis = position["short_cost_basis"]
-                    total_shares = old_short_shares + max_quantity
-
-                    if total_shares > 0:
-                        total_old_cost = old_cost_basis * old_short_shares
-                        total_new_cost = current_price * max_quantity
-                        position["short_cost_basis"] = (total_old_cost + total_new_cost) / total_shares
-
-                    position["short"] += max_quantity
-                    position["short_margin_used"] += margin_required
-                    self.portfolio["margin_used"] += margin_required
-
-                    self.portfolio["cash"] += proceeds
-                    self.portfolio["cash"] -= margin_required
-                    return max_quantity
-                return 0
-
-        elif action == "cover":
-            """
-            When covering shares:
-              1) Pay cover cost = current_price * quantity
-              2) Release a proportional share of the margin
-              3) Net effect on cash = -cover_cost + released_margin
-            """
-            quantity = min(quantity, position["short"])
-            if quantity > 0:
-                cover_cost = quantity * current_price
-                avg_short_price = position["short_cost_basis"] if position["short"] > 0 else 0
-                realized_gain = (avg_short_price - current_price) * quantity
-
-                if position["short"] > 0:
-                    portion = quantity / position["short"]
-                else:
-                    portion = 1.0
-
-                margin_to_release = portion * position["short_margin_used"]
-
-                position["short"] -= quantity
-                position["short_margin_used"] -= margin_to_release
-                self.portfolio["margin_used"] -= margin_to_release
-
-                # Pay the cost to cover, but get back the released margin
-                self.portfolio["cash"] += margin_to_release
-                self.portfolio["cash"] -= cover_cost
-
-                self.portfolio["realized_gains"][ticker]["short"] += realized_gain
-
-                if position["short"] == 0:
-                    position["short_cost_basis"] = 0.0
-                    position["short_margin_used"] = 0.0
-
-                return quantity
-
-        return 0
+        return self._portfolio.execute_one(self._portfolio.index[ticker], ACTION_CODES.get(action, HOLD), quantity, current_price)
 
     def calculate_portfolio_value(self, current_prices):
         """
@@ -253,21 +149,7 @@ class Backtester:
           - market value of long positions
           - unrealized gains/losses for short positions
         """
-        total_value = self.portfolio["cash"]
-
-        for ticker in self.tickers:
-            position = self.portfolio["positions"][ticker]
-            price = current_prices[ticker]
-
-            # Long position value
-            long_value = position["long"] * price
-            total_value += long_value
-
-            # Short position unrealized PnL = short_shares * (short_cost_basis - current_price)
-            if position["short"] > 0:
-                total_value += position["short"] * (position["short_cost_basis"] - price)
-
-        return total_value
+        return self._portfolio.market_value([current_prices[ticker] for ticker in self.tickers])
 
     def prefetch_data(self):
         """Pre-fetch all data needed for the backtest period."""
@@ -282,8 +164,8 @@ class Backtester:
             # Fetch price data for the entire period, plus 1 year
             get_prices(ticker, start_date_str, self.end_date)
 
-            # Fetch financial metrics
-            get_financial_metrics(ticker, self.end_date, limit=10)
+            # Fetch financial metrics, enough to see every filing in the backtest window
+            get_financial_metrics(ticker, self.end_date, limit=filing_limit(self.start_date, self.end_date))
 
             # Fetch insider trades
             get_insider_trades(ticker, self.end_date, start_date=self.start_date, limit=1000)
@@ -309,7 +191,15 @@ class Backtester:
         self.prefetch_data()
 
         dates = pd.date_range(self.start_date, self.end_date, freq="B")
-        table_rows = []
+
+        # Load every trading day's close prices once instead of querying them day by day
+        with tracer.span("load_prices", category="backtest"):
+            price_panel = PricePanel.load(self.tickers, dates)
+
+        # The agents only run on rebalance days; every other day is marked to market
+        agent_days = self._agent_days(dates, price_panel)
+
+        table_rows = self.table_rows = []
         performance_metrics = {
             'sharpe_ratio': None,
             'sortino_ratio': None,
@@ -319,240 +209,344 @@ class Backtester:
             'net_exposure': None
         }
 
+        # Restore the state after the last completed day if a checkpoint exists
+        checkpoint = self._open_checkpoint()
+        saved_state = checkpoint.load() if checkpoint is not None else None
+        resume_after = None
+        recorder = BacktestRecorder() if self.results_path else None
+        if saved_state is not None:
+            self.portfolio = saved_state["portfolio"]
+            performance_metrics.update(saved_state["performance_metrics"])
+            resume_after = saved_state["last_completed_date"]
+            print(f"\nResuming from checkpoint after {resume_after} ({len(saved_state['portfolio_values'])} days completed)")
+
+            # Replay the completed days into the results
+            if recorder is not None:
+                day_indices = {date.strftime("%Y-%m-%d"): i for i, date in enumerate(dates)}
+                for day in checkpoint.load_days():
+                    day_index = day_indices.get(day["date"])
+                    if day_index is not None and agent_days[day_index]:
+                        recorder.add_day(day["date"], self.tickers, price_panel.prices_on(day_index), day["decisions"], day["executed_trades"], day["analyst_signals"])
+
+        # Phase 1 of a two-phase backtest: compute every analyst signal up front
+        with tracer.span("precompute_signals", category="backtest"):
+            signal_store = self._precompute_signals(dates[agent_days]) if self.signal_store_path else None
+
         print("\nStarting backtest...")
 
-        # Initialize portfolio values list with initial capital
+        # Initialize portfolio values with initial capital, in a buffer sized for the whole date range
+        self.portfolio_values = PortfolioValueSeries.for_dates(dates)
         if len(dates) > 0:
-            self.portfolio_values = [{"Date": dates[0], "Portfolio Value": self.initial_capital}]
-        else:
-            self.portfolio_values = []
+            self.portfolio_values.append(dates[0], self.initial_capital)
+            if saved_state is not None:
+                for value in saved_state["portfolio_values"]:
+                    self.portfolio_values.append_row(value)
 
-        for current_date in dates:
+        # Sharpe, Sortino and drawdown are updated incrementally as each day's value comes in
+        metrics_stream = StreamingPerformanceMetrics()
+        for date, value in zip(self.portfolio_values.dates, self.portfolio_values.column("Portfolio Value")):
+            metrics_stream.add(pd.Timestamp(date), value)
+
+        for day_index, current_date in enumerate(dates):
             lookback_start = (current_date - timedelta(days=30)).strftime("%Y-%m-%d")
             current_date_str = current_date.strftime("%Y-%m-%d")
-            previous_date_str = (current_date - timedelta(days=1)).strftime("%Y-%m-%d")
 
             # Skip if there's no prior day to look back (i.e., first date in the range)
             if lookback_start == current_date_str:
                 continue
 
+            # Skip days already completed in a checkpointed run
+            if resume_after is not None and current_date_str <= resume_after:
+                continue
+
             # Get current prices for all tickers
-            try:
-                current_prices = {}
-                missing_data = False
-                
-                for ticker in self.tickers:
-                    try:
-                        price_data = get_price_data(ticker, previous_date_str, current_date_str)
-                        if price_data.empty:
-                            print(f"Warning: No price data for {ticker} on {current_date_str}")
-                            missing_data = True
-                            break
-                        current_prices[ticker] = price_data.iloc[-1]["close"]
-                    except Exception as e:
-                        print(f"Error fetching price for {ticker} between {previous_date_str} and {current_date_str}: {e}")
-                        missing_data = True
-                        break
-                
-                if missing_data:
-                    print(f"Skipping trading day {current_date_str} due to missing price data")
-                    continue
-                
-            except Exception as e:
-                # If there's a general API error, log it and skip this day
-                print(f"Error fetching prices for {current_date_str}: {e}")
+            if not price_panel.available[day_index]:
+                print(f"Warning: No price data for {', '.join(price_panel.missing_tickers(day_index))} on {current_date_str}")
+                print(f"Skipping trading day {current_date_str} due to missing price data")
                 continue
+            current_prices = price_panel.prices_on(day_index)
+            price_vector = price_panel.closes[day_index]
 
             # ---------------------------------------------------------------
             # 1) Execute the agent's trades
             # ---------------------------------------------------------------
-            output = self.agent(
-                tickers=self.tickers,
-                start_date=lookback_start,
-                end_date=current_date_str,
-                portfolio=self.portfolio,
-                model_name=self.model_name,
-                model_provider=self.model_provider,
-                selected_analysts=self.selected_analysts,
-            )
-            decisions = output["decisions"]
-            analyst_signals = output["analyst_signals"]
-
-            # Execute trades for each ticker
-            executed_trades = {}
-            for ticker in self.tickers:
-                decision = decisions.get(ticker, {"action": "hold", "quantity": 0})
-                action, quantity = decision.get("action", "hold"), decision.get("quantity", 0)
-
-                executed_quantity = self.execute_trade(ticker, action, quantity, current_prices[ticker])
-                executed_trades[ticker] = executed_quantity
+            # Between rebalances the portfolio is only marked to market
+            if not agent_days[day_index]:
+                decisions, analyst_signals = {}, {}
+                executed_trades = {ticker: 0 for ticker in self.tickers}
+            else:
+                # In a two-phase backtest only the risk and portfolio managers run, on the stored signals
+                replay_options = {}
+                if signal_store is not None:
+                    replay_options["analyst_signals"] = signal_store.get_day(current_date_str, self.tickers, self.model_name, self.model_provider, options_hash(self.agent_options), self._analyst_keys())
+
+                with tracer.span("agent", category="backtest"):
+                    output = self.agent(
+                        tickers=self.tickers,
+                        start_date=lookback_start,
+                        end_date=current_date_str,
+                        portfolio=self.portfolio,
+                        model_name=self.model_name,
+                        model_provider=self.model_provider,
+                        selected_analysts=self.selected_analysts,
+                        **self.agent_options,
+                        **replay_options,
+                    )
+                decisions = output["decisions"]
+                analyst_signals = output["analyst_signals"]
+
+                # Execute the day's trades for all tickers at once
+                with tracer.span("execution", category="backtest"):
+                    actions = np.zeros(len(self.tickers), dtype=np.int64)
+                    quantities = np.zeros(len(self.tickers))
+                    for i, ticker in enumerate(self.tickers):
+                        decision = decisions.get(ticker, {"action": "hold", "quantity": 0})
+                        actions[i] = ACTION_CODES.get(decision.get("action", "hold"), HOLD)
+                        quantities[i] = decision.get("quantity", 0)
+                    executed_trades = dict(zip(self.tickers, self._portfolio.execute(actions, quantities, price_vector).tolist()))
+
+                if recorder is not None:
+                    recorder.add_day(current_date_str, self.tickers, current_prices, decisions, executed_trades, analyst_signals)
 
             # ---------------------------------------------------------------
             # 2) Now that trades have executed trades, recalculate the final
             #    portfolio value for this day.
             # ---------------------------------------------------------------
-            total_value = self.calculate_portfolio_value(current_prices)
+            with tracer.span("valuation", category="backtest"):
+                total_value = self._portfolio.market_value(price_vector)
 
-            # Also compute long/short exposures for final post‐trade state
-            long_exposure = sum(
-                self.portfolio["positions"][t]["long"] * current_prices[t]
-                for t in self.tickers
-            )
-            short_exposure = sum(
-                self.portfolio["positions"][t]["short"] * current_prices[t]
-                for t in self.tickers
-            )
+                # Also compute long/short exposures for final post‐trade state
+                long_exposure, short_exposure = self._portfolio.exposures(price_vector)
 
-            # Calculate gross and net exposures
-            gross_exposure = long_exposure + short_exposure
-            net_exposure = long_exposure - short_exposure
-            long_short_ratio = (
-                long_exposure / short_exposure if short_exposure > 1e-9 else float('inf')
-            )
+                # Calculate gross and net exposures
+                gross_exposure = long_exposure + short_exposure
+                net_exposure = long_exposure - short_exposure
+                long_short_ratio = (
+                    long_exposure / short_exposure if short_exposure > 1e-9 else float('inf')
+                )
 
-            # Track each day's portfolio value in self.portfolio_values
-            self.portfolio_values.append({
-                "Date": current_date,
-                "Portfolio Value": total_value,
-                "Long Exposure": long_exposure,
-                "Short Exposure": short_exposure,
-                "Gross Exposure": gross_exposure,
-                "Net Exposure": net_exposure,
-                "Long/Short Ratio": long_short_ratio
-            })
+                # Track each day's portfolio value in self.portfolio_values
+                self.portfolio_values.append(current_date, total_value, long_exposure, short_exposure, gross_exposure, net_exposure, long_short_ratio)
 
             # ---------------------------------------------------------------
             # 3) Build the table rows to display
             # ---------------------------------------------------------------
-            date_rows = []
-
-            # For each ticker, record signals/trades
-            for ticker in self.tickers:
-                ticker_signals = {}
-                for agent_name, signals in analyst_signals.items():
-                    if ticker in signals:
-                        ticker_signals[agent_name] = signals[ticker]
-
-                bullish_count = len([s for s in ticker_signals.values() if s.get("signal", "").lower() == "bullish"])
-                bearish_count = len([s for s in ticker_signals.values() if s.get("signal", "").lower() == "bearish"])
-                neutral_count = len([s for s in ticker_signals.values() if s.get("signal", "").lower() == "neutral"])
-
-                # Calculate net position value
-                pos = self.portfolio["positions"][ticker]
-                long_val = pos["long"] * current_prices[ticker]
-                short_val = pos["short"] * current_prices[ticker]
-                net_position_value = long_val - short_val
-
-                # Get the action and quantity from the decisions
-                action = decisions.get(ticker, {}).get("action", "hold")
-                quantity = executed_trades.get(ticker, 0)
+            with tracer.span("output", category="backtest"):
+                date_rows = []
+                portfolio = self.portfolio
+
+                # For each ticker, record signals/trades
+                for ticker in self.tickers:
+                    ticker_signals = {}
+                    for agent_name, signals in analyst_signals.items():
+                        if ticker in signals:
+                            ticker_signals[agent_name] = signals[ticker]
+
+                    bullish_count = len([s for s in ticker_signals.values() if s.get("signal", "").lower() == "bullish"])
+                    bearish_count = len([s for s in ticker_signals.values() if s.get("signal", "").lower() == "bearish"])
+                    neutral_count = len([s for s in ticker_signals.values() if s.get("signal", "").lower() == "neutral"])
+
+                    # Calculate net position value
+                    pos = portfolio["positions"][ticker]
+                    long_val = pos["long"] * current_prices[ticker]
+                    short_val = pos["short"] * current_prices[ticker]
+                    net_position_value = long_val - short_val
+
+                    # Get the action and quantity from the decisions
+                    action = decisions.get(ticker, {}).get("action", "hold")
+                    quantity = executed_trades.get(ticker, 0)
                 
-                # Append the agent action to the table rows
+                    # Append the agent action to the table rows
+                    date_rows.append(
+                        BacktestRow(
+                            date=current_date_str,
+                            ticker=ticker,
+                            action=action,
+                            quantity=quantity,
+                            price=current_prices[ticker],
+                            shares_owned=pos["long"] - pos["short"],  # net shares
+                            position_value=net_position_value,
+                            bullish_count=bullish_count,
+                            bearish_count=bearish_count,
+                            neutral_count=neutral_count,
+                        )
+                    )
+                # ---------------------------------------------------------------
+                # 4) Calculate performance summary metrics
+                # ---------------------------------------------------------------
+                # Calculate portfolio return vs. initial capital
+                # The realized gains are already reflected in cash balance, so we don't add them separately
+                portfolio_return = (total_value / self.initial_capital - 1) * 100
+
+                # Add summary row for this day
                 date_rows.append(
-                    format_backtest_row(
+                    BacktestRow(
                         date=current_date_str,
-                        ticker=ticker,
-                        action=action,
-                        quantity=quantity,
-                        price=current_prices[ticker],
-                        shares_owned=pos["long"] - pos["short"],  # net shares
-                        position_value=net_position_value,
-                        bullish_count=bullish_count,
-                        bearish_count=bearish_count,
-                        neutral_count=neutral_count,
-                    )
+                        ticker="",
+                        action="",
+                        quantity=0,
+                        price=0,
+                        shares_owned=0,
+                        position_value=0,
+                        bullish_count=0,
+                        bearish_count=0,
+                        neutral_count=0,
+                        is_summary=True,
+                        total_value=total_value,
+                        return_pct=portfolio_return,
+                        cash_balance=portfolio["cash"],
+                        total_position_value=total_value - portfolio["cash"],
+                        sharpe_ratio=performance_metrics["sharpe_ratio"],
+                        sortino_ratio=performance_metrics["sortino_ratio"],
+                        max_drawdown=performance_metrics["max_drawdown"],
+                    ),
                 )
-            # ---------------------------------------------------------------
-            # 4) Calculate performance summary metrics
-            # ---------------------------------------------------------------
-            # Calculate portfolio return vs. initial capital
-            # The realized gains are already reflected in cash balance, so we don't add them separately
-            portfolio_return = (total_value / self.initial_capital - 1) * 100
-
-            # Add summary row for this day
-            date_rows.append(
-                format_backtest_row(
-                    date=current_date_str,
-                    ticker="",
-                    action="",
-                    quantity=0,
-                    price=0,
-                    shares_owned=0,
-                    position_value=0,
-                    bullish_count=0,
-                    bearish_count=0,
-                    neutral_count=0,
-                    is_summary=True,
-                    total_value=total_value,
-                    return_pct=portfolio_return,
-                    cash_balance=self.portfolio["cash"],
-                    total_position_value=total_value - self.portfolio["cash"],
-                    sharpe_ratio=performance_metrics["sharpe_ratio"],
-                    sortino_ratio=performance_metrics["sortino_ratio"],
-                    max_drawdown=performance_metrics["max_drawdown"],
-                ),
-            )
 
-            table_rows.extend(date_rows)
-            print_backtest_results(table_rows)
+                table_rows.extend(date_rows)
+                print_backtest_results(table_rows, mode=self.output_mode, tail_days=self.output_tail_days)
 
             # Update performance metrics if we have enough data
-            if len(self.portfolio_values) > 3:
-                self._update_performance_metrics(performance_metrics)
+            with tracer.span("metrics", category="backtest"):
+                metrics_stream.add(current_date, total_value)
+                if len(self.portfolio_values) > 3:
+                    metrics_stream.update(performance_metrics)
+
+            if checkpoint is not None:
+                with tracer.span("checkpoint", category="backtest"):
+                    checkpoint.save_day(
+                        date=current_date_str,
+                        portfolio=portfolio,
+                        portfolio_value=self.portfolio_values[-1],
+                        performance_metrics=performance_metrics,
+                        analyst_signals=analyst_signals,
+                        decisions=decisions,
+                        executed_trades=executed_trades,
+                    )
+
+        # "tail" and "new" only showed part of the table, so show it all once at the end
+        if self.output_mode in ("tail", "new"):
+            with tracer.span("output", category="backtest"):
+                print_backtest_results(table_rows, mode="full", clear_screen=False)
+
+        if checkpoint is not None:
+            checkpoint.close()
+        if signal_store is not None:
+            signal_store.close()
 
         # Store the final performance metrics for reference in analyze_performance
         self.performance_metrics = performance_metrics
-        return performance_metrics
 
-    def _update_performance_metrics(self, performance_metrics):
-        """Helper method to update performance metrics using daily returns."""
-        values_df = pd.DataFrame(self.portfolio_values).set_index("Date")
-        values_df["Daily Return"] = values_df["Portfolio Value"].pct_change()
-        clean_returns = values_df["Daily Return"].dropna()
+        # Confidence intervals for the metrics from resampling the daily returns
+        with tracer.span("bootstrap", category="backtest"):
+            self.bootstrap = bootstrap_performance(
+                self.portfolio_values.column("Portfolio Value"),
+                n_resamples=self.bootstrap_resamples,
+                block_length=self.bootstrap_block_length,
+            )
 
-        if len(clean_returns) < 2:
-            return  # not enough data points
+        if recorder is not None:
+            with tracer.span("write_results", category="backtest"):
+                recorder.write(self.results_path, self.portfolio_values, self._results_metadata(), format=self.results_format)
+            print(f"Backtest results written to {self.results_path}")
+        return performance_metrics
 
-        # Assumes 252 trading days/year
-        daily_risk_free_rate = 0.0434 / 252
-        excess_returns = clean_returns - daily_risk_free_rate
-        mean_excess_return = excess_returns.mean()
-        std_excess_return = excess_returns.std()
+    def _results_metadata(self) -> dict:
+        """The configuration and final metrics stored with the results tables."""
+        return {
+            "tickers": self.tickers,
+            "start_date": self.start_date,
+            "end_date": self.end_date,
+            "initial_capital": self.initial_capital,
+            "margin_requirement": self.portfolio["margin_requirement"],
+            "model_name": self.model_name,
+            "model_provider": self.model_provider,
+            "selected_analysts": self.selected_analysts,
+            "rebalance_frequency": self.rebalance_frequency,
+            "performance_metrics": self.performance_metrics,
+            "bootstrap": self.bootstrap,
+        }
 
-        # Sharpe ratio
-        if std_excess_return > 1e-12:
-            performance_metrics["sharpe_ratio"] = np.sqrt(252) * (mean_excess_return / std_excess_return)
-        else:
-            performance_metrics["sharpe_ratio"] = 0.0
-
-        # Sortino ratio
-        negative_returns = excess_returns[excess_returns < 0]
-        if len(negative_returns) > 0:
-            downside_std = negative_returns.std()
-            if downside_std > 1e-12:
-                performance_metrics["sortino_ratio"] = np.sqrt(252) * (mean_excess_return / downside_std)
-            else:
-                performance_metrics["sortino_ratio"] = float('inf') if mean_excess_return > 0 else 0
-        else:
-            performance_metrics["sortino_ratio"] = float('inf') if mean_excess_return > 0 else 0
+    def _agent_days(self, dates: pd.DatetimeIndex, price_panel: PricePanel) -> np.ndarray:
+        """
+        Flag the days the agents run on: each scheduled rebalance day, or the next day
+        with prices if a scheduled day has none.
+        """
+        filings = filing_dates(self.tickers, self.end_date, self.start_date) if self.rebalance_frequency == "filings" else ()
+        scheduled = rebalance_mask(dates, self.rebalance_frequency, filings)
+
+        agent_days = np.zeros(len(dates), dtype=bool)
+        pending = False
+        for day_index in range(len(dates)):
+            pending |= bool(scheduled[day_index])
+            if pending and price_panel.available[day_index]:
+                agent_days[day_index] = True
+                pending = False
+
+        if self.rebalance_frequency != "daily":
+            print(f"Rebalancing {self.rebalance_frequency}: agents run on {agent_days.sum()} of {price_panel.available.sum()} trading days")
+        return agent_days
+
+    def _analyst_keys(self) -> list[str]:
+        """The selected analysts (all analysts when none are selected)."""
+        return list(self.selected_analysts) if self.selected_analysts else list(ANALYST_CONFIG)
+
+    def _precompute_signals(self, dates: pd.DatetimeIndex) -> SignalStore:
+        """
+        Compute and store the analyst signals for every (date, ticker, analyst) not yet in the signal store,
+        running each analyst on all of a day's missing tickers in one call.
+        """
+        store = SignalStore(self.signal_store_path)
 
-        # Maximum drawdown (ensure it's stored as a negative percentage)
-        rolling_max = values_df["Portfolio Value"].cummax()
-        drawdown = (values_df["Portfolio Value"] - rolling_max) / rolling_max
-        
-        if len(drawdown) > 0:
-            min_drawdown = drawdown.min()
-            # Store as a negative percentage
-            performance_metrics["max_drawdown"] = min_drawdown * 100
-            
-            # Store the date of max drawdown for reference
-            if min_drawdown < 0:
-                performance_metrics["max_drawdown_date"] = drawdown.idxmin().strftime('%Y-%m-%d')
-            else:
-                performance_metrics["max_drawdown_date"] = None
-        else:
-            performance_metrics["max_drawdown"] = 0.0
-            performance_metrics["max_drawdown_date"] = None
+        def run_analyst(date: str, tickers: list[str], analyst: str) -> dict:
+            lookback_start = (pd.Timestamp(date) - timedelta(days=30)).strftime("%Y-%m-%d")
+            output = self.agent(
+                tickers=tickers,
+                start_date=lookback_start,
+                end_date=date,
+                portfolio=self.portfolio,
+                model_name=self.model_name,
+                model_provider=self.model_provider,
+                selected_analysts=[analyst],
+                analysts_only=True,
+                **self.agent_options,
+            )
+            return output["analyst_signals"]
+
+        def report(done: int, total: int):
+            print(f"\rComputing analyst signals: {done}/{total}", end="" if done < total else "\n", flush=True)
+
+        tasks = [(date.strftime("%Y-%m-%d"), ticker, analyst) for date in dates for ticker in self.tickers for analyst in self._analyst_keys()]
+        print(f"\nPrecomputing analyst signals with {self.signal_workers} workers...")
+        computed = precompute_signals(
+            store,
+            run_analyst,
+            tasks,
+            self.model_name,
+            self.model_provider,
+            options_hash(self.agent_options),
+            max_workers=self.signal_workers,
+            on_progress=report,
+        )
+        print(f"Analyst signals ready ({computed} computed, {len(tasks) - computed} reused from {self.signal_store_path}).")
+        return store
+
+    def _open_checkpoint(self) -> BacktestCheckpoint | None:
+        """Open the checkpoint store for this backtest's configuration, if checkpointing is enabled."""
+        if not self.checkpoint_path:
+            return None
+        config = {
+            "tickers": self.tickers,
+            "start_date": self.start_date,
+            "end_date": self.end_date,
+            "initial_capital": self.initial_capital,
+            "margin_requirement": self.portfolio["margin_requirement"],
+            "model_name": self.model_name,
+            "model_provider": self.model_provider,
+            "selected_analysts": self.selected_analysts,
+            "rebalance_frequency": self.rebalance_frequency,
+            "agent_options": self.agent_options,
+        }
+        return BacktestCheckpoint(self.checkpoint_path, config)
 
     def analyze_performance(self):
         """Creates a performance DataFrame, prints summary stats, and plots equity curve."""
@@ -560,7 +554,7 @@ class Backtester:
             print("No portfolio data found. Please run the backtest first.")
             return pd.DataFrame()
 
-        performance_df = pd.DataFrame(self.portfolio_values).set_index("Date")
+        performance_df = self.portfolio_values.to_frame()
         if performance_df.empty:
             print("No valid performance data to analyze.")
             return performance_df
@@ -579,7 +573,9 @@ class Backtester:
         )
         print(f"Total Realized Gains/Losses: {Fore.GREEN if total_realized_gains >= 0 else Fore.RED}${total_realized_gains:,.2f}{Style.RESET_ALL}")
 
-        # Plot the portfolio value over time
+        # Plot the portfolio value over time (matplotlib is slow to import, so load it only here)
+        import matplotlib.pyplot as plt
+
         plt.figure(figsize=(12, 6))
         plt.plot(performance_df.index, performance_df["Portfolio Value"], color="blue")
         plt.title("Portfolio Value Over Time")
@@ -646,6 +642,9 @@ class Backtester:
         print(f"Max Consecutive Wins: {Fore.GREEN}{max_consecutive_wins}{Style.RESET_ALL}")
         print(f"Max Consecutive Losses: {Fore.RED}{max_consecutive_losses}{Style.RESET_ALL}")
 
+        if self.bootstrap is not None:
+            print_bootstrap_result(self.bootstrap)
+
         return performance_df
 
 
@@ -682,11 +681,174 @@ if __name__ == "__main__":
         "--margin-requirement",
         type=float,
         default=0.0,
-        help="Margin ratio for short positions, e.g. 0.5 for 50% (default: 0.0)",
+        help="Margin ratio for short positions, e.g. 0.5 for 50%% (default: 0.0)",
+    )
+    parser.add_argument(
+        "--rebalance",
+        type=str,
+        choices=list(REBALANCE_FREQUENCIES),
+        default="daily",
+        help="Run the agents daily (default), weekly, monthly or when new filings are reported; positions are marked to market daily",
+    )
+    parser.add_argument(
+        "--bootstrap-resamples",
+        type=int,
+        default=2000,
+        help="Block bootstrap resamples for confidence intervals of Sharpe, Sortino, max drawdown and terminal value (default: 2000, 0 disables)",
+    )
+    parser.add_argument(
+        "--bootstrap-block-length",
+        type=int,
+        help="Bootstrap block length in days (default: cube root of the number of daily returns)",
+    )
+    parser.add_argument(
+        "--results",
+        type=str,
+        help="Directory to write daily portfolio values, exposures, trades and analyst signals to as columnar tables (needs pyarrow: poetry install --with results)",
+    )
+    parser.add_argument(
+        "--results-format",
+        type=str,
+        choices=list(RESULTS_FORMATS),
+        default="parquet",
+        help="Format of the --results tables: parquet (default) or arrow (Arrow IPC)",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        type=str,
+        help="SQLite file to checkpoint each completed day to; rerunning with the same file resumes after the last completed day",
+    )
+    parser.add_argument(
+        "--output-mode",
+        type=str,
+        choices=list(BACKTEST_OUTPUT_MODES),
+        default="full",
+        help="Daily output: full history (default), a tail of recent days, only new rows, or quiet",
+    )
+    parser.add_argument(
+        "--output-tail-days",
+        type=int,
+        default=5,
+        help="Days shown with --output-mode tail (default: 5)",
+    )
+    parser.add_argument(
+        "--signal-store",
+        type=str,
+        help="SQLite file of precomputed analyst signals; computes missing signals in parallel first, then replays the portfolio logic over them",
+    )
+    parser.add_argument(
+        "--signal-workers",
+        type=int,
+        default=8,
+        help="Worker threads for precomputing analyst signals with --signal-store (default: 8)",
+    )
+    parser.add_argument(
+        "--llm-batch-size",
+        type=int,
+        default=1,
+        help="Number of tickers each persona analyzes per LLM call (default: 1, one call per ticker)",
+    )
+    parser.add_argument(
+        "--skip-llm-when-decisive",
+        action="store_true",
+        help="Use a rule-based signal instead of the LLM when a persona's deterministic score is decisive",
+    )
+    parser.add_argument(
+        "--decisive-bullish-threshold",
+        type=float,
+        default=0.8,
+        help="Score ratio (score / max score) at or above which a bullish signal is decisive (default: 0.8)",
+    )
+    parser.add_argument(
+        "--decisive-bearish-threshold",
+        type=float,
+        default=0.2,
+        help="Score ratio at or below which a bearish signal is decisive (default: 0.2)",
+    )
+    parser.add_argument(
+        "--llm-timeout",
+        type=float,
+        help="Seconds an LLM call may take, retries included, before the agent falls back to its default response",
+    )
+    parser.add_argument(
+        "--llm-hedge-model",
+        type=str,
+        help="Backup model (from the available models) to send a second request to when the first is slow",
+    )
+    parser.add_argument(
+        "--llm-hedge-after",
+        type=float,
+        help="Seconds to wait for a response before hedging to --llm-hedge-model (default: half of --llm-timeout)",
+    )
+    parser.add_argument(
+        "--run-timeout",
+        type=float,
+        help="Deadline in seconds for each trading day's agent run; agents still waiting on the LLM fall back to their defaults",
+    )
+    parser.add_argument(
+        "--slim-messages",
+        action="store_true",
+        help="Keep agent outputs only in the graph's data; messages carry a reference and a signal summary instead of the full JSON",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Trace graph nodes, data fetches and LLM calls and print a timing summary with the critical path",
+    )
+    parser.add_argument(
+        "--profile-trace",
+        type=str,
+        help="With --profile, also write the spans to this path as Chrome trace JSON (chrome://tracing or Perfetto)",
+    )
+    parser.add_argument(
+        "--progress",
+        type=str,
+        choices=["auto", "live", "headless"],
+        default="auto",
+        help="Agent progress display: live table, headless (no rendering) or auto (live only in a terminal)",
+    )
+    parser.add_argument(
+        "--progress-log",
+        type=str,
+        help="Append every agent status update to this path as JSON lines",
+    )
+    parser.add_argument(
+        "--llm-metrics",
+        type=str,
+        help="Write a JSONL record of every LLM call (agent, ticker, tokens, latency) to this path",
+    )
+    parser.add_argument(
+        "--llm-cache",
+        type=str,
+        help="Path to a persistent LLM response cache (SQLite). Disabled if omitted",
+    )
+    parser.add_argument(
+        "--llm-cache-read-only",
+        action="store_true",
+        help="Serve from the LLM cache without writing new entries (reproducible benchmarks)",
+    )
+    parser.add_argument(
+        "--llm-cache-max-entries",
+        type=int,
+        default=100_000,
+        help="Maximum number of cached LLM responses before eviction (default: 100000)",
+    )
+    parser.add_argument(
+        "--llm-cache-max-bytes",
+        type=int,
+        help="Maximum total size in bytes of the cached LLM responses before eviction (default: unlimited)",
     )
 
     args = parser.parse_args()
 
+    configure_llm_cache(args.llm_cache, read_only=args.llm_cache_read_only, max_entries=args.llm_cache_max_entries, max_bytes=args.llm_cache_max_bytes)
+    progress.configure(args.progress)
+    if args.profile:
+        tracer.enable()
+    if args.progress_log:
+        # Close the event log however the run ends (including the early exits below)
+        atexit.register(progress.log_to_file(args.progress_log))
+
     # Parse tickers from comma-separated string
     tickers = [ticker.strip() for ticker in args.tickers.split(",")] if args.tickers else []
 
@@ -752,7 +914,35 @@ if __name__ == "__main__":
         model_provider=model_provider,
         selected_analysts=selected_analysts,
         initial_margin_requirement=args.margin_requirement,
+        checkpoint_path=args.checkpoint,
+        signal_store_path=args.signal_store,
+        signal_workers=args.signal_workers,
+        output_mode=args.output_mode,
+        output_tail_days=args.output_tail_days,
+        rebalance_frequency=args.rebalance,
+        bootstrap_resamples=args.bootstrap_resamples,
+        bootstrap_block_length=args.bootstrap_block_length,
+        results_path=args.results,
+        results_format=args.results_format,
+        agent_options={
+            "llm_batch_size": args.llm_batch_size,
+            "decisive_thresholds": (args.decisive_bearish_threshold, args.decisive_bullish_threshold) if args.skip_llm_when_decisive else None,
+            "llm_timeout": args.llm_timeout,
+            "llm_hedge_model": args.llm_hedge_model,
+            "llm_hedge_after": args.llm_hedge_after,
+            "run_timeout": args.run_timeout,
+            "slim_messages": args.slim_messages,
+        },
     )
 
     performance_metrics = backtester.run_backtest()
     performance_df = backtester.analyze_performance()
+
+    llm_metrics.print_summary()
+    if args.llm_metrics:
+        llm_metrics.export_jsonl(args.llm_metrics)
+
+    if args.profile:
+        tracer.print_summary()
+        if args.profile_trace:
+            tracer.export_chrome_trace(args.profile_trace)
@@ -0,0 +1 @@
+"""Building blocks for the backtester: persistence, price data, metrics and portfolio accounting."""
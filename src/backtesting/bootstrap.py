@@ -0,0 +1,157 @@
+from typing import Optional
+
+import numpy as np
+from colorama import Fore, Style
+from pydantic import BaseModel
+from tabulate import tabulate
+
+from backtesting.metrics import DAILY_RISK_FREE_RATE, TRADING_DAYS_PER_YEAR
+
+# Resampled return paths per batch, to bound memory for long series
+BATCH_ELEMENTS = 2_000_000
+
+
+class BootstrapInterval(BaseModel):
+    """Point estimate and bootstrap confidence interval of a performance metric."""
+    metric: str
+    estimate: float
+    lower: float
+    upper: float
+    std: float
+
+
+class BootstrapResult(BaseModel):
+    """Confidence intervals from a block bootstrap of a backtest's daily returns."""
+    n_returns: int
+    n_resamples: int
+    block_length: int
+    confidence: float
+    intervals: dict[str, BootstrapInterval]
+
+
+def path_metrics(returns: np.ndarray, initial_value: float) -> dict[str, np.ndarray]:
+    """
+    Sharpe, Sortino, max drawdown (negative, in percent) and terminal value of each row of
+    a (paths × days) array of daily returns, computed the way the backtester reports them.
+    """
+    returns = np.atleast_2d(returns)
+    n = returns.shape[1]
+    excess = returns - DAILY_RISK_FREE_RATE
+    mean = excess.mean(axis=1)
+    std = excess.std(axis=1, ddof=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = np.where(std > 1e-12, np.sqrt(TRADING_DAYS_PER_YEAR) * mean / std, 0.0)
+
+        # Downside deviation: sample std of the negative excess returns only
+        negative = excess < 0
+        n_negative = negative.sum(axis=1)
+        negative_mean = np.where(negative, excess, 0.0).sum(axis=1) / np.maximum(n_negative, 1)
+        downside_var = np.where(negative, (excess - negative_mean[:, None]) ** 2, 0.0).sum(axis=1) / (n_negative - 1)
+        downside_std = np.sqrt(np.where(n_negative > 1, downside_var, np.nan))
+        fallback = np.where(mean > 0, np.inf, 0.0)
+        sortino = np.where(downside_std > 1e-12, np.sqrt(TRADING_DAYS_PER_YEAR) * mean / downside_std, fallback)
+
+    # Equity curve, including the starting value, for the drawdown from the running peak
+    equity = initial_value * np.cumprod(1 + returns, axis=1)
+    equity = np.concatenate((np.full((returns.shape[0], 1), float(initial_value)), equity), axis=1)
+    peak = np.maximum.accumulate(equity, axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        max_drawdown = ((equity - peak) / peak).min(axis=1) * 100
+
+    return {
+        "sharpe_ratio": sharpe,
+        "sortino_ratio": sortino,
+        "max_drawdown": max_drawdown,
+        "terminal_value": equity[:, n],
+    }
+
+
+def block_bootstrap_indices(n: int, n_resamples: int, block_length: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Indices of `n_resamples` circular block bootstrap samples of a length-`n` series:
+    each sample joins blocks of `block_length` consecutive days (wrapping around the
+    end), which keeps the short-range autocorrelation of the returns.
+    """
+    n_blocks = -(-n // block_length)
+    starts = rng.integers(0, n, size=(n_resamples, n_blocks))
+    indices = (starts[:, :, None] + np.arange(block_length)) % n
+    return indices.reshape(n_resamples, n_blocks * block_length)[:, :n]
+
+
+def bootstrap_performance(
+    portfolio_values: np.ndarray,
+    n_resamples: int = 2000,
+    block_length: Optional[int] = None,
+    confidence: float = 0.95,
+    seed: Optional[int] = None,
+) -> Optional[BootstrapResult]:
+    """
+    Block-bootstrap confidence intervals for Sharpe, Sortino, max drawdown and terminal value.
+
+    Daily returns are taken from the portfolio value series, resampled in blocks
+    (default length: the cube root of the number of returns), and every metric is
+    computed for all resamples at once in batched NumPy. Returns None if there are
+    fewer than three returns.
+    """
+    values = np.asarray(portfolio_values, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = values[1:] / values[:-1] - 1
+    returns = returns[np.isfinite(returns)]
+    n = len(returns)
+    if n < 3 or n_resamples <= 0:
+        return None
+
+    block_length = int(block_length or max(1, round(n ** (1 / 3))))
+    block_length = min(block_length, n)
+    rng = np.random.default_rng(seed)
+    initial_value = values[0]
+
+    batch_size = max(1, BATCH_ELEMENTS // n)
+    samples = {}
+    for start in range(0, n_resamples, batch_size):
+        size = min(batch_size, n_resamples - start)
+        resampled = returns[block_bootstrap_indices(n, size, block_length, rng)]
+        for metric, batch in path_metrics(resampled, initial_value).items():
+            samples.setdefault(metric, []).append(batch)
+
+    estimates = path_metrics(returns, initial_value)
+    alpha = (1 - confidence) / 2
+    intervals = {}
+    for metric, batches in samples.items():
+        resampled = np.concatenate(batches)
+        finite = resampled[np.isfinite(resampled)]
+        lower, upper = np.quantile(finite, [alpha, 1 - alpha]) if len(finite) else (np.nan, np.nan)
+        intervals[metric] = BootstrapInterval(
+            metric=metric,
+            estimate=float(estimates[metric][0]),
+            lower=float(lower),
+            upper=float(upper),
+            std=float(finite.std(ddof=1)) if len(finite) > 1 else float("nan"),
+        )
+
+    return BootstrapResult(n_returns=n, n_resamples=n_resamples, block_length=block_length, confidence=confidence, intervals=intervals)
+
+
+def print_bootstrap_result(result: BootstrapResult):
+    """Print the estimates and confidence intervals."""
+    labels = {
+        "sharpe_ratio": ("Sharpe Ratio", "{:.2f}"),
+        "sortino_ratio": ("Sortino Ratio", "{:.2f}"),
+        "max_drawdown": ("Max Drawdown", "{:.2f}%"),
+        "terminal_value": ("Terminal Value", "${:,.2f}"),
+    }
+    table = [
+        [
+            f"{Fore.CYAN}{label}{Style.RESET_ALL}",
+            fmt.format(result.intervals[metric].estimate),
+            f"{Fore.YELLOW}{fmt.format(result.intervals[metric].lower)}{Style.RESET_ALL}",
+            f"{Fore.YELLOW}{fmt.format(result.intervals[metric].upper)}{Style.RESET_ALL}",
+        ]
+        for metric, (label, fmt) in labels.items()
+        if metric in result.intervals
+    ]
+    print(
+        f"\n{Fore.WHITE}{Style.BRIGHT}BOOTSTRAP {result.confidence:.0%} CONFIDENCE INTERVALS{Style.RESET_ALL} "
+        f"({result.n_resamples:,} resamples, block length {result.block_length}, {result.n_returns} daily returns):"
+    )
+    print(tabulate(table, headers=["Metric", "Estimate", "Lower", "Upper"], tablefmt="grid", colalign=("left", "right", "right", "right")))
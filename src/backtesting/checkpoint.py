@@ -0,0 +1,140 @@
+import json
+import os
+import sqlite3
+import threading
+from typing import Any, Optional
+
+import pandas as pd
+
+
+def to_json(value: Any) -> str:
+    """Serialize backtest state, converting NumPy scalars and Timestamps."""
+    def default(obj):
+        if isinstance(obj, pd.Timestamp):
+            return obj.isoformat()
+        if hasattr(obj, "item"):  # NumPy scalar
+            return obj.item()
+        if hasattr(obj, "model_dump"):
+            return obj.model_dump()
+        return str(obj)
+
+    return json.dumps(value, default=default)
+
+
+class BacktestCheckpoint:
+    """
+    Durable per-day checkpoint of a backtest in a SQLite file.
+
+    After each completed trading day the portfolio, that day's `portfolio_values` row,
+    the performance metrics and the day's analyst signals and decisions are written in
+    a single transaction, so a crash leaves the store at the last completed day. A
+    later run with the same configuration resumes from there instead of starting over.
+    """
+
+    def __init__(self, path: str, config: dict[str, Any]):
+        self.path = path
+        self.config = config
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS days (
+                date TEXT PRIMARY KEY,
+                portfolio_value TEXT NOT NULL,
+                analyst_signals TEXT NOT NULL,
+                decisions TEXT NOT NULL,
+                executed_trades TEXT NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+        stored_config = self._get_state("config")
+        if stored_config is None:
+            self._set_state("config", config)
+            self._conn.commit()
+        elif stored_config != json.loads(to_json(config)):
+            raise ValueError(f"Checkpoint at {path} was written by a different backtest configuration: {stored_config}")
+
+    def _get_state(self, key: str) -> Optional[Any]:
+        row = self._conn.execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _set_state(self, key: str, value: Any):
+        self._conn.execute("INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)", (key, to_json(value)))
+
+    @property
+    def last_completed_date(self) -> Optional[str]:
+        """The last trading day (YYYY-MM-DD) fully recorded, or None for a fresh checkpoint."""
+        with self._lock:
+            return self._get_state("last_completed_date")
+
+    def save_day(
+        self,
+        date: str,
+        portfolio: dict[str, Any],
+        portfolio_value: dict[str, Any],
+        performance_metrics: dict[str, Any],
+        analyst_signals: dict[str, Any],
+        decisions: dict[str, Any],
+        executed_trades: dict[str, int],
+    ):
+        """Atomically record a completed trading day and the state after it."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO days (date, portfolio_value, analyst_signals, decisions, executed_trades) VALUES (?, ?, ?, ?, ?)",
+                (date, to_json(portfolio_value), to_json(analyst_signals), to_json(decisions), to_json(executed_trades)),
+            )
+            self._set_state("portfolio", portfolio)
+            self._set_state("performance_metrics", performance_metrics)
+            self._set_state("last_completed_date", date)
+            self._conn.commit()
+
+    def load(self) -> Optional[dict[str, Any]]:
+        """
+        Load the state to resume from: the portfolio, the recorded `portfolio_values`
+        rows (with `Date` restored as a Timestamp), the performance metrics and the last
+        completed date. Returns None if no day has been completed yet.
+        """
+        with self._lock:
+            last_completed_date = self._get_state("last_completed_date")
+            if last_completed_date is None:
+                return None
+
+            rows = self._conn.execute("SELECT portfolio_value FROM days ORDER BY date").fetchall()
+            portfolio_values = []
+            for (row,) in rows:
+                value = json.loads(row)
+                value["Date"] = pd.Timestamp(value["Date"])
+                portfolio_values.append(value)
+
+            return {
+                "portfolio": self._get_state("portfolio"),
+                "portfolio_values": portfolio_values,
+                "performance_metrics": self._get_state("performance_metrics"),
+                "last_completed_date": last_completed_date,
+            }
+
+    def load_signals(self) -> dict[str, dict[str, Any]]:
+        """Get the recorded analyst signals by date."""
+        with self._lock:
+            rows = self._conn.execute("SELECT date, analyst_signals FROM days ORDER BY date").fetchall()
+        return {date: json.loads(signals) for date, signals in rows}
+
+    def load_days(self) -> list[dict[str, Any]]:
+        """Get the analyst signals, decisions and executed trades of each recorded day, in date order."""
+        with self._lock:
+            rows = self._conn.execute("SELECT date, analyst_signals, decisions, executed_trades FROM days ORDER BY date").fetchall()
+        return [
+            {"date": date, "analyst_signals": json.loads(signals), "decisions": json.loads(decisions), "executed_trades": json.loads(executed_trades)}
+            for date, signals, decisions, executed_trades in rows
+        ]
+
+    def close(self):
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,103 @@
+import math
+from typing import Any, Optional
+
+import pandas as pd
+
+# Assumes 252 trading days/year
+TRADING_DAYS_PER_YEAR = 252
+DAILY_RISK_FREE_RATE = 0.0434 / TRADING_DAYS_PER_YEAR
+
+
+class RunningMoments:
+    """Running count, mean and sample variance of a stream of values (Welford's algorithm)."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    @property
+    def std(self) -> float:
+        """Sample standard deviation (ddof=1, as pandas computes it); NaN for fewer than two values."""
+        if self.count < 2:
+            return float("nan")
+        return math.sqrt(max(self._m2 / (self.count - 1), 0.0))
+
+
+class StreamingPerformanceMetrics:
+    """
+    Sharpe ratio, Sortino ratio and maximum drawdown of a portfolio value series, updated
+    in constant time per day.
+
+    Produces the same values as computing them from the whole series with pandas: daily
+    returns via `pct_change`, excess returns over the daily risk-free rate, their sample
+    standard deviation (and that of the negative ones for Sortino), and the drawdown from
+    the running peak. Means and variances are accumulated with Welford's algorithm, so
+    they can differ from the two-pass pandas results in the last few bits only.
+    """
+
+    def __init__(self):
+        self.excess_returns = RunningMoments()
+        self.downside_returns = RunningMoments()
+        self.previous_value: Optional[float] = None
+        self.peak: Optional[float] = None
+        self.min_drawdown: Optional[float] = None
+        self.min_drawdown_date: Optional[pd.Timestamp] = None
+
+    def add(self, date: pd.Timestamp, value: float):
+        """Add the portfolio value of the next day."""
+        if self.previous_value is not None:
+            daily_return = self._pct_change(self.previous_value, value)
+            if not math.isnan(daily_return):
+                excess_return = daily_return - DAILY_RISK_FREE_RATE
+                self.excess_returns.add(excess_return)
+                if excess_return < 0:
+                    self.downside_returns.add(excess_return)
+        self.previous_value = value
+
+        self.peak = value if self.peak is None else max(self.peak, value)
+        drawdown = (value - self.peak) / self.peak
+        # Strictly lower, so the first day of the deepest drawdown is kept (like idxmin)
+        if self.min_drawdown is None or drawdown < self.min_drawdown:
+            self.min_drawdown = drawdown
+            self.min_drawdown_date = date
+
+    @staticmethod
+    def _pct_change(previous: float, current: float) -> float:
+        if previous == 0:
+            return float("nan") if current == 0 else math.copysign(float("inf"), current)
+        return current / previous - 1
+
+    def update(self, performance_metrics: dict[str, Any]):
+        """Write the current Sharpe, Sortino and max drawdown into `performance_metrics` (once there are at least two returns)."""
+        if self.excess_returns.count < 2:
+            return  # not enough data points
+
+        mean_excess_return = self.excess_returns.mean
+        std_excess_return = self.excess_returns.std
+
+        # Sharpe ratio
+        if std_excess_return > 1e-12:
+            performance_metrics["sharpe_ratio"] = math.sqrt(TRADING_DAYS_PER_YEAR) * (mean_excess_return / std_excess_return)
+        else:
+            performance_metrics["sharpe_ratio"] = 0.0
+
+        # Sortino ratio
+        downside_std = self.downside_returns.std
+        if self.downside_returns.count > 0 and downside_std > 1e-12:
+            performance_metrics["sortino_ratio"] = math.sqrt(TRADING_DAYS_PER_YEAR) * (mean_excess_return / downside_std)
+        else:
+            performance_metrics["sortino_ratio"] = float("inf") if mean_excess_return > 0 else 0
+
+        # Maximum drawdown (stored as a negative percentage)
+        performance_metrics["max_drawdown"] = self.min_drawdown * 100
+        if self.min_drawdown < 0:
+            performance_metrics["max_drawdown_date"] = self.min_drawdown_date.strftime("%Y-%m-%d")
+        else:
+            performance_metrics["max_drawdown_date"] = None
@@ -0,0 +1,309 @@
+from typing import Any
+
+import numpy as np
+
+# Trade actions, encoded as integers for the vectorized engine
+HOLD, BUY, SELL, SHORT, COVER = range(5)
+ACTION_CODES = {"hold": HOLD, "buy": BUY, "sell": SELL, "short": SHORT, "cover": COVER}
+
+
+class Portfolio:
+    """
+    Array-backed long/short portfolio with weighted-average cost bases and short margin.
+
+    Positions, cost bases, short margin and realized gains are NumPy arrays indexed like
+    `tickers`. A whole day's decisions are executed at once by `execute`, and
+    `market_value` marks every position to market in a single pass. Both reproduce the
+    per-ticker accounting of the original dict-based backtester exactly, including the
+    order in which cash is updated, so results don't change. `to_dict` gives the nested
+    dict view the agents expect.
+    """
+
+    def __init__(self, tickers: list[str], initial_capital: float, margin_requirement: float = 0.0):
+        self.tickers = list(tickers)
+        self.index = {ticker: i for i, ticker in enumerate(self.tickers)}
+        self.cash = initial_capital
+        self.margin_used = 0.0  # total margin usage across all short positions
+        self.margin_requirement = margin_requirement  # the margin ratio required for shorts
+
+        n = len(self.tickers)
+        self.long = np.zeros(n, dtype=np.int64)  # shares held long
+        self.short = np.zeros(n, dtype=np.int64)  # shares held short
+        self.long_cost_basis = np.zeros(n)  # average cost basis per share (long)
+        self.short_cost_basis = np.zeros(n)  # average cost basis per share (short)
+        self.short_margin_used = np.zeros(n)  # dollars of margin used for each ticker's short
+        self.realized_long = np.zeros(n)  # realized gains from long positions
+        self.realized_short = np.zeros(n)  # realized gains from short positions
+
+    @classmethod
+    def from_dict(cls, tickers: list[str], portfolio: dict[str, Any]) -> "Portfolio":
+        """Build a portfolio from the nested dict view (e.g. one restored from a checkpoint)."""
+        result = cls(tickers, portfolio["cash"], portfolio["margin_requirement"])
+        result.margin_used = portfolio["margin_used"]
+        for i, ticker in enumerate(result.tickers):
+            position = portfolio["positions"][ticker]
+            result.long[i] = position["long"]
+            result.short[i] = position["short"]
+            result.long_cost_basis[i] = position["long_cost_basis"]
+            result.short_cost_basis[i] = position["short_cost_basis"]
+            result.short_margin_used[i] = position["short_margin_used"]
+            result.realized_long[i] = portfolio["realized_gains"][ticker]["long"]
+            result.realized_short[i] = portfolio["realized_gains"][ticker]["short"]
+        return result
+
+    def to_dict(self) -> dict[str, Any]:
+        """The nested dict view of the portfolio passed to the agents (a copy; changing it doesn't change the portfolio)."""
+        long, short = self.long.tolist(), self.short.tolist()
+        long_cost_basis, short_cost_basis = self.long_cost_basis.tolist(), self.short_cost_basis.tolist()
+        short_margin_used = self.short_margin_used.tolist()
+        realized_long, realized_short = self.realized_long.tolist(), self.realized_short.tolist()
+        return {
+            "cash": self.cash,
+            "margin_used": self.margin_used,
+            "margin_requirement": self.margin_requirement,
+            "positions": {
+                ticker: {
+                    "long": long[i],
+                    "short": short[i],
+                    "long_cost_basis": long_cost_basis[i],
+                    "short_cost_basis": short_cost_basis[i],
+                    "short_margin_used": short_margin_used[i],
+                }
+                for i, ticker in enumerate(self.tickers)
+            },
+            "realized_gains": {ticker: {"long": realized_long[i], "short": realized_short[i]} for i, ticker in enumerate(self.tickers)},
+        }
+
+    def execute(self, actions: np.ndarray, quantities: np.ndarray, prices: np.ndarray) -> np.ndarray:
+        """
+        Execute one day's decisions for every ticker, in ticker order, and return the executed share counts.
+
+        `actions` holds action codes (see ACTION_CODES), `quantities` the requested shares
+        and `prices` the execution prices. Every order is first assumed to fill in full,
+        and the running cash (a sequential cumulative sum, like the one-by-one updates)
+        tells which buys and shorts can afford it. The prefix of orders before the first
+        one that can't is applied at once; that order is partially filled on its own, and
+        the rest of the day is executed the same way.
+        """
+        actions = np.asarray(actions, dtype=np.int64)
+        requested = np.asarray(quantities, dtype=float)
+        prices = np.asarray(prices, dtype=float)
+        executed = np.zeros(len(self.tickers), dtype=np.int64)
+
+        # Orders for zero or fewer shares are ignored; fractional shares are truncated
+        active = (requested > 0) & (actions != HOLD)
+        shares = np.where(active, requested, 0).astype(np.int64)
+
+        start = 0
+        while start < len(self.tickers):
+            stop = self._execute_full_fills(start, actions, active, shares, prices, executed)
+            if stop == len(self.tickers):
+                break
+            executed[stop] = self.execute_one(stop, int(actions[stop]), requested[stop], float(prices[stop]))
+            start = stop + 1
+        return executed
+
+    def _execute_full_fills(self, start: int, actions: np.ndarray, active: np.ndarray, shares: np.ndarray, prices: np.ndarray, executed: np.ndarray) -> int:
+        """
+        Apply the orders from `start` on that fill in full, up to the first buy or short
+        the cash at that point can't cover. Returns the index of that order (or the
+        number of tickers if every order filled).
+        """
+        s = slice(start, None)
+        action, q, p = actions[s], shares[s], prices[s]
+        is_buy = active[s] & (action == BUY)
+        is_sell = active[s] & (action == SELL)
+        is_short = active[s] & (action == SHORT)
+        is_cover = active[s] & (action == COVER)
+
+        long, short = self.long[s], self.short[s]
+        sold = np.where(is_sell, np.minimum(q, long), 0)
+        covered = np.where(is_cover, np.minimum(q, short), 0)
+        is_sell &= sold > 0
+        is_cover &= covered > 0
+
+        cost = q * p
+        proceeds = p * q
+        margin_required = proceeds * self.margin_requirement
+        with np.errstate(divide="ignore", invalid="ignore"):
+            margin_to_release = np.where(is_cover, covered / np.where(short > 0, short, 1) * self.short_margin_used[s], 0.0)
+        cover_cost = covered * p
+
+        # Cash changes in the order the one-by-one updates make them (two per ticker)
+        cash_changes = np.zeros((len(action), 2))
+        cash_changes[is_buy, 0] = -cost[is_buy]
+        cash_changes[is_sell, 0] = sold[is_sell] * p[is_sell]
+        cash_changes[is_short, 0] = proceeds[is_short]
+        cash_changes[is_short, 1] = -margin_required[is_short]
+        cash_changes[is_cover, 0] = margin_to_release[is_cover]
+        cash_changes[is_cover, 1] = -cover_cost[is_cover]
+        running_cash = np.cumsum(np.concatenate(([self.cash], cash_changes.ravel())))
+        cash_before = running_cash[0:-1:2]
+
+        # Stop at the first order that would need a partial fill
+        blocked = (is_buy & (cost > cash_before)) | (is_short & (margin_required > cash_before))
+        n = int(np.argmax(blocked)) if blocked.any() else len(action)
+        if n == 0:
+            return start
+        is_buy, is_sell, is_short, is_cover = is_buy[:n], is_sell[:n], is_short[:n], is_cover[:n]
+        p, q, sold, covered = p[:n], q[:n], sold[:n], covered[:n]
+        f = slice(start, start + n)
+
+        # Buys: weighted average cost basis for the new total
+        long_cost_basis = self.long_cost_basis[f]
+        long, short = self.long[f], self.short[f]
+        total_long = long + q
+        update = is_buy & (total_long > 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            long_cost_basis[update] = ((long_cost_basis * long + cost[:n]) / total_long)[update]
+        long[is_buy] += q[is_buy]
+
+        # Sells: realized gain/loss using average cost basis
+        self.realized_long[f][is_sell] += ((p - long_cost_basis) * sold)[is_sell]
+        long[is_sell] -= sold[is_sell]
+        long_cost_basis[is_sell & (long == 0)] = 0.0
+
+        # Shorts: weighted average short cost basis and margin
+        short_cost_basis, short_margin_used = self.short_cost_basis[f], self.short_margin_used[f]
+        total_short = short + q
+        update = is_short & (total_short > 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            short_cost_basis[update] = ((short_cost_basis * short + p * q) / total_short)[update]
+        short[is_short] += q[is_short]
+        short_margin_used[is_short] += margin_required[:n][is_short]
+
+        # Covers: realized gain/loss and release a proportional share of the margin
+        self.realized_short[f][is_cover] += ((short_cost_basis - p) * covered)[is_cover]
+        short[is_cover] -= covered[is_cover]
+        short_margin_used[is_cover] -= margin_to_release[:n][is_cover]
+        closed = is_cover & (short == 0)
+        short_cost_basis[closed] = 0.0
+        short_margin_used[closed] = 0.0
+
+        margin_changes = np.zeros(n)
+        margin_changes[is_short] = margin_required[:n][is_short]
+        margin_changes[is_cover] = -margin_to_release[:n][is_cover]
+        self.margin_used = np.cumsum(np.concatenate(([self.margin_used], margin_changes)))[-1].item()
+        self.cash = running_cash[2 * n].item()
+
+        executed[f] = np.where(is_buy | is_short, q, 0) + sold + covered
+        return start + n
+
+    def execute_one(self, i: int, action: int, quantity: float, current_price: float) -> int:
+        """
+        Execute a single order for the `i`-th ticker and return the executed share count.
+        Buys and shorts the cash can't cover are reduced to the affordable quantity.
+        """
+        if quantity <= 0:
+            return 0
+
+        quantity = int(quantity)  # force integer shares
+        long, short = int(self.long[i]), int(self.short[i])
+
+        if action == BUY:
+            cost = quantity * current_price
+            if cost > self.cash:
+                # Calculate maximum affordable quantity
+                quantity = int(self.cash / current_price)
+                if quantity <= 0:
+                    return 0
+                cost = quantity * current_price
+
+            # Weighted average cost basis for the new total
+            total_shares = long + quantity
+            if total_shares > 0:
+                self.long_cost_basis[i] = (float(self.long_cost_basis[i]) * long + cost) / total_shares
+            self.long[i] = long + quantity
+            self.cash -= cost
+            return quantity
+
+        elif action == SELL:
+            # You can only sell as many as you own
+            quantity = min(quantity, long)
+            if quantity > 0:
+                # Realized gain/loss using average cost basis
+                avg_cost_per_share = float(self.long_cost_basis[i]) if long > 0 else 0
+                self.realized_long[i] += (current_price - avg_cost_per_share) * quantity
+                self.long[i] = long - quantity
+                self.cash += quantity * current_price
+                if long - quantity == 0:
+                    self.long_cost_basis[i] = 0.0
+                return quantity
+
+        elif action == SHORT:
+            # Receive the proceeds and post margin_required = proceeds * margin ratio
+            proceeds = current_price * quantity
+            margin_required = proceeds * self.margin_requirement
+            if margin_required > self.cash:
+                # Calculate maximum shortable quantity
+                if self.margin_requirement > 0:
+                    quantity = int(self.cash / (current_price * self.margin_requirement))
+                else:
+                    quantity = 0
+                if quantity <= 0:
+                    return 0
+                proceeds = current_price * quantity
+                margin_required = proceeds * self.margin_requirement
+
+            # Weighted average short cost basis
+            total_shares = short + quantity
+            if total_shares > 0:
+                self.short_cost_basis[i] = (float(self.short_cost_basis[i]) * short + current_price * quantity) / total_shares
+            self.short[i] = short + quantity
+
+            # Update margin usage
+            self.short_margin_used[i] += margin_required
+            self.margin_used += margin_required
+
+            # Increase cash by proceeds, then subtract the required margin
+            self.cash += proceeds
+            self.cash -= margin_required
+            return quantity
+
+        elif action == COVER:
+            # Pay the cover cost and release a proportional share of the margin
+            quantity = min(quantity, short)
+            if quantity > 0:
+                cover_cost = quantity * current_price
+                avg_short_price = float(self.short_cost_basis[i]) if short > 0 else 0
+                realized_gain = (avg_short_price - current_price) * quantity
+                portion = quantity / short if short > 0 else 1.0
+                margin_to_release = portion * float(self.short_margin_used[i])
+
+                self.short[i] = short - quantity
+                self.short_margin_used[i] -= margin_to_release
+                self.margin_used -= margin_to_release
+
+                # Pay the cost to cover, but get back the released margin
+                self.cash += margin_to_release
+                self.cash -= cover_cost
+
+                self.realized_short[i] += realized_gain
+
+                if short - quantity == 0:
+                    self.short_cost_basis[i] = 0.0
+                    self.short_margin_used[i] = 0.0
+                return quantity
+
+        return 0
+
+    def exposures(self, prices: np.ndarray) -> tuple[float, float]:
+        """Long and short market exposure at the given prices."""
+        prices = np.asarray(prices, dtype=float)
+        # Sequential sums, matching the order of a per-ticker loop
+        long_exposure = np.cumsum(np.concatenate(([0.0], self.long * prices)))[-1].item()
+        short_exposure = np.cumsum(np.concatenate(([0.0], self.short * prices)))[-1].item()
+        return long_exposure, short_exposure
+
+    def market_value(self, prices: np.ndarray) -> float:
+        """
+        Total portfolio value at the given prices: cash, plus the market value of long
+        positions, plus the unrealized gain/loss of short positions.
+        """
+        prices = np.asarray(prices, dtype=float)
+        values = np.zeros((len(self.tickers), 2))
+        values[:, 0] = self.long * prices
+        # Short position unrealized PnL = short_shares * (short_cost_basis - current_price)
+        has_short = self.short > 0
+        values[has_short, 1] = (self.short * (self.short_cost_basis - prices))[has_short]
+        return np.cumsum(np.concatenate(([self.cash], values.ravel())))[-1].item()
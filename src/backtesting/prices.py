@@ -0,0 +1,66 @@
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from tools.api import get_prices
+
+
+class PricePanel:
+    """
+    Close prices of the backtest tickers on every trading day, as a dates × tickers array.
+
+    Each entry is the price the backtester trades at on that day: the latest close
+    returned by `get_price_data(ticker, previous_day, day)`. Loading the panel once after
+    the data pre-fetch replaces one cache scan, Pydantic parse and DataFrame build per
+    ticker per day with an array lookup. Entries without a price are NaN.
+    """
+
+    def __init__(self, dates: pd.DatetimeIndex, tickers: list[str], closes: np.ndarray):
+        self.dates = dates
+        self.tickers = list(tickers)
+        self.closes = closes
+        # A day is tradable only if every ticker has a price
+        self.available = ~np.isnan(closes).any(axis=1) if len(tickers) else np.ones(len(dates), dtype=bool)
+
+    @classmethod
+    def load(cls, tickers: list[str], dates: pd.DatetimeIndex) -> "PricePanel":
+        """Build the panel from the (pre-fetched) price data of each ticker."""
+        closes = np.full((len(dates), len(tickers)), np.nan)
+        if len(dates) == 0:
+            return cls(dates, tickers, closes)
+
+        # Same window as the daily lookups: from the day before to the day itself
+        day_strs = dates.strftime("%Y-%m-%d").to_numpy(dtype=str)
+        previous_day_strs = (dates - timedelta(days=1)).strftime("%Y-%m-%d").to_numpy(dtype=str)
+
+        for column, ticker in enumerate(tickers):
+            try:
+                prices = get_prices(ticker, previous_day_strs[0], day_strs[-1])
+            except Exception as e:
+                print(f"Error fetching prices for {ticker} between {previous_day_strs[0]} and {day_strs[-1]}: {e}")
+                continue
+            if not prices:
+                continue
+
+            # Price times are compared as strings, exactly like the cached lookups do
+            times = np.array([price.time for price in prices], dtype=str)
+            ticker_closes = np.array([price.close for price in prices], dtype=float)
+            order = np.argsort(times, kind="stable")
+            times, ticker_closes = times[order], ticker_closes[order]
+
+            # The last price with previous_day <= time <= day, if there is one
+            first = np.searchsorted(times, previous_day_strs, side="left")
+            last = np.searchsorted(times, day_strs, side="right") - 1
+            has_price = last >= first
+            closes[has_price, column] = ticker_closes[last[has_price]]
+
+        return cls(dates, tickers, closes)
+
+    def prices_on(self, index: int) -> dict[str, float]:
+        """The close price of each ticker on the `index`-th trading day."""
+        return dict(zip(self.tickers, self.closes[index].tolist()))
+
+    def missing_tickers(self, index: int) -> list[str]:
+        """The tickers without a price on the `index`-th trading day."""
+        return [self.tickers[column] for column in np.flatnonzero(np.isnan(self.closes[index]))]
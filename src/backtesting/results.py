@@ -0,0 +1,236 @@
+"""
+Columnar persistence of backtest results.
+
+A run is written to a directory with one table per file, in Parquet or Arrow IPC
+(Feather v2) format, plus a `run.json` with the configuration and final metrics:
+
+    portfolio_values  date, portfolio_value, long_exposure, short_exposure, gross_exposure, net_exposure, long_short_ratio
+    trades            date, ticker, action, quantity, executed_quantity, price
+    signals           date, ticker, agent, signal, confidence
+
+The schemas are fixed (see `SCHEMA_VERSION`), so runs written at different times can be
+loaded and compared side by side. Requires pyarrow, from the optional `results`
+dependency group (`poetry install --with results`).
+"""
+
+import json
+import os
+from collections import defaultdict
+from datetime import date as Date
+from typing import Any, Optional
+
+import pandas as pd
+
+from backtesting.checkpoint import to_json
+from backtesting.timeseries import PortfolioValueSeries
+
+SCHEMA_VERSION = 1
+RESULTS_FORMATS = ("parquet", "arrow")
+RESULTS_TABLES = ("portfolio_values", "trades", "signals")
+FILE_EXTENSIONS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError("Backtest results need pyarrow; install it with `poetry install --with results` (or `pip install pyarrow`)") from e
+    return pyarrow
+
+
+def results_schemas() -> dict[str, Any]:
+    """The Arrow schema of each results table."""
+    pa = _import_pyarrow()
+    return {
+        "portfolio_values": pa.schema(
+            [
+                ("date", pa.date32()),
+                ("portfolio_value", pa.float64()),
+                ("long_exposure", pa.float64()),
+                ("short_exposure", pa.float64()),
+                ("gross_exposure", pa.float64()),
+                ("net_exposure", pa.float64()),
+                ("long_short_ratio", pa.float64()),
+            ]
+        ),
+        "trades": pa.schema(
+            [
+                ("date", pa.date32()),
+                ("ticker", pa.string()),
+                ("action", pa.string()),
+                ("quantity", pa.float64()),  # requested by the portfolio manager
+                ("executed_quantity", pa.int64()),
+                ("price", pa.float64()),
+            ]
+        ),
+        "signals": pa.schema(
+            [
+                ("date", pa.date32()),
+                ("ticker", pa.string()),
+                ("agent", pa.string()),
+                ("signal", pa.string()),
+                ("confidence", pa.float64()),
+            ]
+        ),
+    }
+
+
+def _to_float(value: Any) -> Optional[float]:
+    try:
+        return None if value is None else float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class BacktestRecorder:
+    """Collects a backtest's trades and analyst signals as columns, day by day."""
+
+    def __init__(self):
+        self.columns: dict[str, dict[str, list]] = {table: defaultdict(list) for table in ("trades", "signals")}
+
+    def add_day(
+        self,
+        date: str,
+        tickers: list[str],
+        prices: dict[str, float],
+        decisions: dict[str, Any],
+        executed_trades: dict[str, int],
+        analyst_signals: dict[str, dict[str, Any]],
+    ):
+        """Record the decisions, executed trades and per-analyst signals of a day the agents ran."""
+        day = Date.fromisoformat(date)
+        trades = self.columns["trades"]
+        for ticker in tickers:
+            decision = decisions.get(ticker) or {}
+            trades["date"].append(day)
+            trades["ticker"].append(ticker)
+            trades["action"].append(decision.get("action", "hold"))
+            trades["quantity"].append(_to_float(decision.get("quantity", 0)))
+            trades["executed_quantity"].append(int(executed_trades.get(ticker, 0)))
+            trades["price"].append(_to_float(prices.get(ticker)))
+
+        signals = self.columns["signals"]
+        for agent_name, by_ticker in analyst_signals.items():
+            for ticker, signal in by_ticker.items():
+                if not isinstance(signal, dict):
+                    continue
+                signals["date"].append(day)
+                signals["ticker"].append(ticker)
+                signals["agent"].append(agent_name)
+                signals["signal"].append(signal.get("signal"))
+                signals["confidence"].append(_to_float(signal.get("confidence")))
+
+    def write(self, path: str, portfolio_values: PortfolioValueSeries, metadata: dict[str, Any], format: str = "parquet") -> str:
+        """
+        Write the tables and `run.json` to the directory `path` and return it.
+
+        `portfolio_values` is the backtester's daily value series; its arrays are written
+        as they are, with missing exposures (NaN) as nulls.
+        """
+        if format not in RESULTS_FORMATS:
+            raise ValueError(f"Unknown results format: {format}")
+        pa = _import_pyarrow()
+        schemas = results_schemas()
+
+        fields = {
+            "portfolio_value": "Portfolio Value",
+            "long_exposure": "Long Exposure",
+            "short_exposure": "Short Exposure",
+            "gross_exposure": "Gross Exposure",
+            "net_exposure": "Net Exposure",
+            "long_short_ratio": "Long/Short Ratio",
+        }
+        values = {"date": portfolio_values.dates.astype("datetime64[D]")}
+        values.update({column: portfolio_values.column(key) for column, key in fields.items()})
+
+        os.makedirs(path, exist_ok=True)
+        tables = {"portfolio_values": values, **self.columns}
+        for name in RESULTS_TABLES:
+            schema = schemas[name]
+            table = pa.table(
+                {field.name: pa.array(tables[name].get(field.name, []), type=field.type, from_pandas=True) for field in schema},
+                schema=schema,
+            )
+            file_path = os.path.join(path, name + FILE_EXTENSIONS[format])
+            if format == "parquet":
+                import pyarrow.parquet as pq
+
+                pq.write_table(table, file_path)
+            else:
+                with pa.OSFile(file_path, "wb") as sink, pa.ipc.new_file(sink, schema) as writer:
+                    writer.write_table(table)
+
+        with open(os.path.join(path, "run.json"), "w") as f:
+            f.write(to_json({"schema_version": SCHEMA_VERSION, "format": format, **metadata}))
+        return path
+
+
+class BacktestResults:
+    """A backtest run loaded from disk: its metadata and the results tables as (in-memory) DataFrames."""
+
+    def __init__(self, path: str, metadata: dict[str, Any], tables: dict[str, pd.DataFrame]):
+        self.path = path
+        self.metadata = metadata
+        self.portfolio_values = tables["portfolio_values"]
+        self.trades = tables["trades"]
+        self.signals = tables["signals"]
+
+    @property
+    def name(self) -> str:
+        return os.path.basename(os.path.normpath(self.path))
+
+
+def load_backtest_results(path: str, tables: tuple[str, ...] = RESULTS_TABLES) -> BacktestResults:
+    """
+    Load a run written by `BacktestRecorder.write`. The table files are memory-mapped while
+    reading, but converting them to DataFrames copies the data into memory.
+    """
+    pa = _import_pyarrow()
+    with open(os.path.join(path, "run.json")) as f:
+        metadata = json.load(f)
+    if metadata.get("schema_version") != SCHEMA_VERSION:
+        raise ValueError(f"Unsupported backtest results schema version {metadata.get('schema_version')} in {path}")
+
+    loaded = {}
+    for name in RESULTS_TABLES:
+        if name not in tables:
+            loaded[name] = pd.DataFrame()
+            continue
+        file_path = os.path.join(path, name + FILE_EXTENSIONS[metadata["format"]])
+        if metadata["format"] == "parquet":
+            import pyarrow.parquet as pq
+
+            table = pq.read_table(file_path, memory_map=True)
+        else:
+            with pa.memory_map(file_path) as source:
+                table = pa.ipc.open_file(source).read_all()
+        df = table.to_pandas()
+        df["date"] = pd.to_datetime(df["date"])
+        loaded[name] = df
+    return BacktestResults(path, metadata, loaded)
+
+
+def compare_runs(paths: list[str]) -> pd.DataFrame:
+    """One row per run with its configuration, total return and final performance metrics."""
+    rows = []
+    for path in paths:
+        results = load_backtest_results(path, tables=("portfolio_values",))
+        metadata = results.metadata
+        values = results.portfolio_values["portfolio_value"]
+        metrics = metadata.get("performance_metrics", {})
+        rows.append(
+            {
+                "run": results.name,
+                "model": metadata.get("model_name"),
+                "analysts": ",".join(metadata.get("selected_analysts") or []),
+                "start_date": metadata.get("start_date"),
+                "end_date": metadata.get("end_date"),
+                "rebalance": metadata.get("rebalance_frequency"),
+                "total_return": (values.iloc[-1] / values.iloc[0] - 1) * 100 if len(values) else None,
+                "final_value": values.iloc[-1] if len(values) else None,
+                "sharpe_ratio": metrics.get("sharpe_ratio"),
+                "sortino_ratio": metrics.get("sortino_ratio"),
+                "max_drawdown": metrics.get("max_drawdown"),
+            }
+        )
+    return pd.DataFrame(rows)
@@ -0,0 +1,155 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Iterable, Optional
+
+from backtesting.checkpoint import to_json
+
+# Agent options that only bound latency; they don't change what the analysts answer
+LATENCY_OPTIONS = ("llm_timeout", "llm_hedge_after", "run_timeout")
+SIGNAL_KEY_COLUMNS = ("date", "ticker", "model_name", "model_provider", "options_hash", "analyst")
+
+
+def options_hash(agent_options: dict[str, Any]) -> str:
+    """Short hash of the agent options that can change analyst signals (empty if there are none)."""
+    options = {name: value for name, value in agent_options.items() if name not in LATENCY_OPTIONS and value is not None}
+    if not options:
+        return ""
+    return hashlib.sha256(to_json(options).encode()).hexdigest()[:12]
+
+
+class SignalStore:
+    """
+    Persistent store of analyst signals keyed by (date, ticker, model, provider, options, analyst).
+
+    Analyst signals depend only on the ticker, the date window, the model and the agent
+    options (see `options_hash`), never on the portfolio, so they can be computed once
+    (in parallel) and replayed by any number of backtests that vary the portfolio logic.
+    Each analyst's output is stored separately, so runs with different analyst subsets
+    share the same entries.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS signals (
+                date TEXT NOT NULL,
+                ticker TEXT NOT NULL,
+                model_name TEXT NOT NULL,
+                model_provider TEXT NOT NULL,
+                options_hash TEXT NOT NULL,
+                analyst TEXT NOT NULL,
+                signals TEXT NOT NULL,
+                PRIMARY KEY (date, ticker, model_name, model_provider, options_hash, analyst)
+            )
+            """
+        )
+        self._conn.commit()
+
+        # Stores written before signals were keyed by provider and options can't be told apart
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(signals)").fetchall()]
+        if not set(SIGNAL_KEY_COLUMNS) <= set(columns):
+            self._conn.close()
+            raise ValueError(f"Signal store at {path} uses an older layout without the model provider and agent options; use a new file")
+
+    def put(self, date: str, ticker: str, model_name: str, model_provider: str, options: str, analyst: str, analyst_signals: dict[str, dict[str, Any]]):
+        """
+        Store one analyst's output for a ticker and date, as returned in `analyst_signals` (agent name -> ticker -> signal).
+        `options` is the `options_hash` of the agent options the signals were computed with.
+        """
+        signals = {agent_name: {ticker: by_ticker[ticker]} for agent_name, by_ticker in analyst_signals.items() if ticker in by_ticker}
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO signals (date, ticker, model_name, model_provider, options_hash, analyst, signals) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (date, ticker, model_name, model_provider, options, analyst, to_json(signals)),
+            )
+            self._conn.commit()
+
+    def completed(self, model_name: str, model_provider: str, options: str) -> set[tuple[str, str, str]]:
+        """The (date, ticker, analyst) entries already stored for a model, provider and agent options."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT date, ticker, analyst FROM signals WHERE model_name = ? AND model_provider = ? AND options_hash = ?",
+                (model_name, model_provider, options),
+            ).fetchall()
+        return set(rows)
+
+    def get_day(self, date: str, tickers: list[str], model_name: str, model_provider: str, options: str, analysts: list[str]) -> dict[str, dict[str, Any]]:
+        """Merge the stored signals for a day into the `analyst_signals` shape the agents produce (agent name -> ticker -> signal)."""
+        ticker_placeholders = ",".join("?" * len(tickers))
+        analyst_placeholders = ",".join("?" * len(analysts))
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT signals FROM signals WHERE date = ? AND model_name = ? AND model_provider = ? AND options_hash = ? "
+                f"AND ticker IN ({ticker_placeholders}) AND analyst IN ({analyst_placeholders})",
+                (date, model_name, model_provider, options, *tickers, *analysts),
+            ).fetchall()
+
+        analyst_signals: dict[str, dict[str, Any]] = {}
+        for (row,) in rows:
+            for agent_name, by_ticker in json.loads(row).items():
+                analyst_signals.setdefault(agent_name, {}).update(by_ticker)
+        return analyst_signals
+
+    def close(self):
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+def precompute_signals(
+    store: SignalStore,
+    run_analyst: Callable[[str, list[str], str], dict[str, dict[str, Any]]],
+    tasks: Iterable[tuple[str, str, str]],
+    model_name: str,
+    model_provider: str,
+    options: str = "",
+    max_workers: int = 8,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+) -> int:
+    """
+    Compute and store the signals for every (date, ticker, analyst) task not already in the store.
+
+    Missing tasks are grouped by (date, analyst), and `run_analyst(date, tickers, analyst)`
+    runs one analyst on all of that day's missing tickers at once (so the agents can batch
+    them into fewer LLM calls) and returns its `analyst_signals`, which are stored per ticker.
+    Groups run on a thread pool (the work is dominated by LLM and data-API latency, and
+    threads share the in-process data cache). A failed group is reported and left missing so
+    a rerun retries it. `options` is the `options_hash` of the agent options `run_analyst` uses.
+
+    Returns:
+        The number of tasks computed
+    """
+    completed = store.completed(model_name, model_provider, options)
+    groups: dict[tuple[str, str], list[str]] = {}
+    for date, ticker, analyst in tasks:
+        if (date, ticker, analyst) not in completed:
+            groups.setdefault((date, analyst), []).append(ticker)
+    total = sum(len(tickers) for tickers in groups.values())
+    if not total:
+        return 0
+
+    done = 0
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="signals") as executor:
+        futures = {executor.submit(run_analyst, date, tickers, analyst): (date, tickers, analyst) for (date, analyst), tickers in groups.items()}
+        for future in as_completed(futures):
+            date, tickers, analyst = futures[future]
+            try:
+                analyst_signals = future.result()
+                for ticker in tickers:
+                    store.put(date, ticker, model_name, model_provider, options, analyst, analyst_signals)
+            except Exception as e:
+                print(f"Error computing {analyst} signals for {','.join(tickers)} on {date}: {e}")
+            done += len(tickers)
+            if on_progress:
+                on_progress(done, total)
+    return done
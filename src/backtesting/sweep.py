@@ -0,0 +1,295 @@
+"""
+Parallel parameter sweeps over the backtester.
+
+Runs one backtest per combination of analyst set, model, margin requirement, initial
+capital and date window on a process pool, and writes a comparative results table.
+Market data is fetched once in the parent process and handed to every worker as a
+read-only snapshot of the data cache, so the workers don't refetch it.
+
+Usage (from src/):
+    python -m backtesting.sweep --tickers AAPL,MSFT --models gpt-4o,o3-mini \\
+        --analyst-sets "ben_graham,warren_buffett;technical_analyst" \\
+        --margin-requirements 0,0.5 --windows 2024-01-01:2024-03-01,2024-03-01:2024-06-01 \\
+        --output sweep_results.csv
+"""
+
+import argparse
+import itertools
+import os
+import sys
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Optional
+
+import pandas as pd
+from colorama import Fore, Style, init
+from pydantic import BaseModel
+from tabulate import tabulate
+
+from data.cache import get_cache
+
+init(autoreset=True)
+
+
+class SweepConfig(BaseModel):
+    """One backtest configuration of a sweep."""
+    analysts: list[str]
+    model_name: str
+    model_provider: str
+    margin_requirement: float
+    initial_capital: float
+    start_date: str
+    end_date: str
+
+
+def build_grid(
+    analyst_sets: list[list[str]],
+    models: list[str],
+    margin_requirements: list[float],
+    initial_capitals: list[float],
+    windows: list[tuple[str, str]],
+) -> list[SweepConfig]:
+    """Expand the parameter lists into every combination. Models must be in LLM_ORDER."""
+    from llm.models import get_model_info
+
+    model_providers = {}
+    for model_name in models:
+        model_info = get_model_info(model_name)
+        if model_info is None:
+            raise ValueError(f"Unknown model: {model_name}")
+        model_providers[model_name] = model_info.provider.value
+
+    return [
+        SweepConfig(
+            analysts=analysts,
+            model_name=model_name,
+            model_provider=model_providers[model_name],
+            margin_requirement=margin_requirement,
+            initial_capital=initial_capital,
+            start_date=start_date,
+            end_date=end_date,
+        )
+        for analysts, model_name, margin_requirement, initial_capital, (start_date, end_date) in itertools.product(
+            analyst_sets, models, margin_requirements, initial_capitals, windows
+        )
+    ]
+
+
+def prefetch_sweep_data(tickers: list[str], configs: list[SweepConfig]) -> dict:
+    """Fetch the data for every date window of the sweep into the cache and return a snapshot of it."""
+    from backtester import Backtester
+
+    for start_date, end_date in sorted({(config.start_date, config.end_date) for config in configs}):
+        Backtester(agent=None, tickers=tickers, start_date=start_date, end_date=end_date, initial_capital=0).prefetch_data()
+    return get_cache().snapshot()
+
+
+def _init_worker(cache_snapshot: dict, llm_cache_path: Optional[str]):
+    """Seed a worker process with the shared data and quiet its output."""
+    from llm.cache import configure_llm_cache
+    from utils.progress import progress
+
+    get_cache().restore(cache_snapshot)
+    configure_llm_cache(llm_cache_path)
+    progress.configure("headless")
+
+
+def run_config(
+    config: SweepConfig,
+    tickers: list[str],
+    agent: Callable,
+    agent_options: dict[str, Any],
+    bootstrap_resamples: int = 0,
+) -> dict[str, Any]:
+    """
+    Run the backtest of a single configuration and return its results row.
+
+    Bootstrap resampling is off unless `bootstrap_resamples` is set, in which case the row
+    also gets the Sharpe ratio's confidence interval.
+    """
+    from backtester import Backtester
+
+    row = {
+        "analysts": ",".join(config.analysts),
+        "model": config.model_name,
+        "margin_requirement": config.margin_requirement,
+        "initial_capital": config.initial_capital,
+        "start_date": config.start_date,
+        "end_date": config.end_date,
+    }
+    try:
+        backtester = Backtester(
+            agent=agent,
+            tickers=tickers,
+            start_date=config.start_date,
+            end_date=config.end_date,
+            initial_capital=config.initial_capital,
+            model_name=config.model_name,
+            model_provider=config.model_provider,
+            selected_analysts=config.analysts,
+            initial_margin_requirement=config.margin_requirement,
+            agent_options=agent_options,
+            output_mode="quiet",
+            bootstrap_resamples=bootstrap_resamples,
+        )
+        # Pre-fetching is served by the cache snapshot
+        performance_metrics = backtester.run_backtest()
+    except Exception as e:
+        traceback.print_exc()
+        return {**row, "error": str(e)}
+
+    final_value = backtester.portfolio_values[-1]["Portfolio Value"] if backtester.portfolio_values else config.initial_capital
+    if backtester.bootstrap is not None:
+        sharpe_interval = backtester.bootstrap.intervals["sharpe_ratio"]
+        row["sharpe_lower"], row["sharpe_upper"] = sharpe_interval.lower, sharpe_interval.upper
+    return {
+        **row,
+        "total_return": (final_value / config.initial_capital - 1) * 100,
+        "final_value": final_value,
+        "sharpe_ratio": performance_metrics["sharpe_ratio"],
+        "sortino_ratio": performance_metrics["sortino_ratio"],
+        "max_drawdown": performance_metrics["max_drawdown"],
+        "trading_days": max(len(backtester.portfolio_values) - 1, 0),
+        "error": None,
+    }
+
+
+def run_sweep(
+    tickers: list[str],
+    configs: list[SweepConfig],
+    agent: Optional[Callable] = None,
+    agent_options: Optional[dict[str, Any]] = None,
+    max_workers: Optional[int] = None,
+    llm_cache_path: Optional[str] = None,
+    bootstrap_resamples: int = 0,
+) -> pd.DataFrame:
+    """
+    Run every configuration on a process pool and return one results row per configuration,
+    sorted by Sharpe ratio (highest first). Bootstrap confidence intervals are skipped unless
+    `bootstrap_resamples` is set, so the grid doesn't pay for resampling in every cell.
+
+    `agent` defaults to `run_hedge_fund`; it must be picklable (a module-level function).
+    """
+    if agent is None:
+        from main import run_hedge_fund
+
+        agent = run_hedge_fund
+
+    print(f"\nPre-fetching data for {len(tickers)} tickers across the sweep...")
+    cache_snapshot = prefetch_sweep_data(tickers, configs)
+
+    rows = []
+    print(f"Running {len(configs)} backtests on {max_workers or os.cpu_count()} processes...")
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(cache_snapshot, llm_cache_path)) as executor:
+        futures = [executor.submit(run_config, config, tickers, agent, agent_options or {}, bootstrap_resamples) for config in configs]
+        for future in as_completed(futures):
+            rows.append(future.result())
+            print(f"Completed {len(rows)}/{len(configs)} backtests")
+
+    results = pd.DataFrame(rows)
+    if "sharpe_ratio" in results:
+        results = results.sort_values("sharpe_ratio", ascending=False, na_position="last", ignore_index=True)
+    return results
+
+
+def save_results(results: pd.DataFrame, path: str):
+    """Write the results table as CSV, or as JSON if the path ends in .json."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    if path.endswith(".json"):
+        results.to_json(path, orient="records", indent=2)
+    else:
+        results.to_csv(path, index=False)
+
+
+def print_results(results: pd.DataFrame):
+    """Print the results table, best Sharpe ratio first."""
+
+    def number(value, fmt: str) -> str:
+        return "" if value is None or pd.isna(value) else format(value, fmt)
+
+    table = []
+    for row in results.to_dict("records"):
+        return_color = Fore.GREEN if (row.get("total_return") or 0) >= 0 else Fore.RED
+        table.append(
+            [
+                f"{Fore.CYAN}{row['analysts']}{Style.RESET_ALL}",
+                row["model"],
+                f"{row['margin_requirement']:.2f}",
+                f"${row['initial_capital']:,.0f}",
+                f"{row['start_date']} to {row['end_date']}",
+                f"{return_color}{number(row.get('total_return'), '+.2f')}%{Style.RESET_ALL}" if row.get("error") is None else f"{Fore.RED}error{Style.RESET_ALL}",
+                number(row.get("sharpe_ratio"), ".2f"),
+                number(row.get("sortino_ratio"), ".2f"),
+                f"{number(row.get('max_drawdown'), '.2f')}%" if row.get("error") is None else "",
+            ]
+        )
+    print(f"\n{Fore.WHITE}{Style.BRIGHT}SWEEP RESULTS:{Style.RESET_ALL}")
+    print(
+        tabulate(
+            table,
+            headers=["Analysts", "Model", "Margin", "Capital", "Window", "Return", "Sharpe", "Sortino", "Max Drawdown"],
+            tablefmt="grid",
+            colalign=("left", "left", "right", "right", "left", "right", "right", "right", "right"),
+        )
+    )
+
+
+def main():
+    from utils.analysts import ANALYST_CONFIG
+
+    parser = argparse.ArgumentParser(description="Run a parallel parameter sweep of backtests")
+    parser.add_argument("--tickers", type=str, required=True, help="Comma-separated list of stock ticker symbols")
+    parser.add_argument("--models", type=str, required=True, help="Comma-separated model names from the available models (LLM_ORDER)")
+    parser.add_argument("--analyst-sets", type=str, help="Semicolon-separated analyst sets, each comma-separated (default: one set with all analysts)")
+    parser.add_argument("--margin-requirements", type=str, default="0.0", help="Comma-separated margin ratios for short positions (default: 0.0)")
+    parser.add_argument("--initial-capitals", type=str, default="100000", help="Comma-separated initial capital amounts (default: 100000)")
+    parser.add_argument("--windows", type=str, required=True, help="Comma-separated date windows as START:END (YYYY-MM-DD:YYYY-MM-DD)")
+    parser.add_argument("--workers", type=int, help="Number of worker processes (default: CPU count)")
+    parser.add_argument("--output", type=str, default="sweep_results.csv", help="Results table path, CSV or .json (default: sweep_results.csv)")
+    parser.add_argument("--llm-cache", type=str, help="Path to a persistent LLM response cache (SQLite) shared by the workers")
+    parser.add_argument("--llm-batch-size", type=int, default=1, help="Number of tickers each persona analyzes per LLM call (default: 1)")
+    parser.add_argument("--bootstrap-resamples", type=int, default=0, help="Block bootstrap resamples per backtest for Sharpe confidence intervals (default: 0, disabled)")
+    args = parser.parse_args()
+
+    tickers = [ticker.strip() for ticker in args.tickers.split(",") if ticker.strip()]
+    if args.analyst_sets:
+        analyst_sets = [[analyst.strip() for analyst in analyst_set.split(",") if analyst.strip()] for analyst_set in args.analyst_sets.split(";")]
+    else:
+        analyst_sets = [list(ANALYST_CONFIG)]
+    for analyst in itertools.chain.from_iterable(analyst_sets):
+        if analyst not in ANALYST_CONFIG:
+            parser.error(f"Unknown analyst: {analyst}")
+    windows = [tuple(window.strip().split(":", 1)) for window in args.windows.split(",") if window.strip()]
+    if any(len(window) != 2 for window in windows):
+        parser.error("Date windows must be given as START:END")
+
+    try:
+        configs = build_grid(
+            analyst_sets=analyst_sets,
+            models=[model.strip() for model in args.models.split(",") if model.strip()],
+            margin_requirements=[float(value) for value in args.margin_requirements.split(",")],
+            initial_capitals=[float(value) for value in args.initial_capitals.split(",")],
+            windows=windows,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+
+    results = run_sweep(
+        tickers,
+        configs,
+        agent_options={"llm_batch_size": args.llm_batch_size},
+        max_workers=args.workers,
+        llm_cache_path=args.llm_cache,
+        bootstrap_resamples=args.bootstrap_resamples,
+    )
+    print_results(results)
+    save_results(results, args.output)
+    print(f"\nResults written to {args.output}")
+
+    if "error" in results and results["error"].notna().any():
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
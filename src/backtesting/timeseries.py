@@ -0,0 +1,105 @@
+from collections.abc import Sequence
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+# The columns of the backtester's daily portfolio values, in table order
+PORTFOLIO_VALUE_COLUMNS = ("Portfolio Value", "Long Exposure", "Short Exposure", "Gross Exposure", "Net Exposure", "Long/Short Ratio")
+
+
+class PortfolioValueSeries(Sequence):
+    """
+    The backtester's daily portfolio values and exposures in preallocated arrays.
+
+    Dates are stored as int64 nanoseconds and each column as a contiguous float64 array,
+    sized up front for the backtest's business days (growing by doubling only if more
+    rows are added), so appending a day does not allocate. `to_frame` wraps the filled
+    part in a DataFrame without copying. Columns missing from a row (the exposures of the
+    initial capital row) are NaN.
+
+    Indexing and iterating still give the familiar row dicts ("Date", "Portfolio Value", ...).
+    """
+
+    def __init__(self, capacity: int = 0):
+        capacity = max(int(capacity), 1)
+        self._dates = np.zeros(capacity, dtype=np.int64)
+        # One row per column, so each column's filled part is a contiguous slice
+        self._values = np.full((len(PORTFOLIO_VALUE_COLUMNS), capacity), np.nan)
+        self._size = 0
+
+    @classmethod
+    def for_dates(cls, dates: pd.DatetimeIndex) -> "PortfolioValueSeries":
+        """An empty series sized for a backtest over `dates`: the initial capital row plus one row per day."""
+        return cls(len(dates) + 1)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, index: int | slice) -> dict[str, Any] | list[dict[str, Any]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._size))]
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("portfolio value index out of range")
+        row = {"Date": pd.Timestamp(self._dates[index])}
+        for column, value in zip(PORTFOLIO_VALUE_COLUMNS, self._values[:, index].tolist()):
+            if not np.isnan(value):
+                row[column] = value
+        return row
+
+    @property
+    def capacity(self) -> int:
+        return len(self._dates)
+
+    def _grow(self):
+        capacity = self.capacity * 2
+        dates = np.zeros(capacity, dtype=np.int64)
+        dates[: self._size] = self._dates[: self._size]
+        values = np.full((len(PORTFOLIO_VALUE_COLUMNS), capacity), np.nan)
+        values[:, : self._size] = self._values[:, : self._size]
+        self._dates, self._values = dates, values
+
+    def append(
+        self,
+        date: pd.Timestamp,
+        portfolio_value: float,
+        long_exposure: float = np.nan,
+        short_exposure: float = np.nan,
+        gross_exposure: float = np.nan,
+        net_exposure: float = np.nan,
+        long_short_ratio: float = np.nan,
+    ):
+        """Add the next day's portfolio value and exposures."""
+        if self._size == self.capacity:
+            self._grow()
+        i = self._size
+        self._dates[i] = pd.Timestamp(date).value
+        self._values[:, i] = (portfolio_value, long_exposure, short_exposure, gross_exposure, net_exposure, long_short_ratio)
+        self._size += 1
+
+    def append_row(self, row: dict[str, Any]):
+        """Add a row dict as stored in a checkpoint ("Date", "Portfolio Value", exposures)."""
+        self.append(row["Date"], *(row.get(column, np.nan) for column in PORTFOLIO_VALUE_COLUMNS))
+
+    def clear(self):
+        self._size = 0
+        self._values.fill(np.nan)
+
+    @property
+    def dates(self) -> np.ndarray:
+        """The dates filled so far, as a datetime64[ns] view."""
+        return self._dates[: self._size].view("datetime64[ns]")
+
+    def column(self, name: str) -> np.ndarray:
+        """A view of one column's values filled so far."""
+        return self._values[PORTFOLIO_VALUE_COLUMNS.index(name), : self._size]
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        The portfolio values as a DataFrame indexed by "Date", viewing the buffer without
+        copying it. Add columns freely, but copy it before modifying existing values.
+        """
+        index = pd.DatetimeIndex(self.dates, name="Date", copy=False)
+        return pd.DataFrame(self._values[:, : self._size].T, index=index, columns=list(PORTFOLIO_VALUE_COLUMNS), copy=False)
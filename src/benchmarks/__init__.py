@@ -0,0 +1 @@
+"""Performance benchmarks. Run from src/, e.g. `python -m benchmarks.startup`."""
@@ -0,0 +1,360 @@
+"""
+Backtest loop benchmark on synthetic market data.
+
+Generates prices, financial metrics, insider trades and news for N tickers over T
+trading days, seeds the data cache with them (no API calls), and runs
+`Backtester.run_backtest` with either a stub agent (to measure the backtester's own
+loop) or the deterministic analysts (technical, fundamentals and sentiment, no LLM).
+Each case runs in a fresh interpreter and reports the time spent in each phase of the
+loop (from the backtester's trace spans) and the peak memory, so regressions show up
+and scaling curves can be reproduced with the same seed.
+
+Usage (from src/):
+    python -m benchmarks.backtest
+    python -m benchmarks.backtest --tickers 5,20,50 --days 60,250,1000 --agents stub --output backtest.json
+    python -m benchmarks.backtest --agents analysts --tickers 5 --days 60
+    python -m benchmarks.backtest --budget-ms 2
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+from colorama import Fore, Style, init
+from tabulate import tabulate
+
+init(autoreset=True)
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+AGENTS = ("stub", "analysts")
+# Analysts that need no LLM; the valuation analyst is left out because its line items
+# are always fetched from the API
+DETERMINISTIC_ANALYSTS = ["technical_analyst", "fundamentals_analyst", "sentiment_analyst"]
+# Phases of the backtest loop, as traced by the backtester
+PHASES = ["load_prices", "agent", "execution", "valuation", "metrics", "output", "bootstrap"]
+END_DATE = "2024-12-31"
+# Price history before the backtest starts, for the agents' lookback and the pre-fetch window
+HISTORY_DAYS = 400
+
+
+def synthetic_market_data(tickers: list[str], start_date: str, end_date: str, seed: int = 0) -> dict:
+    """
+    Synthetic market data for the tickers between the two dates, in the format of
+    `Cache.snapshot()`: daily prices (a geometric random walk), quarterly financial
+    metrics, weekly insider trades and a few news items per day.
+    """
+    from data.models import FinancialMetrics
+
+    rng = np.random.default_rng(seed)
+    days = pd.bdate_range(start_date, end_date)
+    day_strs = days.strftime("%Y-%m-%d").tolist()
+    quarter_ends = pd.date_range(start_date, end_date, freq=pd.offsets.QuarterEnd()).strftime("%Y-%m-%d").tolist()
+    metric_fields = [name for name in FinancialMetrics.model_fields if name not in ("ticker", "report_period", "period", "currency")]
+
+    snapshot = {"prices": {}, "financial_metrics": {}, "line_items": {}, "insider_trades": {}, "company_news": {}}
+    for ticker in tickers:
+        closes = rng.uniform(20, 500) * np.exp(np.cumsum(rng.normal(0.0003, 0.02, len(days))))
+        opens = closes * np.exp(rng.normal(0, 0.005, len(days)))
+        spread = np.abs(rng.normal(0, 0.01, len(days))) * closes
+        volumes = rng.integers(100_000, 10_000_000, len(days))
+        snapshot["prices"][ticker] = [
+            {"open": float(o), "close": float(c), "high": float(max(o, c) + s), "low": float(min(o, c) - s), "volume": int(v), "time": day}
+            for o, c, s, v, day in zip(opens, closes, spread, volumes, day_strs)
+        ]
+
+        shares_outstanding = rng.uniform(1e8, 5e9)
+        metrics = []
+        for report_period in quarter_ends:
+            values = {name: float(rng.normal(0.1, 0.15)) for name in metric_fields}
+            values.update(
+                market_cap=float(closes[max(days.searchsorted(report_period) - 1, 0)] * shares_outstanding),
+                price_to_earnings_ratio=float(rng.uniform(5, 40)),
+                price_to_book_ratio=float(rng.uniform(0.5, 8)),
+                price_to_sales_ratio=float(rng.uniform(0.5, 10)),
+                current_ratio=float(rng.uniform(0.5, 3)),
+                debt_to_equity=float(rng.uniform(0, 2)),
+                earnings_per_share=float(rng.uniform(-2, 15)),
+                free_cash_flow_per_share=float(rng.uniform(-2, 15)),
+            )
+            metrics.append({"ticker": ticker, "report_period": report_period, "period": "ttm", "currency": "USD", **values})
+        snapshot["financial_metrics"][ticker] = metrics
+
+        snapshot["insider_trades"][ticker] = [
+            {
+                "ticker": ticker,
+                "issuer": ticker,
+                "name": f"Insider {i % 7}",
+                "title": "Director",
+                "is_board_director": True,
+                "transaction_date": day,
+                "transaction_shares": float(rng.normal(0, 5000)),
+                "transaction_price_per_share": float(closes[i]),
+                "transaction_value": None,
+                "shares_owned_before_transaction": None,
+                "shares_owned_after_transaction": None,
+                "security_title": "Common Stock",
+                "filing_date": day,
+            }
+            for i, day in enumerate(day_strs)
+            if i % 5 == 0
+        ]
+
+        sentiments = rng.choice(["positive", "negative", "neutral"], size=(len(days), 3))
+        snapshot["company_news"][ticker] = [
+            {
+                "ticker": ticker,
+                "title": f"{ticker} news {j}",
+                "author": "Synthetic",
+                "source": "Synthetic",
+                # Times keep the news of a day distinct, as the cache merges on the date field
+                "date": f"{day}T{9 + j:02d}:00:00Z",
+                "url": f"https://example.com/{ticker}/{day}/{j}",
+                "sentiment": str(sentiments[i, j]),
+            }
+            for i, day in enumerate(day_strs)
+            for j in range(3)
+        ]
+    return snapshot
+
+
+def stub_agent(tickers: list[str], end_date: str, **kwargs) -> dict:
+    """Deterministic pseudo-random decisions and signals, seeded by the date; no data access."""
+    rng = np.random.default_rng(zlib.crc32(end_date.encode()))
+    actions = rng.choice(["buy", "sell", "short", "cover", "hold"], size=len(tickers))
+    quantities = rng.integers(0, 100, size=len(tickers))
+    signals = rng.choice(["bullish", "bearish", "neutral"], size=(3, len(tickers)))
+    return {
+        "decisions": {ticker: {"action": str(action), "quantity": int(quantity)} for ticker, action, quantity in zip(tickers, actions, quantities)},
+        "analyst_signals": {
+            f"stub_analyst_{i}": {ticker: {"signal": str(signal), "confidence": 50.0} for ticker, signal in zip(tickers, row)} for i, row in enumerate(signals)
+        },
+    }
+
+
+def analyst_agent(tickers: list[str], start_date: str, end_date: str, portfolio: dict, **kwargs) -> dict:
+    """Run the deterministic analysts through the agent graph and trade on the majority of their signals."""
+    from main import run_hedge_fund
+
+    output = run_hedge_fund(
+        tickers=tickers,
+        start_date=start_date,
+        end_date=end_date,
+        portfolio=portfolio,
+        selected_analysts=DETERMINISTIC_ANALYSTS,
+        analysts_only=True,
+    )
+    decisions = {}
+    for ticker in tickers:
+        votes = [signals[ticker].get("signal") for signals in output["analyst_signals"].values() if ticker in signals]
+        net = votes.count("bullish") - votes.count("bearish")
+        position = portfolio["positions"][ticker]
+        if net > 0:
+            action = "cover" if position["short"] > 0 else "buy"
+        elif net < 0:
+            action = "sell" if position["long"] > 0 else "short"
+        else:
+            action = "hold"
+        decisions[ticker] = {"action": action, "quantity": 10}
+    return {"decisions": decisions, "analyst_signals": output["analyst_signals"]}
+
+
+def peak_rss_mb() -> float | None:
+    """Peak resident set size of this process in MB (None where the resource module is unavailable)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_case(agent: str, n_tickers: int, n_days: int, seed: int = 0, output_mode: str = "new", trace_memory: bool = False) -> dict:
+    """Run one backtest on synthetic data in this process and return its timings and memory use."""
+    from data.cache import get_cache
+    from utils.progress import progress
+    from utils.tracing import tracer
+
+    progress.configure("headless")
+    tickers = [f"T{i:04d}" for i in range(n_tickers)]
+    dates = pd.bdate_range(end=END_DATE, periods=n_days)
+    start_date = dates[0].strftime("%Y-%m-%d")
+    history_start = (dates[0] - pd.Timedelta(days=HISTORY_DAYS)).strftime("%Y-%m-%d")
+
+    setup_start = time.perf_counter()
+    get_cache().restore(synthetic_market_data(tickers, history_start, END_DATE, seed=seed))
+    from backtester import Backtester
+
+    backtester = Backtester(
+        agent=stub_agent if agent == "stub" else analyst_agent,
+        tickers=tickers,
+        start_date=start_date,
+        end_date=END_DATE,
+        initial_capital=100_000.0 * n_tickers,
+        initial_margin_requirement=0.5,
+        output_mode=output_mode,
+    )
+    setup_time = time.perf_counter() - setup_start
+    rss_before = peak_rss_mb()
+
+    if trace_memory:
+        import tracemalloc
+
+        tracemalloc.start()
+    tracer.enable()
+    start = time.perf_counter()
+    backtester.run_backtest()
+    wall_time = time.perf_counter() - start
+    tracer.disable()
+    heap_peak_mb = None
+    if trace_memory:
+        heap_peak_mb = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        tracemalloc.stop()
+
+    phases = {row["name"]: row["wall_time"] for row in tracer.summarize() if row["category"] == "backtest"}
+    return {
+        "agent": agent,
+        "tickers": n_tickers,
+        "days": len(backtester.portfolio_values) - 1,
+        "setup_s": setup_time,
+        "wall_s": wall_time,
+        "phases_s": {phase: phases.get(phase, 0.0) for phase in PHASES},
+        "other_s": max(wall_time - sum(phases.values()), 0.0),
+        "rss_before_mb": rss_before,
+        "peak_rss_mb": peak_rss_mb(),
+        "heap_peak_mb": heap_peak_mb,
+    }
+
+
+def measure_case(agent: str, n_tickers: int, n_days: int, seed: int, output_mode: str, trace_memory: bool) -> dict:
+    """Run one case in a fresh interpreter, so every case starts from the same memory state."""
+    case = {"agent": agent, "n_tickers": n_tickers, "n_days": n_days, "seed": seed, "output_mode": output_mode, "trace_memory": trace_memory}
+    with tempfile.TemporaryDirectory() as tmp:
+        result_path = os.path.join(tmp, "result.json")
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [SRC_DIR, env.get("PYTHONPATH")]))
+        completed = subprocess.run(
+            [sys.executable, "-m", "benchmarks.backtest", "--case", json.dumps(case), "--case-output", result_path],
+            cwd=SRC_DIR,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        if completed.returncode != 0:
+            raise RuntimeError(f"Backtest benchmark {agent}/{n_tickers} tickers/{n_days} days failed:\n{completed.stderr.strip()}")
+        with open(result_path) as f:
+            return json.load(f)
+
+
+def run_benchmark(
+    agents: list[str],
+    ticker_counts: list[int],
+    day_counts: list[int],
+    repeat: int = 1,
+    seed: int = 0,
+    output_mode: str = "new",
+    trace_memory: bool = False,
+) -> list[dict]:
+    """Measure every (agent, tickers, days) case `repeat` times; times are the medians of the runs."""
+    results = []
+    for agent in agents:
+        for n_tickers in ticker_counts:
+            for n_days in day_counts:
+                print(f"Running {agent} agent: {n_tickers} tickers x {n_days} days...", flush=True)
+                runs = [measure_case(agent, n_tickers, n_days, seed, output_mode, trace_memory) for _ in range(repeat)]
+                result = dict(runs[0])
+                result["wall_s"] = statistics.median(run["wall_s"] for run in runs)
+                result["other_s"] = statistics.median(run["other_s"] for run in runs)
+                result["phases_s"] = {phase: statistics.median(run["phases_s"][phase] for run in runs) for phase in PHASES}
+                result["overhead_ms_per_day"] = (result["wall_s"] - result["phases_s"]["agent"]) / max(result["days"], 1) * 1000
+                results.append(result)
+    return results
+
+
+def print_results(results: list[dict], budget_ms: float | None = None):
+    """Print the per-phase timings and memory of each case."""
+
+    def mb(value):
+        return "" if value is None else f"{value:.0f} MB"
+
+    table = []
+    for result in results:
+        over_budget = budget_ms is not None and result["overhead_ms_per_day"] > budget_ms
+        color = Fore.RED if over_budget else Fore.GREEN
+        table.append(
+            [
+                f"{Fore.CYAN}{result['agent']}{Style.RESET_ALL}",
+                result["tickers"],
+                result["days"],
+                f"{result['wall_s']:.2f}s",
+                *(f"{result['phases_s'][phase] * 1000:.0f}" for phase in PHASES),
+                f"{result['other_s'] * 1000:.0f}",
+                f"{color}{result['overhead_ms_per_day']:.2f}{Style.RESET_ALL}",
+                mb(result["peak_rss_mb"]),
+                mb(result["heap_peak_mb"]),
+            ]
+        )
+    headers = ["Agent", "Tickers", "Days", "Total", *PHASES, "other", "Overhead/day", "Peak RSS", "Peak Heap"]
+    print(f"\n{Fore.WHITE}{Style.BRIGHT}BACKTEST BENCHMARK:{Style.RESET_ALL}")
+    print(tabulate(table, headers=headers, tablefmt="grid", colalign=("left",) + ("right",) * (len(headers) - 1)))
+    print("Phase times are in ms. Overhead/day is the backtester's own time per day in ms: the total minus the time spent in the agent.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the backtest loop on synthetic market data")
+    parser.add_argument("--agents", type=str, default="stub", help="Comma-separated agents: stub (no analysis) and/or analysts (deterministic analysts, no LLM) (default: stub)")
+    parser.add_argument("--tickers", type=str, default="5,20", help="Comma-separated numbers of tickers (default: 5,20)")
+    parser.add_argument("--days", type=str, default="60,250", help="Comma-separated numbers of trading days (default: 60,250)")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per case; the median times are reported (default: 1)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic data (default: 0)")
+    parser.add_argument("--output-mode", type=str, default="new", choices=["full", "tail", "new", "quiet"], help="Backtester output mode; output goes to /dev/null (default: new)")
+    parser.add_argument("--trace-memory", action="store_true", help="Also report the peak Python heap with tracemalloc (slows the run down)")
+    parser.add_argument("--output", type=str, help="Write the results as JSON to this path")
+    parser.add_argument("--budget-ms", type=float, help="Exit non-zero if any case's backtester overhead per day exceeds this many milliseconds")
+    parser.add_argument("--case", type=str, help=argparse.SUPPRESS)
+    parser.add_argument("--case-output", type=str, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # A single case, run in a fresh interpreter by measure_case
+    if args.case:
+        case = json.loads(args.case)
+        result = run_case(case["agent"], case["n_tickers"], case["n_days"], seed=case["seed"], output_mode=case["output_mode"], trace_memory=case["trace_memory"])
+        with open(args.case_output, "w") as f:
+            json.dump(result, f)
+        return
+
+    agents = [agent.strip() for agent in args.agents.split(",") if agent.strip()]
+    for agent in agents:
+        if agent not in AGENTS:
+            parser.error(f"Unknown agent: {agent}")
+    results = run_benchmark(
+        agents,
+        ticker_counts=[int(value) for value in args.tickers.split(",")],
+        day_counts=[int(value) for value in args.days.split(",")],
+        repeat=args.repeat,
+        seed=args.seed,
+        output_mode=args.output_mode,
+        trace_memory=args.trace_memory,
+    )
+    print_results(results, budget_ms=args.budget_ms)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.budget_ms is not None and any(result["overhead_ms_per_day"] > args.budget_ms for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
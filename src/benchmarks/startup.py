@@ -0,0 +1,130 @@
+"""
+Cold-start benchmark for the CLI and API entry points.
+
+Imports each entry point in a fresh interpreter with `python -X importtime`, reports
+the total import time and the slowest modules, and optionally fails when a module
+exceeds its budget so regressions in startup time are caught in CI.
+
+Usage (from src/):
+    python -m benchmarks.startup
+    python -m benchmarks.startup --repeat 5 --top 15 --output startup.json
+    python -m benchmarks.startup --budget-ms 1500
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from colorama import Fore, Style, init
+from tabulate import tabulate
+
+init(autoreset=True)
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPO_DIR = os.path.dirname(SRC_DIR)
+
+# Entry points to measure; start_api's FastAPI app also imports `src.*` modules
+# relative to the repository root
+ENTRY_POINTS = ["main", "backtester", "start_api"]
+
+
+def measure_import(module: str) -> dict[str, float]:
+    """
+    Import `module` in a fresh interpreter and return its `-X importtime` report as a
+    mapping of module name to cumulative import time in milliseconds.
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [SRC_DIR, REPO_DIR, env.get("PYTHONPATH")]))
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SRC_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{completed.stderr.strip().splitlines()[-1]}")
+
+    timings = {}
+    for line in completed.stderr.splitlines():
+        # Format: "import time: <self us> | <cumulative us> | <indented module name>"
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|", 2)
+        if not cumulative.strip().isdigit():
+            continue  # header row
+        timings[name.strip()] = int(cumulative) / 1000
+    return timings
+
+
+def run_benchmark(modules: list[str], repeat: int = 3, top: int = 10) -> list[dict]:
+    """Measure each module `repeat` times; returns one result per module with median and minimum times."""
+    results = []
+    for module in modules:
+        runs = [measure_import(module) for _ in range(repeat)]
+        totals = [run[module] for run in runs]
+        # Slowest dependencies, taken from the fastest run to reduce noise
+        fastest = runs[totals.index(min(totals))]
+        slowest_deps = sorted(((name, ms) for name, ms in fastest.items() if name != module), key=lambda item: item[1], reverse=True)
+        results.append(
+            {
+                "module": module,
+                "median_ms": statistics.median(totals),
+                "min_ms": min(totals),
+                "max_ms": max(totals),
+                "modules_imported": len(fastest),
+                "slowest_imports": [{"module": name, "ms": ms} for name, ms in slowest_deps[:top]],
+            }
+        )
+    return results
+
+
+def print_results(results: list[dict], budget_ms: float | None = None):
+    """Print a summary table and the slowest imports for each entry point."""
+    table = []
+    for result in results:
+        over_budget = budget_ms is not None and result["median_ms"] > budget_ms
+        color = Fore.RED if over_budget else Fore.GREEN
+        table.append(
+            [
+                f"{Fore.CYAN}{result['module']}{Style.RESET_ALL}",
+                f"{color}{result['median_ms']:.0f} ms{Style.RESET_ALL}",
+                f"{result['min_ms']:.0f} ms",
+                f"{result['max_ms']:.0f} ms",
+                result["modules_imported"],
+            ]
+        )
+    print(f"\n{Fore.WHITE}{Style.BRIGHT}STARTUP IMPORT TIME:{Style.RESET_ALL}")
+    print(tabulate(table, headers=["Entry Point", "Median", "Min", "Max", "Modules"], tablefmt="grid", colalign=("left", "right", "right", "right", "right")))
+
+    for result in results:
+        print(f"\n{Fore.WHITE}{Style.BRIGHT}Slowest imports for {result['module']}:{Style.RESET_ALL}")
+        print(tabulate([[item["module"], f"{item['ms']:.0f} ms"] for item in result["slowest_imports"]], headers=["Module", "Cumulative"], tablefmt="simple", colalign=("left", "right")))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold-start import time of the entry points")
+    parser.add_argument("--modules", type=str, default=",".join(ENTRY_POINTS), help="Comma-separated modules to import (default: main,backtester,start_api)")
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh interpreter runs per module (default: 3)")
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest imports to list per module (default: 10)")
+    parser.add_argument("--output", type=str, help="Write the results as JSON to this path")
+    parser.add_argument("--budget-ms", type=float, help="Exit non-zero if any module's median import time exceeds this many milliseconds")
+    args = parser.parse_args()
+
+    modules = [module.strip() for module in args.modules.split(",") if module.strip()]
+    results = run_benchmark(modules, repeat=args.repeat, top=args.top)
+    print_results(results, budget_ms=args.budget_ms)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.budget_ms is not None and any(result["median_ms"] > args.budget_ms for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
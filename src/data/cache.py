@@ -61,6 +61,24 @@ class Cache:
         """Append new company news to cache."""
         self._company_news_cache[ticker] = self._merge_data(self._company_news_cache.get(ticker), data, key_field="date")
 
+    def snapshot(self) -> dict[str, dict[str, list[dict[str, any]]]]:
+        """Get all cached data, e.g. to seed the cache of worker processes."""
+        return {
+            "prices": self._prices_cache,
+            "financial_metrics": self._financial_metrics_cache,
+            "line_items": self._line_items_cache,
+            "insider_trades": self._insider_trades_cache,
+            "company_news": self._company_news_cache,
+        }
+
+    def restore(self, snapshot: dict[str, dict[str, list[dict[str, any]]]]):
+        """Replace the cached data with a snapshot taken by `snapshot()`."""
+        self._prices_cache = dict(snapshot.get("prices", {}))
+        self._financial_metrics_cache = dict(snapshot.get("financial_metrics", {}))
+        self._line_items_cache = dict(snapshot.get("line_items", {}))
+        self._insider_trades_cache = dict(snapshot.get("insider_trades", {}))
+        self._company_news_cache = dict(snapshot.get("company_news", {}))
+
 
 # Global cache instance
 _cache = Cache()
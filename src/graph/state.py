@@ -1,7 +1,7 @@
 from typing_extensions import Annotated, Sequence, TypedDict
 
 import operator
-from langchain_core.messages import BaseMessage
+from langchain_core.messages import BaseMessage, HumanMessage
 
 
 import json
@@ -18,6 +18,26 @@ class AgentState(TypedDict):
     metadata: Annotated[dict[str, any], merge_dicts]
 
 
+def create_agent_message(output: dict[str, any], agent_name: str, metadata: dict[str, any], ref: str | None = None) -> HumanMessage:
+    """
+    Creates the message an agent appends to `messages`.
+
+    By default the message carries the agent's full output as JSON. With
+    `metadata["slim_messages"]` set, it carries only a reference to where the output
+    lives in `data` (the analyst's signals by default) and a per-ticker summary, so
+    large runs hold each agent's signals once instead of copying them into messages.
+    """
+    if not metadata.get("slim_messages"):
+        return HumanMessage(content=json.dumps(output), name=agent_name)
+
+    summary = {}
+    for ticker, value in output.items():
+        if isinstance(value, dict) and ("signal" in value or "action" in value):
+            summary[ticker] = value.get("signal", value.get("action"))
+    content = {"ref": ref or f"data.analyst_signals.{agent_name}", "summary": summary}
+    return HumanMessage(content=json.dumps(content), name=agent_name)
+
+
 def show_agent_reasoning(output, agent_name):
     print(f"\n{'=' * 10} {agent_name.center(28)} {'=' * 10}")
 
@@ -0,0 +1,178 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional, Type, TypeVar
+
+from pydantic import BaseModel, ValidationError
+
+T = TypeVar("T", bound=BaseModel)
+
+
+class LLMCache:
+    """
+    Persistent, content-addressed cache for structured LLM responses.
+
+    Entries are keyed by a hash of the rendered prompt, model name, provider and
+    output schema, and store the validated Pydantic result as JSON in a SQLite file.
+    When the cache grows past `max_entries` or `max_bytes`, the least recently used
+    entries are evicted. In read-only mode the cache is never written to, so
+    benchmark runs see exactly the responses that were recorded beforehand.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        read_only: bool = False,
+        max_entries: Optional[int] = 100_000,
+        max_bytes: Optional[int] = None,
+    ):
+        self.path = path
+        self.read_only = read_only
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if read_only:
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"LLM cache not found at {path} (required in read-only mode)")
+            self._conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        else:
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    model_name TEXT,
+                    model_provider TEXT,
+                    schema_name TEXT,
+                    response TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_accessed REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_accessed ON responses (last_accessed)")
+            self._conn.commit()
+
+    @staticmethod
+    def make_key(prompt: Any, model_name: str, model_provider: str, pydantic_model: Type[BaseModel]) -> str:
+        """Hash the rendered prompt, model, provider and output schema into a cache key."""
+        if hasattr(prompt, "to_messages"):
+            rendered = [{"type": message.type, "content": message.content} for message in prompt.to_messages()]
+        else:
+            rendered = str(prompt)
+
+        payload = json.dumps(
+            {
+                "prompt": rendered,
+                "model_name": model_name,
+                "model_provider": str(getattr(model_provider, "value", model_provider)),
+                "schema": pydantic_model.model_json_schema(),
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str, pydantic_model: Type[T]) -> Optional[T]:
+        """Return the cached result for `key` validated against `pydantic_model`, or None on a miss."""
+        with self._lock:
+            row = self._conn.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            try:
+                result = pydantic_model.model_validate_json(row[0])
+            except ValidationError:
+                # Stored payload no longer matches the schema; treat it as a miss
+                self.misses += 1
+                return None
+
+            if not self.read_only:
+                self._conn.execute("UPDATE responses SET last_accessed = ? WHERE key = ?", (time.time(), key))
+                self._conn.commit()
+
+            self.hits += 1
+            return result
+
+    def set(self, key: str, result: BaseModel, model_name: str = None, model_provider: str = None):
+        """Store a validated result and evict old entries if the cache is over its limits."""
+        if self.read_only:
+            return
+
+        response = result.model_dump_json()
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model_name, model_provider, schema_name, response, size, created_at, last_accessed) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, model_name, str(getattr(model_provider, "value", model_provider)), type(result).__name__, response, len(response), now, now),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits within its limits."""
+        if self.max_entries is not None:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+            if count > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY last_accessed ASC LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+
+        if self.max_bytes is not None:
+            (total_size,) = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()
+            if total_size > self.max_bytes:
+                rows = self._conn.execute("SELECT key, size FROM responses ORDER BY last_accessed ASC").fetchall()
+                to_delete = []
+                for key, size in rows:
+                    if total_size <= self.max_bytes:
+                        break
+                    to_delete.append((key,))
+                    total_size -= size
+                self._conn.executemany("DELETE FROM responses WHERE key = ?", to_delete)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self):
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+# Global cache instance, disabled unless configured
+_llm_cache: Optional[LLMCache] = None
+
+
+def get_llm_cache() -> Optional[LLMCache]:
+    """Get the global LLM response cache, or None if caching is disabled."""
+    return _llm_cache
+
+
+def set_llm_cache(cache: Optional[LLMCache]):
+    """Install (or, with None, remove) the global LLM response cache."""
+    global _llm_cache
+    _llm_cache = cache
+
+
+def configure_llm_cache(
+    path: Optional[str],
+    read_only: bool = False,
+    max_entries: Optional[int] = 100_000,
+    max_bytes: Optional[int] = None,
+) -> Optional[LLMCache]:
+    """Create and install the global LLM response cache from run options. A falsy path disables caching."""
+    cache = LLMCache(path, read_only=read_only, max_entries=max_entries, max_bytes=max_bytes) if path else None
+    set_llm_cache(cache)
+    return cache
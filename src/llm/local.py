@@ -0,0 +1,151 @@
+import asyncio
+import hashlib
+import random
+import re
+import threading
+import time
+import types
+import typing
+from typing import Any, Type
+
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+from pydantic import BaseModel
+
+# Quoted JSON keys that look like ticker symbols, e.g. "AAPL": or "BRK.B":
+TICKER_KEY_PATTERN = re.compile(r'"([A-Z][A-Z0-9.\-]{0,9})"\s*:')
+# Placeholder keys used in the prompts' output format examples
+PLACEHOLDER_TICKER_PATTERN = re.compile(r"TICKER\d*")
+
+# Failure draws are shared across model instances (one is created per call) so the
+# configured failure rate holds over a run while staying reproducible for a seed
+_failure_rngs: dict[int, random.Random] = {}
+_failure_lock = threading.Lock()
+
+
+class LocalChatModel:
+    """
+    Deterministic, offline stand-in for a chat model, used for benchmarking and load tests.
+
+    Structured outputs are generated from the requested Pydantic schema and seeded by a
+    hash of the prompt, so the same prompt always produces the same schema-valid response.
+    Simulated latency and a random failure rate let the pipeline be exercised without
+    provider keys, and compute overhead be measured apart from provider latency.
+    """
+
+    def __init__(self, model: str, latency: float = 0.0, failure_rate: float = 0.0, seed: int = 0):
+        self.model = model
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.seed = seed
+
+    def with_structured_output(self, schema: Type[BaseModel], method: str = "json_mode", include_raw: bool = False):
+        """Return a runnable producing `schema` instances (or raw/parsed dicts with include_raw)."""
+
+        def respond(prompt: Any):
+            text = prompt_to_text(prompt)
+            parsed = generate_instance(schema, self._rng_for(text), extract_tickers(text))
+            if not include_raw:
+                return parsed
+            return {"raw": self._message(text, parsed.model_dump_json()), "parsed": parsed, "parsing_error": None}
+
+        def invoke(prompt: Any):
+            self._simulate_call()
+            return respond(prompt)
+
+        async def ainvoke(prompt: Any):
+            await self._asimulate_call()
+            return respond(prompt)
+
+        return RunnableLambda(invoke, afunc=ainvoke)
+
+    def invoke(self, prompt: Any) -> AIMessage:
+        """Unstructured call; returns an empty JSON object as the message content."""
+        self._simulate_call()
+        return self._message(prompt_to_text(prompt), "{}")
+
+    async def ainvoke(self, prompt: Any) -> AIMessage:
+        await self._asimulate_call()
+        return self._message(prompt_to_text(prompt), "{}")
+
+    def _rng_for(self, text: str) -> random.Random:
+        digest = hashlib.sha256(f"{self.model}:{self.seed}:{text}".encode("utf-8")).hexdigest()
+        return random.Random(int(digest[:16], 16))
+
+    def _should_fail(self) -> bool:
+        if self.failure_rate <= 0:
+            return False
+        with _failure_lock:
+            failure_rng = _failure_rngs.setdefault(self.seed, random.Random(self.seed))
+            return failure_rng.random() < self.failure_rate
+
+    def _simulate_call(self):
+        if self.latency > 0:
+            time.sleep(self.latency)
+        if self._should_fail():
+            raise RuntimeError("Simulated local LLM failure")
+
+    async def _asimulate_call(self):
+        if self.latency > 0:
+            await asyncio.sleep(self.latency)
+        if self._should_fail():
+            raise RuntimeError("Simulated local LLM failure")
+
+    def _message(self, prompt_text: str, content: str) -> AIMessage:
+        # Rough 4-characters-per-token estimate so usage metrics stay meaningful offline
+        input_tokens = len(prompt_text) // 4
+        output_tokens = len(content) // 4
+        return AIMessage(
+            content=content,
+            usage_metadata={"input_tokens": input_tokens, "output_tokens": output_tokens, "total_tokens": input_tokens + output_tokens},
+        )
+
+
+def prompt_to_text(prompt: Any) -> str:
+    """Render a prompt value, message list or string into plain text."""
+    if hasattr(prompt, "to_string"):
+        return prompt.to_string()
+    if isinstance(prompt, list):
+        return "\n".join(str(getattr(message, "content", message)) for message in prompt)
+    return str(prompt)
+
+
+def extract_tickers(text: str) -> list[str]:
+    """Ticker-like JSON keys in the prompt, in order of first appearance."""
+    keys = [key for key in TICKER_KEY_PATTERN.findall(text) if not PLACEHOLDER_TICKER_PATTERN.fullmatch(key)]
+    return list(dict.fromkeys(keys))
+
+
+def generate_instance(model: Type[BaseModel], rng: random.Random, tickers: list[str]) -> BaseModel:
+    """Build a schema-valid instance of `model` from the random generator."""
+    values = {name: generate_value(field.annotation, name, rng, tickers) for name, field in model.model_fields.items()}
+    return model(**values)
+
+
+def generate_value(annotation: Any, field_name: str, rng: random.Random, tickers: list[str]) -> Any:
+    """Generate a value for a single field annotation."""
+    origin = typing.get_origin(annotation)
+    args = typing.get_args(annotation)
+
+    if origin is typing.Literal:
+        return rng.choice(args)
+    if origin in (typing.Union, types.UnionType):
+        non_null = [arg for arg in args if arg is not type(None)]
+        return generate_value(non_null[0], field_name, rng, tickers) if non_null else None
+    if origin is dict:
+        value_type = args[1] if args else str
+        return {ticker: generate_value(value_type, field_name, rng, tickers) for ticker in tickers}
+    if origin is list:
+        item_type = args[0] if args else str
+        return [generate_value(item_type, field_name, rng, tickers)]
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return generate_instance(annotation, rng, tickers)
+    if annotation is bool:
+        return rng.random() < 0.5
+    if annotation is int:
+        return rng.randint(0, 100)
+    if annotation is float:
+        return round(rng.uniform(0.0, 100.0), 1)
+    if annotation is str:
+        return f"Deterministic local {field_name.replace('_', ' ')} (ref {rng.randrange(16 ** 6):06x})."
+    return None
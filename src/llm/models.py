@@ -1,12 +1,12 @@
 import os
-from langchain_anthropic import ChatAnthropic
-from langchain_deepseek import ChatDeepSeek
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_groq import ChatGroq
-from langchain_openai import ChatOpenAI
 from enum import Enum
 from pydantic import BaseModel
-from typing import Tuple
+from typing import TYPE_CHECKING, Tuple
+
+if TYPE_CHECKING:
+    # Provider SDKs are slow to import, so get_model loads only the one it needs
+    from langchain_groq import ChatGroq
+    from langchain_openai import ChatOpenAI
 
 
 class ModelProvider(str, Enum):
@@ -16,6 +16,7 @@ class ModelProvider(str, Enum):
     GEMINI = "Gemini"
     GROQ = "Groq"
     OPENAI = "OpenAI"
+    LOCAL = "Local"
 
 
 
@@ -104,22 +105,51 @@ AVAILABLE_MODELS = [
         model_name="o3-mini",
         provider=ModelProvider.OPENAI
     ),
+    LLMModel(
+        display_name="[local] deterministic (offline benchmarking)",
+        model_name="local-deterministic",
+        provider=ModelProvider.LOCAL
+    ),
 ]
 
 # Create LLM_ORDER in the format expected by the UI
 LLM_ORDER = [model.to_choice_tuple() for model in AVAILABLE_MODELS]
 
+# Default maximum number of in-flight requests per provider. Override with
+# <PROVIDER>_MAX_CONCURRENCY (e.g. GROQ_MAX_CONCURRENCY=1) in your .env file.
+PROVIDER_CONCURRENCY = {
+    ModelProvider.ANTHROPIC: 4,
+    ModelProvider.DEEPSEEK: 4,
+    ModelProvider.GEMINI: 8,
+    ModelProvider.GROQ: 2,
+    ModelProvider.OPENAI: 8,
+    ModelProvider.LOCAL: 64,
+}
+
+def get_provider_concurrency(model_provider: str) -> int:
+    """Get the maximum number of concurrent requests allowed for a provider"""
+    try:
+        provider = ModelProvider(model_provider)
+    except ValueError:
+        return 4
+    override = os.getenv(f"{provider.name}_MAX_CONCURRENCY")
+    if override:
+        return max(1, int(override))
+    return PROVIDER_CONCURRENCY.get(provider, 4)
+
 def get_model_info(model_name: str) -> LLMModel | None:
     """Get model information by model_name"""
     return next((model for model in AVAILABLE_MODELS if model.model_name == model_name), None)
 
-def get_model(model_name: str, model_provider: ModelProvider) -> ChatOpenAI | ChatGroq | None:
+def get_model(model_name: str, model_provider: ModelProvider) -> "ChatOpenAI | ChatGroq | None":
     if model_provider == ModelProvider.GROQ:
         api_key = os.getenv("GROQ_API_KEY")
         if not api_key:
             # Print error to console
             print(f"API Key Error: Please make sure GROQ_API_KEY is set in your .env file.")
             raise ValueError("Groq API key not found.  Please make sure GROQ_API_KEY is set in your .env file.")
+        from langchain_groq import ChatGroq
+
         return ChatGroq(model=model_name, api_key=api_key)
     elif model_provider == ModelProvider.OPENAI:
         # Get and validate API key
@@ -128,22 +158,40 @@ def get_model(model_name: str, model_provider: ModelProvider) -> ChatOpenAI | Ch
             # Print error to console
             print(f"API Key Error: Please make sure OPENAI_API_KEY is set in your .env file.")
             raise ValueError("OpenAI API key not found.  Please make sure OPENAI_API_KEY is set in your .env file.")
+        from langchain_openai import ChatOpenAI
+
         return ChatOpenAI(model=model_name, api_key=api_key)
     elif model_provider == ModelProvider.ANTHROPIC:
         api_key = os.getenv("ANTHROPIC_API_KEY")
         if not api_key:
             print(f"API Key Error: Please make sure ANTHROPIC_API_KEY is set in your .env file.")
             raise ValueError("Anthropic API key not found.  Please make sure ANTHROPIC_API_KEY is set in your .env file.")
+        from langchain_anthropic import ChatAnthropic
+
         return ChatAnthropic(model=model_name, api_key=api_key)
     elif model_provider == ModelProvider.DEEPSEEK:
         api_key = os.getenv("DEEPSEEK_API_KEY")
         if not api_key:
             print(f"API Key Error: Please make sure DEEPSEEK_API_KEY is set in your .env file.")
             raise ValueError("DeepSeek API key not found.  Please make sure DEEPSEEK_API_KEY is set in your .env file.")
+        from langchain_deepseek import ChatDeepSeek
+
         return ChatDeepSeek(model=model_name, api_key=api_key)
     elif model_provider == ModelProvider.GEMINI:
         api_key = os.getenv("GOOGLE_API_KEY")
         if not api_key:
             print(f"API Key Error: Please make sure GOOGLE_API_KEY is set in your .env file.")
             raise ValueError("Google API key not found.  Please make sure GOOGLE_API_KEY is set in your .env file.")
-        return ChatGoogleGenerativeAI(model=model_name, api_key=api_key)
\ No newline at end of file
+        from langchain_google_genai import ChatGoogleGenerativeAI
+
+        return ChatGoogleGenerativeAI(model=model_name, api_key=api_key)
+    elif model_provider == ModelProvider.LOCAL:
+        from llm.local import LocalChatModel
+
+        # Offline deterministic responder; no API key required
+        return LocalChatModel(
+            model=model_name,
+            latency=float(os.getenv("LOCAL_LLM_LATENCY", "0")),
+            failure_rate=float(os.getenv("LOCAL_LLM_FAILURE_RATE", "0")),
+            seed=int(os.getenv("LOCAL_LLM_SEED", "0")),
+        )
@@ -1,3 +1,4 @@
+import atexit
 import sys
 
 from dotenv import load_dotenv
@@ -5,27 +6,24 @@ from langchain_core.messages import HumanMessage
 from langgraph.graph import END, StateGraph
 from colorama import Fore, Back, Style, init
 import questionary
-from agents.ben_graham import ben_graham_agent
-from agents.bill_ackman import bill_ackman_agent
-from agents.fundamentals import fundamentals_agent
 from agents.portfolio_manager import portfolio_management_agent
-from agents.technicals import technical_analyst_agent
 from agents.risk_manager import risk_management_agent
-from agents.sentiment import sentiment_agent
-from agents.warren_buffett import warren_buffett_agent
 from graph.state import AgentState
-from agents.valuation import valuation_agent
 from utils.display import print_trading_output
 from utils.analysts import ANALYST_ORDER, get_analyst_nodes
 from utils.progress import progress
+from utils.tracing import trace_node, tracer
+from utils.llm_latency import llm_latency_policy
+from utils.llm_metrics import llm_metrics
+from utils.rebalance import REBALANCE_FREQUENCIES, is_rebalance_day
 from llm.models import LLM_ORDER, get_model_info
+from llm.cache import configure_llm_cache
 
 import argparse
 from datetime import datetime
 from dateutil.relativedelta import relativedelta
 from tabulate import tabulate
 from utils.visualize import save_graph_as_png
-import json
 
 # Load environment variables from .env file
 load_dotenv()
@@ -33,21 +31,6 @@ load_dotenv()
 init(autoreset=True)
 
 
-def parse_hedge_fund_response(response):
-    """Parses a JSON string and returns a dictionary."""
-    try:
-        return json.loads(response)
-    except json.JSONDecodeError as e:
-        print(f"JSON decoding error: {e}\nResponse: {repr(response)}")
-        return None
-    except TypeError as e:
-        print(f"Invalid response type (expected string, got {type(response).__name__}): {e}")
-        return None
-    except Exception as e:
-        print(f"Unexpected error while parsing response: {e}\nResponse: {repr(response)}")
-        return None
-
-
 
 ##### Run the Hedge Fund #####
 def run_hedge_fund(
@@ -59,42 +42,68 @@ def run_hedge_fund(
     selected_analysts: list[str] = [],
     model_name: str = "gpt-4o",
     model_provider: str = "OpenAI",
+    llm_batch_size: int = 1,
+    decisive_thresholds: tuple[float, float] | None = None,
+    llm_timeout: float | None = None,
+    llm_hedge_model: str | None = None,
+    llm_hedge_after: float | None = None,
+    run_timeout: float | None = None,
+    slim_messages: bool = False,
+    analyst_signals: dict | None = None,
+    analysts_only: bool = False,
 ):
+    """
+    Runs the agent graph for the given tickers and date window.
+
+    Pass precomputed `analyst_signals` to skip the analysts and run only the risk and
+    portfolio managers on them, or set `analysts_only` to run just the analysts (the
+    returned decisions are then None). Together these let a backtest compute signals
+    up front and replay the portfolio logic over them.
+    """
     # Start progress tracking
     progress.start()
 
     try:
         # Create a new workflow if analysts are customized
-        if selected_analysts:
+        if analyst_signals is not None:
+            agent = create_workflow([]).compile()
+        elif analysts_only:
+            agent = create_workflow(selected_analysts or None, include_portfolio=False).compile()
+        elif selected_analysts:
             workflow = create_workflow(selected_analysts)
             agent = workflow.compile()
         else:
             agent = app
 
-        final_state = agent.invoke(
-            {
-                "messages": [
-                    HumanMessage(
-                        content="Make trading decisions based on the provided data.",
-                    )
-                ],
-                "data": {
-                    "tickers": tickers,
-                    "portfolio": portfolio,
-                    "start_date": start_date,
-                    "end_date": end_date,
-                    "analyst_signals": {},
-                },
-                "metadata": {
-                    "show_reasoning": show_reasoning,
-                    "model_name": model_name,
-                    "model_provider": model_provider,
+        with llm_latency_policy(timeout=llm_timeout, hedge_after=llm_hedge_after, hedge_model=llm_hedge_model, run_timeout=run_timeout), tracer.span("run_hedge_fund", "run"):
+            final_state = agent.invoke(
+                {
+                    "messages": [
+                        HumanMessage(
+                            content="Make trading decisions based on the provided data.",
+                        )
+                    ],
+                    "data": {
+                        "tickers": tickers,
+                        "portfolio": portfolio,
+                        "start_date": start_date,
+                        "end_date": end_date,
+                        "analyst_signals": dict(analyst_signals or {}),
+                    },
+                    "metadata": {
+                        "show_reasoning": show_reasoning,
+                        "model_name": model_name,
+                        "model_provider": model_provider,
+                        "llm_batch_size": llm_batch_size,
+                        "decisive_thresholds": decisive_thresholds,
+                        "slim_messages": slim_messages,
+                    },
                 },
-            },
-        )
+            )
 
         return {
-            "decisions": parse_hedge_fund_response(final_state["messages"][-1].content),
+            # The portfolio manager stores its decisions as structured data
+            "decisions": final_state["data"].get("decisions"),
             "analyst_signals": final_state["data"]["analyst_signals"],
         }
     finally:
@@ -107,13 +116,13 @@ def start(state: AgentState):
     return state
 
 
-def create_workflow(selected_analysts=None):
-    """Create the workflow with selected analysts."""
+def create_workflow(selected_analysts=None, include_portfolio=True):
+    """Create the workflow with selected analysts, followed by risk and portfolio management unless `include_portfolio` is False."""
     workflow = StateGraph(AgentState)
     workflow.add_node("start_node", start)
 
-    # Get analyst nodes from the configuration
-    analyst_nodes = get_analyst_nodes()
+    # Get analyst nodes from the configuration (only the selected agents are imported)
+    analyst_nodes = get_analyst_nodes(selected_analysts)
 
     # Default to all analysts if none selected
     if selected_analysts is None:
@@ -121,22 +130,33 @@ def create_workflow(selected_analysts=None):
     # Add selected analyst nodes
     for analyst_key in selected_analysts:
         node_name, node_func = analyst_nodes[analyst_key]
-        workflow.add_node(node_name, node_func)
+        workflow.add_node(node_name, trace_node(node_name, node_func))
         workflow.add_edge("start_node", node_name)
 
-    # Always add risk and portfolio management
-    workflow.add_node("risk_management_agent", risk_management_agent)
-    workflow.add_node("portfolio_management_agent", portfolio_management_agent)
+    workflow.set_entry_point("start_node")
+
+    # Analysts-only graphs end once every analyst is done
+    if not include_portfolio:
+        for analyst_key in selected_analysts:
+            workflow.add_edge(analyst_nodes[analyst_key][0], END)
+        return workflow
+
+    # Add risk and portfolio management
+    workflow.add_node("risk_management_agent", trace_node("risk_management_agent", risk_management_agent))
+    workflow.add_node("portfolio_management_agent", trace_node("portfolio_management_agent", portfolio_management_agent))
 
     # Connect selected analysts to risk management
     for analyst_key in selected_analysts:
         node_name = analyst_nodes[analyst_key][0]
         workflow.add_edge(node_name, "risk_management_agent")
 
+    # Without analysts (e.g. replaying precomputed signals) risk management runs first
+    if not selected_analysts:
+        workflow.add_edge("start_node", "risk_management_agent")
+
     workflow.add_edge("risk_management_agent", "portfolio_management_agent")
     workflow.add_edge("portfolio_management_agent", END)
 
-    workflow.set_entry_point("start_node")
     return workflow
 
 
@@ -165,12 +185,46 @@ if __name__ == "__main__":
     parser.add_argument(
         "--show-agent-graph", action="store_true", help="Show the agent graph"
     )
+    parser.add_argument("--rebalance", type=str, choices=list(REBALANCE_FREQUENCIES), help="Only run the agents if the end date is a scheduled rebalance day (daily, weekly, monthly or on new filings), e.g. for a job started every business day")
+    parser.add_argument("--llm-batch-size", type=int, default=1, help="Number of tickers each persona analyzes per LLM call. Defaults to 1 (one call per ticker)")
+    parser.add_argument("--skip-llm-when-decisive", action="store_true", help="Use a rule-based signal instead of the LLM when a persona's deterministic score is decisive")
+    parser.add_argument("--decisive-bullish-threshold", type=float, default=0.8, help="Score ratio (score / max score) at or above which a bullish signal is decisive. Defaults to 0.8")
+    parser.add_argument("--decisive-bearish-threshold", type=float, default=0.2, help="Score ratio at or below which a bearish signal is decisive. Defaults to 0.2")
+    parser.add_argument("--llm-timeout", type=float, help="Seconds an LLM call may take, retries included, before the agent falls back to its default response")
+    parser.add_argument("--llm-hedge-model", type=str, help="Backup model (from the available models) to send a second request to when the first is slow")
+    parser.add_argument("--llm-hedge-after", type=float, help="Seconds to wait for a response before hedging to --llm-hedge-model. Defaults to half of --llm-timeout")
+    parser.add_argument("--run-timeout", type=float, help="Run-level deadline in seconds; agents still waiting on the LLM after it fall back to their default responses")
+    parser.add_argument("--slim-messages", action="store_true", help="Keep agent outputs only in the graph's data; messages carry a reference and a signal summary instead of the full JSON")
+    parser.add_argument("--profile", action="store_true", help="Trace graph nodes, data fetches and LLM calls and print a timing summary with the critical path")
+    parser.add_argument("--profile-trace", type=str, help="With --profile, also write the spans to this path as Chrome trace JSON (chrome://tracing or Perfetto)")
+    parser.add_argument("--progress", type=str, choices=["auto", "live", "headless"], default="auto", help="Progress display: live table, headless (no rendering) or auto (live only in a terminal). Defaults to auto")
+    parser.add_argument("--progress-log", type=str, help="Append every agent status update to this path as JSON lines")
+    parser.add_argument("--llm-metrics", type=str, help="Write a JSONL record of every LLM call (agent, ticker, tokens, latency) to this path")
+    parser.add_argument("--llm-cache", type=str, help="Path to a persistent LLM response cache (SQLite). Disabled if omitted")
+    parser.add_argument("--llm-cache-read-only", action="store_true", help="Serve from the LLM cache without writing new entries")
+    parser.add_argument("--llm-cache-max-entries", type=int, default=100_000, help="Maximum number of cached LLM responses before eviction. Defaults to 100000")
+    parser.add_argument("--llm-cache-max-bytes", type=int, help="Maximum total size in bytes of the cached LLM responses before eviction. Unlimited if omitted")
 
     args = parser.parse_args()
 
+    configure_llm_cache(args.llm_cache, read_only=args.llm_cache_read_only, max_entries=args.llm_cache_max_entries, max_bytes=args.llm_cache_max_bytes)
+    progress.configure(args.progress)
+    if args.profile:
+        tracer.enable()
+    if args.progress_log:
+        # Close the event log however the run ends (including the early exits below)
+        atexit.register(progress.log_to_file(args.progress_log))
+
     # Parse tickers from comma-separated string
     tickers = [ticker.strip() for ticker in args.tickers.split(",")]
 
+    # Scheduled runs exit early on days without a rebalance
+    if args.rebalance:
+        rebalance_date = args.end_date or datetime.now().strftime("%Y-%m-%d")
+        if not is_rebalance_day(rebalance_date, args.rebalance, tickers):
+            print(f"No {args.rebalance} rebalance scheduled on {rebalance_date}. Skipping the agent run.")
+            sys.exit(0)
+
     # Select analysts
     selected_analysts = None
     choices = questionary.checkbox(
@@ -286,5 +340,21 @@ if __name__ == "__main__":
         selected_analysts=selected_analysts,
         model_name=model_choice,
         model_provider=model_provider,
+        llm_batch_size=args.llm_batch_size,
+        decisive_thresholds=(args.decisive_bearish_threshold, args.decisive_bullish_threshold) if args.skip_llm_when_decisive else None,
+        llm_timeout=args.llm_timeout,
+        llm_hedge_model=args.llm_hedge_model,
+        llm_hedge_after=args.llm_hedge_after,
+        run_timeout=args.run_timeout,
+        slim_messages=args.slim_messages,
     )
     print_trading_output(result)
+
+    llm_metrics.print_summary()
+    if args.llm_metrics:
+        llm_metrics.export_jsonl(args.llm_metrics)
+
+    if args.profile:
+        tracer.print_summary()
+        if args.profile_trace:
+            tracer.export_chrome_trace(args.profile_trace)
@@ -3,6 +3,7 @@ import pandas as pd
 import requests
 
 from data.cache import get_cache
+from utils.tracing import traced
 from data.models import (
     CompanyNews,
     CompanyNewsResponse,
@@ -20,6 +21,7 @@ from data.models import (
 _cache = get_cache()
 
 
+@traced(category="data")
 def get_prices(ticker: str, start_date: str, end_date: str) -> list[Price]:
     """Fetch price data from cache or API."""
     # Check cache first
@@ -51,6 +53,7 @@ def get_prices(ticker: str, start_date: str, end_date: str) -> list[Price]:
     return prices
 
 
+@traced(category="data")
 def get_financial_metrics(
     ticker: str,
     end_date: str,
@@ -89,6 +92,7 @@ def get_financial_metrics(
     return financial_metrics
 
 
+@traced(category="data")
 def search_line_items(
     ticker: str,
     line_items: list[str],
@@ -124,6 +128,7 @@ def search_line_items(
     return search_results[:limit]
 
 
+@traced(category="data")
 def get_insider_trades(
     ticker: str,
     end_date: str,
@@ -187,6 +192,7 @@ def get_insider_trades(
     return all_trades
 
 
+@traced(category="data")
 def get_company_news(
     ticker: str,
     end_date: str,
@@ -251,6 +257,7 @@ def get_company_news(
 
 
 
+@traced(category="data")
 def get_market_cap(
     ticker: str,
     end_date: str,
@@ -1,78 +1,68 @@
 """Constants and utilities related to analysts configuration."""
 
-from agents.ben_graham import ben_graham_agent
-from agents.bill_ackman import bill_ackman_agent
-from agents.cathie_wood import cathie_wood_agent
-from agents.charlie_munger import charlie_munger_agent
-from agents.fundamentals import fundamentals_agent
-from agents.phil_fisher import phil_fisher_agent
-from agents.peter_lynch import peter_lynch_agent
-from agents.sentiment import sentiment_agent
-from agents.stanley_druckenmiller import stanley_druckenmiller_agent
-from agents.technicals import technical_analyst_agent
-from agents.valuation import valuation_agent
-from agents.warren_buffett import warren_buffett_agent
+from importlib import import_module
 
 # Define analyst configuration - single source of truth
+# Agent functions are given by import path and only loaded when an analyst is used
 ANALYST_CONFIG = {
     "ben_graham": {
         "display_name": "Ben Graham",
-        "agent_func": ben_graham_agent,
+        "agent_func": "agents.ben_graham.ben_graham_agent",
         "order": 0,
     },
     "bill_ackman": {
         "display_name": "Bill Ackman",
-        "agent_func": bill_ackman_agent,
+        "agent_func": "agents.bill_ackman.bill_ackman_agent",
         "order": 1,
     },
     "cathie_wood": {
         "display_name": "Cathie Wood",
-        "agent_func": cathie_wood_agent,
+        "agent_func": "agents.cathie_wood.cathie_wood_agent",
         "order": 2,
     },
     "charlie_munger": {
         "display_name": "Charlie Munger",
-        "agent_func": charlie_munger_agent,
+        "agent_func": "agents.charlie_munger.charlie_munger_agent",
         "order": 3,
     },
     "peter_lynch": {
         "display_name": "Peter Lynch",
-        "agent_func": peter_lynch_agent,
+        "agent_func": "agents.peter_lynch.peter_lynch_agent",
         "order": 4,
     },
     "phil_fisher": {
         "display_name": "Phil Fisher",
-        "agent_func": phil_fisher_agent,
+        "agent_func": "agents.phil_fisher.phil_fisher_agent",
         "order": 5,
     },
     "stanley_druckenmiller": {
         "display_name": "Stanley Druckenmiller",
-        "agent_func": stanley_druckenmiller_agent,
+        "agent_func": "agents.stanley_druckenmiller.stanley_druckenmiller_agent",
         "order": 6,
     },
     "warren_buffett": {
         "display_name": "Warren Buffett",
-        "agent_func": warren_buffett_agent,
+        "agent_func": "agents.warren_buffett.warren_buffett_agent",
         "order": 7,
     },
     "technical_analyst": {
         "display_name": "Technical Analyst",
-        "agent_func": technical_analyst_agent,
+        "agent_func": "agents.technicals.technical_analyst_agent",
         "order": 8,
     },
     "fundamentals_analyst": {
         "display_name": "Fundamentals Analyst",
-        "agent_func": fundamentals_agent,
+        "agent_func": "agents.fundamentals.fundamentals_agent",
         "order": 9,
     },
     "sentiment_analyst": {
         "display_name": "Sentiment Analyst",
-        "agent_func": sentiment_agent,
+        "agent_func": "agents.sentiment.sentiment_agent",
         "order": 10,
     },
     "valuation_analyst": {
         "display_name": "Valuation Analyst",
-        "agent_func": valuation_agent,
+        "agent_func": "agents.valuation.valuation_agent",
         "order": 11,
     },
 }
@@ -81,6 +71,13 @@ ANALYST_CONFIG = {
 ANALYST_ORDER = [(config["display_name"], key) for key, config in sorted(ANALYST_CONFIG.items(), key=lambda x: x[1]["order"])]
 
 
-def get_analyst_nodes():
-    """Get the mapping of analyst keys to their (node_name, agent_func) tuples."""
-    return {key: (f"{key}_agent", config["agent_func"]) for key, config in ANALYST_CONFIG.items()}
+def load_agent_func(analyst_key: str):
+    """Import and return the agent function for an analyst."""
+    module_path, func_name = ANALYST_CONFIG[analyst_key]["agent_func"].rsplit(".", 1)
+    return getattr(import_module(module_path), func_name)
+
+
+def get_analyst_nodes(analyst_keys: list[str] | None = None):
+    """Get the mapping of analyst keys to their (node_name, agent_func) tuples, importing only the requested analysts (all by default)."""
+    keys = analyst_keys if analyst_keys is not None else list(ANALYST_CONFIG)
+    return {key: (f"{key}_agent", load_agent_func(key)) for key in keys}
@@ -1,5 +1,7 @@
 from colorama import Fore, Style
 from tabulate import tabulate
+from pydantic import BaseModel
+from typing import Optional
 from .analysts import ANALYST_ORDER
 import os
 import json
@@ -226,52 +228,91 @@ def print_trading_output(result: dict) -> None:
         print(f"{Fore.CYAN}{wrapped_reasoning}{Style.RESET_ALL}")
 
 
-def print_backtest_results(table_rows: list) -> None:
-    """Print the backtest results in a nicely formatted table"""
-    # Clear the screen
-    os.system("cls" if os.name == "nt" else "clear")
+BACKTEST_OUTPUT_MODES = ("full", "tail", "new", "quiet")
 
-    # Split rows into ticker rows and summary rows
-    ticker_rows = []
-    summary_rows = []
 
-    for row in table_rows:
-        if isinstance(row[1], str) and "PORTFOLIO SUMMARY" in row[1]:
-            summary_rows.append(row)
-        else:
-            ticker_rows.append(row)
+class BacktestRow(BaseModel):
+    """One row of the backtest results: a ticker's trade on a day, or that day's portfolio summary."""
+    date: str
+    ticker: str
+    action: str
+    quantity: float
+    price: float
+    shares_owned: float
+    position_value: float
+    bullish_count: int
+    bearish_count: int
+    neutral_count: int
+    is_summary: bool = False
+    total_value: Optional[float] = None
+    return_pct: Optional[float] = None
+    cash_balance: Optional[float] = None
+    total_position_value: Optional[float] = None
+    sharpe_ratio: Optional[float] = None
+    sortino_ratio: Optional[float] = None
+    max_drawdown: Optional[float] = None
+
+
+def print_backtest_results(table_rows: list[BacktestRow], mode: str = "full", tail_days: int = 5, clear_screen: bool = True) -> None:
+    """
+    Print the latest portfolio summary and a table of the backtest rows.
+
+    Rows are kept as structured records and only the rows shown are formatted. The
+    output mode picks which rows are shown:
+    - "full": clear the screen and show every day so far
+    - "tail": clear the screen and show only the last `tail_days` days
+    - "new": append only the latest day's rows, without clearing the screen
+    - "quiet": print nothing
+
+    With `clear_screen=False` the "full" and "tail" modes print below the existing output,
+    as the backtester does for its final full table after a "tail" or "new" run.
+    """
+    if mode == "quiet" or not table_rows:
+        return
+    if mode not in BACKTEST_OUTPUT_MODES:
+        raise ValueError(f"Unknown backtest output mode: {mode}")
+
+    if mode == "full":
+        shown_rows = table_rows
+    else:
+        # Walk back from the end over the days to show
+        days = 1 if mode == "new" else max(tail_days, 1)
+        start = len(table_rows)
+        shown_dates = set()
+        while start > 0 and (table_rows[start - 1].date in shown_dates or len(shown_dates) < days):
+            shown_dates.add(table_rows[start - 1].date)
+            start -= 1
+        shown_rows = table_rows[start:]
+
+    if mode != "new" and clear_screen:
+        # Clear the screen
+        os.system("cls" if os.name == "nt" else "clear")
 
-    
     # Display latest portfolio summary
-    if summary_rows:
-        latest_summary = summary_rows[-1]
-        print(f"\n{Fore.WHITE}{Style.BRIGHT}PORTFOLIO SUMMARY:{Style.RESET_ALL}")
-
-        # Extract values and remove commas before converting to float
-        cash_str = latest_summary[7].split("$")[1].split(Style.RESET_ALL)[0].replace(",", "")
-        position_str = latest_summary[6].split("$")[1].split(Style.RESET_ALL)[0].replace(",", "")
-        total_str = latest_summary[8].split("$")[1].split(Style.RESET_ALL)[0].replace(",", "")
-
-        print(f"Cash Balance: {Fore.CYAN}${float(cash_str):,.2f}{Style.RESET_ALL}")
-        print(f"Total Position Value: {Fore.YELLOW}${float(position_str):,.2f}{Style.RESET_ALL}")
-        print(f"Total Value: {Fore.WHITE}${float(total_str):,.2f}{Style.RESET_ALL}")
-        print(f"Return: {latest_summary[9]}")
-        
+    latest_summary = next((row for row in reversed(table_rows) if row.is_summary), None)
+    if latest_summary is not None:
+        print(f"\n{Fore.WHITE}{Style.BRIGHT}PORTFOLIO SUMMARY ({latest_summary.date}):{Style.RESET_ALL}")
+        print(f"Cash Balance: {Fore.CYAN}${latest_summary.cash_balance:,.2f}{Style.RESET_ALL}")
+        print(f"Total Position Value: {Fore.YELLOW}${latest_summary.total_position_value:,.2f}{Style.RESET_ALL}")
+        print(f"Total Value: {Fore.WHITE}${latest_summary.total_value:,.2f}{Style.RESET_ALL}")
+        return_color = Fore.GREEN if latest_summary.return_pct >= 0 else Fore.RED
+        print(f"Return: {return_color}{latest_summary.return_pct:+.2f}%{Style.RESET_ALL}")
+
         # Display performance metrics if available
-        if latest_summary[10]:  # Sharpe ratio
-            print(f"Sharpe Ratio: {latest_summary[10]}")
-        if latest_summary[11]:  # Sortino ratio
-            print(f"Sortino Ratio: {latest_summary[11]}")
-        if latest_summary[12]:  # Max drawdown
-            print(f"Max Drawdown: {latest_summary[12]}")
+        if latest_summary.sharpe_ratio is not None:
+            print(f"Sharpe Ratio: {Fore.YELLOW}{latest_summary.sharpe_ratio:.2f}{Style.RESET_ALL}")
+        if latest_summary.sortino_ratio is not None:
+            print(f"Sortino Ratio: {Fore.YELLOW}{latest_summary.sortino_ratio:.2f}{Style.RESET_ALL}")
+        if latest_summary.max_drawdown is not None:
+            print(f"Max Drawdown: {Fore.RED}{abs(latest_summary.max_drawdown):.2f}%{Style.RESET_ALL}")
 
     # Add vertical spacing
-    print("\n" * 2)
+    print("\n" * (1 if mode == "new" else 2))
 
     # Print the table with just ticker rows
     print(
         tabulate(
-            ticker_rows,
+            [format_backtest_row(**row.model_dump()) for row in shown_rows if not row.is_summary],
             headers=[
                 "Date",
                 "Ticker",
@@ -301,7 +342,7 @@ def print_backtest_results(table_rows: list) -> None:
     )
 
     # Add vertical spacing
-    print("\n" * 4)
+    print("\n" * (1 if mode == "new" else 4))
 
 
 def format_backtest_row(
@@ -1,12 +1,26 @@
 """Helper functions for LLM"""
 
+import asyncio
+import contextvars
 import json
-from typing import TypeVar, Type, Optional, Any
-from pydantic import BaseModel
+import random
+import threading
+import time
+import weakref
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import lru_cache
+from typing import Callable, TypeVar, Type, Optional, Any
+from langchain_core.prompts import ChatPromptTemplate
+from pydantic import BaseModel, Field, create_model
+from utils.llm_latency import LatencyPolicy, get_latency_policy
+from utils.llm_metrics import LLMCall, llm_metrics
 from utils.progress import progress
+from utils.tracing import traced
+from utils.prompt import encode_batch_analysis_data
 
 T = TypeVar('T', bound=BaseModel)
 
+@traced(category="llm", arg_names=("agent_name", "model_name"))
 def call_llm(
     prompt: Any,
     model_name: str,
@@ -14,7 +28,8 @@ def call_llm(
     pydantic_model: Type[T],
     agent_name: Optional[str] = None,
     max_retries: int = 3,
-    default_factory = None
+    default_factory = None,
+    ticker: Optional[str] = None,
 ) -> T:
     """
     Makes an LLM call with retry logic, handling both Deepseek and non-Deepseek models.
@@ -27,36 +42,46 @@ def call_llm(
         agent_name: Optional name of the agent for progress updates
         max_retries: Maximum number of retries (default: 3)
         default_factory: Optional factory function to create default response on failure
+        ticker: Optional ticker (or comma-separated tickers) the call is about, for metrics
         
     Returns:
         An instance of the specified Pydantic model
     """
-    from llm.models import get_model, get_model_info
-    
-    model_info = get_model_info(model_name)
-    llm = get_model(model_name, model_provider)
-    
-    # For non-JSON support models, we can use structured output
-    if not (model_info and not model_info.has_json_mode()):
-        llm = llm.with_structured_output(
-            pydantic_model,
-            method="json_mode",
-        )
-    
-    # Call the LLM with retries
+    call = llm_metrics.start_call(agent_name, ticker, model_name, model_provider)
+
+    # Serve from the response cache when one is configured
+    cache, cache_key, cached_result = lookup_cached_response(prompt, model_name, model_provider, pydantic_model)
+    if cached_result is not None:
+        return call.finish(cached_result, cache_hit=True)
+
+    model_info, llm = get_structured_llm(model_name, model_provider, pydantic_model)
+    semaphore = get_provider_semaphore(model_provider)
+    policy = get_latency_policy()
+    started = time.monotonic()
+
+    # Call the LLM with retries, backing off between attempts
     for attempt in range(max_retries):
+        # Past the call's timeout or the run deadline, skip straight to the default response
+        if policy is not None and policy.expired(started):
+            if agent_name:
+                progress.update_status(agent_name, None, "Deadline reached - using default")
+            return call.finish(default_factory() if default_factory else create_default_response(pydantic_model), retries=attempt, used_default=True, timed_out=True)
+
         try:
-            # Call the LLM
-            result = llm.invoke(prompt)
-            
-            # For non-JSON support models, we need to extract and parse the JSON manually
-            if model_info and not model_info.has_json_mode():
-                parsed_result = extract_json_from_deepseek_response(result.content)
-                if parsed_result:
-                    return pydantic_model(**parsed_result)
+            if policy is None:
+                # Call the LLM, holding one of the provider's concurrency slots
+                with semaphore:
+                    result = llm.invoke(prompt)
+                result = parse_llm_result(result, model_info, pydantic_model, call)
             else:
-                return result
-                
+                result = invoke_with_policy(prompt, llm, model_info, model_provider, pydantic_model, call, policy, started)
+
+            if result is not None:
+                # Only validated responses from the requested model are cached; defaults and hedged responses never are
+                if cache is not None and not call.hedged:
+                    cache.set(cache_key, result, model_name=model_name, model_provider=model_provider)
+                return call.finish(result, retries=attempt)
+
         except Exception as e:
             if agent_name:
                 progress.update_status(agent_name, None, f"Error - retry {attempt + 1}/{max_retries}")
@@ -65,11 +90,282 @@ def call_llm(
                 print(f"Error in LLM call after {max_retries} attempts: {e}")
                 # Use default_factory if provided, otherwise create a basic default
                 if default_factory:
-                    return default_factory()
-                return create_default_response(pydantic_model)
+                    return call.finish(default_factory(), retries=attempt, used_default=True, timed_out=isinstance(e, TimeoutError))
+                return call.finish(create_default_response(pydantic_model), retries=attempt, used_default=True, timed_out=isinstance(e, TimeoutError))
+
+        if attempt < max_retries - 1:
+            time.sleep(backoff_delay(attempt, remaining=policy.remaining(started) if policy is not None else None))
+
+    # Reached only when every attempt returned unparseable output
+    return call.finish(create_default_response(pydantic_model), retries=max_retries - 1, used_default=True)
+
+
+@traced(category="llm", arg_names=("agent_name", "model_name"))
+async def acall_llm(
+    prompt: Any,
+    model_name: str,
+    model_provider: str,
+    pydantic_model: Type[T],
+    agent_name: Optional[str] = None,
+    max_retries: int = 3,
+    default_factory = None,
+    ticker: Optional[str] = None,
+) -> T:
+    """
+    Async counterpart of `call_llm` built on the LangChain async APIs.
+
+    Concurrent calls are limited per provider (see `llm.models.get_provider_concurrency`),
+    so many of them can be gathered at once without exceeding the provider's rate limits.
+    Takes the same arguments and returns the same result as `call_llm`.
+    """
+    call = llm_metrics.start_call(agent_name, ticker, model_name, model_provider)
+
+    cache, cache_key, cached_result = lookup_cached_response(prompt, model_name, model_provider, pydantic_model)
+    if cached_result is not None:
+        return call.finish(cached_result, cache_hit=True)
+
+    model_info, llm = get_structured_llm(model_name, model_provider, pydantic_model)
+    semaphore = get_provider_async_semaphore(model_provider)
+    policy = get_latency_policy()
+    started = time.monotonic()
+
+    for attempt in range(max_retries):
+        if policy is not None and policy.expired(started):
+            if agent_name:
+                progress.update_status(agent_name, None, "Deadline reached - using default")
+            return call.finish(default_factory() if default_factory else create_default_response(pydantic_model), retries=attempt, used_default=True, timed_out=True)
+
+        try:
+            if policy is None:
+                async with semaphore:
+                    result = await llm.ainvoke(prompt)
+                result = parse_llm_result(result, model_info, pydantic_model, call)
+            else:
+                result = await ainvoke_with_policy(prompt, llm, model_info, model_provider, pydantic_model, call, policy, started)
+
+            if result is not None:
+                if cache is not None and not call.hedged:
+                    cache.set(cache_key, result, model_name=model_name, model_provider=model_provider)
+                return call.finish(result, retries=attempt)
+
+        except Exception as e:
+            if agent_name:
+                progress.update_status(agent_name, None, f"Error - retry {attempt + 1}/{max_retries}")
+
+            if attempt == max_retries - 1:
+                print(f"Error in LLM call after {max_retries} attempts: {e}")
+                if default_factory:
+                    return call.finish(default_factory(), retries=attempt, used_default=True, timed_out=isinstance(e, TimeoutError))
+                return call.finish(create_default_response(pydantic_model), retries=attempt, used_default=True, timed_out=isinstance(e, TimeoutError))
+
+        if attempt < max_retries - 1:
+            await asyncio.sleep(backoff_delay(attempt, remaining=policy.remaining(started) if policy is not None else None))
+
+    return call.finish(create_default_response(pydantic_model), retries=max_retries - 1, used_default=True)
+
+
+def lookup_cached_response(prompt: Any, model_name: str, model_provider: str, pydantic_model: Type[T]) -> tuple[Any, Optional[str], Optional[T]]:
+    """Returns (cache, cache_key, cached_result); cache and key are None when caching is disabled."""
+    from llm.cache import get_llm_cache
+
+    cache = get_llm_cache()
+    if cache is None:
+        return None, None, None
+    cache_key = cache.make_key(prompt, model_name, model_provider, pydantic_model)
+    return cache, cache_key, cache.get(cache_key, pydantic_model)
+
+
+def get_structured_llm(model_name: str, model_provider: str, pydantic_model: Type[T]):
+    """Returns (model_info, llm), with JSON-mode structured output enabled where the model supports it."""
+    from llm.models import get_model, get_model_info
+
+    model_info = get_model_info(model_name)
+    llm = get_model(model_name, model_provider)
+
+    # For non-JSON support models, we can use structured output.
+    # The raw message is kept alongside the parsed output for token accounting.
+    if not (model_info and not model_info.has_json_mode()):
+        llm = llm.with_structured_output(
+            pydantic_model,
+            method="json_mode",
+            include_raw=True,
+        )
+    return model_info, llm
+
+
+def parse_llm_result(result: Any, model_info, pydantic_model: Type[T], call: Optional[LLMCall] = None) -> Optional[T]:
+    """Returns the validated result, or None if a non-JSON-mode response held no parseable JSON."""
+    raw_message = result["raw"] if isinstance(result, dict) else result
+    if call is not None:
+        call.add_usage(raw_message)
+
+    # For non-JSON support models, we need to extract and parse the JSON manually
+    if model_info and not model_info.has_json_mode():
+        parsed_result = extract_json_from_deepseek_response(raw_message.content)
+        if parsed_result:
+            return pydantic_model(**parsed_result)
+        return None
+
+    if isinstance(result, dict):
+        if result.get("parsing_error"):
+            raise result["parsing_error"]
+        if result.get("parsed") is None:
+            raise ValueError("LLM returned no structured output")
+        return result["parsed"]
+    return result
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 30.0, remaining: Optional[float] = None) -> float:
+    """Full-jitter exponential backoff: a random delay in [0, min(cap, base * 2 ** attempt)] seconds, never longer than `remaining`."""
+    delay = random.uniform(0, min(cap, base * 2 ** attempt))
+    return delay if remaining is None else min(delay, remaining)
+
+
+# Worker threads for timed and hedged calls. A timed-out request cannot be cancelled,
+# so it finishes in the background while the caller moves on.
+_llm_executor = ThreadPoolExecutor(max_workers=64, thread_name_prefix="llm-call")
+
+
+def invoke_with_policy(
+    prompt: Any,
+    llm,
+    model_info,
+    model_provider: str,
+    pydantic_model: Type[T],
+    call: LLMCall,
+    policy: LatencyPolicy,
+    call_started: float,
+) -> Optional[T]:
+    """
+    Makes one LLM attempt under a latency policy.
+
+    The attempt is abandoned with a TimeoutError once the call's time budget (see
+    `LatencyPolicy.remaining`) runs out.
+    If the response is slower than `policy.hedge_after`, the same prompt is also sent to
+    the hedge model and the first valid response wins (`call.hedged` is set when it is
+    the hedge's). A failure is raised only once every in-flight request has failed.
+    """
+    def attempt(attempt_llm, attempt_model_info, attempt_provider):
+        with get_provider_semaphore(attempt_provider):
+            result = attempt_llm.invoke(prompt)
+        return parse_llm_result(result, attempt_model_info, pydantic_model, call)
+
+    def submit(*args):
+        return _llm_executor.submit(contextvars.copy_context().run, attempt, *args)
+
+    start = time.monotonic()
+    timeout = policy.remaining(call_started)
+    deadline = start + timeout if timeout is not None else None
+    hedge_at = start + policy.hedge_after if policy.should_hedge() else None
+
+    primary = submit(llm, model_info, model_provider)
+    pending = {primary}
+    error = None
+    while pending:
+        wake_at = min(t for t in (deadline, hedge_at) if t is not None) if (deadline or hedge_at) else None
+        done, pending = wait(pending, timeout=None if wake_at is None else max(0.0, wake_at - time.monotonic()), return_when=FIRST_COMPLETED)
+
+        for future in done:
+            if future.exception() is not None:
+                error = future.exception()
+            elif future.result() is not None:
+                call.hedged = future is not primary
+                return future.result()
+
+        now = time.monotonic()
+        if hedge_at is not None and now >= hedge_at and pending:
+            hedge_info, hedge_llm = get_structured_llm(policy.hedge_model, policy.hedge_provider, pydantic_model)
+            pending.add(submit(hedge_llm, hedge_info, policy.hedge_provider))
+            hedge_at = None
+        elif deadline is not None and now >= deadline and pending:
+            raise TimeoutError("LLM call ran out of time")
+
+    if error is not None:
+        raise error
+    return None
+
+
+async def ainvoke_with_policy(
+    prompt: Any,
+    llm,
+    model_info,
+    model_provider: str,
+    pydantic_model: Type[T],
+    call: LLMCall,
+    policy: LatencyPolicy,
+    call_started: float,
+) -> Optional[T]:
+    """Async counterpart of `invoke_with_policy`; abandoned requests are cancelled."""
+    async def attempt(attempt_llm, attempt_model_info, attempt_provider):
+        async with get_provider_async_semaphore(attempt_provider):
+            result = await attempt_llm.ainvoke(prompt)
+        return parse_llm_result(result, attempt_model_info, pydantic_model, call)
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    timeout = policy.remaining(call_started)
+    deadline = start + timeout if timeout is not None else None
+    hedge_at = start + policy.hedge_after if policy.should_hedge() else None
+
+    primary = asyncio.ensure_future(attempt(llm, model_info, model_provider))
+    pending = {primary}
+    error = None
+    try:
+        while pending:
+            wake_at = min(t for t in (deadline, hedge_at) if t is not None) if (deadline or hedge_at) else None
+            done, pending = await asyncio.wait(pending, timeout=None if wake_at is None else max(0.0, wake_at - loop.time()), return_when=asyncio.FIRST_COMPLETED)
+
+            for task in done:
+                if task.exception() is not None:
+                    error = task.exception()
+                elif task.result() is not None:
+                    call.hedged = task is not primary
+                    return task.result()
+
+            now = loop.time()
+            if hedge_at is not None and now >= hedge_at and pending:
+                hedge_info, hedge_llm = get_structured_llm(policy.hedge_model, policy.hedge_provider, pydantic_model)
+                pending.add(asyncio.ensure_future(attempt(hedge_llm, hedge_info, policy.hedge_provider)))
+                hedge_at = None
+            elif deadline is not None and now >= deadline and pending:
+                raise TimeoutError("LLM call ran out of time")
+    finally:
+        for task in pending:
+            task.cancel()
+
+    if error is not None:
+        raise error
+    return None
+
+
+_provider_semaphores: dict[str, threading.BoundedSemaphore] = {}
+_async_provider_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, asyncio.Semaphore]]" = weakref.WeakKeyDictionary()
+_semaphores_lock = threading.Lock()
+
+
+def get_provider_semaphore(model_provider: str) -> threading.BoundedSemaphore:
+    """Get the process-wide semaphore limiting concurrent sync calls to a provider."""
+    from llm.models import get_provider_concurrency
+
+    provider = str(getattr(model_provider, "value", model_provider))
+    with _semaphores_lock:
+        if provider not in _provider_semaphores:
+            _provider_semaphores[provider] = threading.BoundedSemaphore(get_provider_concurrency(provider))
+        return _provider_semaphores[provider]
+
+
+def get_provider_async_semaphore(model_provider: str) -> asyncio.Semaphore:
+    """Get the semaphore limiting concurrent async calls to a provider on the running event loop."""
+    from llm.models import get_provider_concurrency
+
+    provider = str(getattr(model_provider, "value", model_provider))
+    loop = asyncio.get_running_loop()
+    with _semaphores_lock:
+        loop_semaphores = _async_provider_semaphores.setdefault(loop, {})
+        if provider not in loop_semaphores:
+            loop_semaphores[provider] = asyncio.Semaphore(get_provider_concurrency(provider))
+        return loop_semaphores[provider]
 
-    # This should never be reached due to the retry logic above
-    return create_default_response(pydantic_model)
 
 def create_default_response(model_class: Type[T]) -> T:
     """Creates a safe default response based on the model's fields."""
@@ -105,3 +401,167 @@ def extract_json_from_deepseek_response(content: str) -> Optional[dict]:
     except Exception as e:
         print(f"Error extracting JSON from Deepseek response: {e}")
     return None
+
+
+BATCH_PROMPT = """Based on the following analysis, create an investment signal for each of these tickers: {tickers}
+
+Analysis Data by ticker:
+{analysis_data}
+
+Judge every ticker independently. Return JSON exactly in this format, with one entry per ticker:
+{{
+  "signals": {{
+    "TICKER": {{
+      "signal": "bullish" | "bearish" | "neutral",
+      "confidence": float between 0 and 100,
+      "reasoning": "string"
+    }}
+  }}
+}}
+"""
+
+
+@lru_cache(maxsize=None)
+def get_batch_model(pydantic_model: Type[T]) -> Type[BaseModel]:
+    """Wraps a single-ticker signal model into a ticker -> signal dictionary model."""
+    return create_model(
+        f"{pydantic_model.__name__}Batch",
+        signals=(dict[str, pydantic_model], Field(description="Dictionary of ticker to signal")),
+    )
+
+
+def generate_persona_signals(
+    agent_name: str,
+    tickers: list[str],
+    analysis_data: dict[str, dict],
+    generate_output: Callable[..., T],
+    prompt_template: ChatPromptTemplate,
+    pydantic_model: Type[T],
+    metadata: dict[str, Any],
+    status: str,
+) -> dict[str, T]:
+    """
+    Generates a persona signal for every ticker from its analysis data.
+
+    By default each ticker gets its own LLM call through `generate_output`. When
+    `metadata["llm_batch_size"]` is greater than 1, tickers are grouped and sent in a
+    single prompt that reuses the persona's system message; any ticker missing from a
+    batched response (or in a batch that failed validation) falls back to its own call.
+
+    When `metadata["decisive_thresholds"]` is set to `(bearish, bullish)` score ratios,
+    tickers whose deterministic score is decisive get a rule-based signal instead (see
+    `create_decisive_signal`) and only the borderline tickers go to the LLM.
+
+    Args:
+        agent_name: Name of the agent for progress updates
+        tickers: Tickers to generate signals for, in order
+        analysis_data: Per-ticker analysis data
+        generate_output: The persona's single-ticker generate function
+        prompt_template: The persona's single-ticker prompt template
+        pydantic_model: The persona's signal model
+        metadata: The run metadata from the agent state
+        status: Progress status shown while the LLM is working
+
+    Returns:
+        A dictionary of ticker to signal
+    """
+    model_name = metadata["model_name"]
+    model_provider = metadata["model_provider"]
+    batch_size = metadata.get("llm_batch_size") or 1
+    decisive_thresholds = metadata.get("decisive_thresholds")
+
+    outputs = {}
+    if decisive_thresholds:
+        for ticker in tickers:
+            signal = create_decisive_signal(analysis_data[ticker], pydantic_model, decisive_thresholds)
+            if signal is not None:
+                outputs[ticker] = signal
+                progress.update_status(agent_name, ticker, "Done (rule-based)")
+
+    pending = [ticker for ticker in tickers if ticker not in outputs]
+    if batch_size > 1:
+        batch_model = get_batch_model(pydantic_model)
+        batch_template = ChatPromptTemplate.from_messages([prompt_template.messages[0], ("human", BATCH_PROMPT)])
+
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+            for ticker in batch:
+                progress.update_status(agent_name, ticker, f"{status} (batch of {len(batch)})")
+
+            prompt = batch_template.invoke({
+                "tickers": ", ".join(batch),
+                "analysis_data": encode_batch_analysis_data(analysis_data, batch),
+            })
+
+            # A failed batch yields no signals so every ticker in it falls back to its own call
+            result = call_llm(
+                prompt=prompt,
+                model_name=model_name,
+                model_provider=model_provider,
+                pydantic_model=batch_model,
+                agent_name=agent_name,
+                max_retries=1,
+                default_factory=lambda: batch_model(signals={}),
+                ticker=",".join(batch),
+            )
+            for ticker in batch:
+                if ticker in result.signals:
+                    outputs[ticker] = result.signals[ticker]
+                    progress.update_status(agent_name, ticker, "Done")
+
+    for ticker in pending:
+        if ticker in outputs:
+            continue
+
+        progress.update_status(agent_name, ticker, status)
+        outputs[ticker] = generate_output(
+            ticker=ticker,
+            analysis_data=analysis_data[ticker],
+            model_name=model_name,
+            model_provider=model_provider,
+        )
+        progress.update_status(agent_name, ticker, "Done")
+
+    return {ticker: outputs[ticker] for ticker in tickers}
+
+
+def create_decisive_signal(
+    analysis: dict[str, Any],
+    pydantic_model: Type[T],
+    thresholds: tuple[float, float],
+) -> Optional[T]:
+    """
+    Builds a signal without the LLM when an agent's deterministic score is decisive.
+
+    The score ratio (`score / max_score`) must be at or above the bullish threshold, or
+    at or below the bearish threshold, and the agent's own deterministic signal must
+    agree with that direction (e.g. Buffett's margin of safety can veto a high score).
+    Confidence is derived from how far the ratio sits toward the decisive end.
+
+    Returns:
+        A signal with templated reasoning, or None if the case is borderline
+    """
+    score = analysis.get("score")
+    max_score = analysis.get("max_score")
+    if score is None or not max_score:
+        return None
+
+    bearish_threshold, bullish_threshold = thresholds
+    ratio = min(max(score / max_score, 0.0), 1.0)
+    if ratio >= bullish_threshold:
+        signal, confidence, comparison = "bullish", ratio * 100, "at or above"
+        threshold = bullish_threshold
+    elif ratio <= bearish_threshold:
+        signal, confidence, comparison = "bearish", (1 - ratio) * 100, "at or below"
+        threshold = bearish_threshold
+    else:
+        return None
+
+    if analysis.get("signal") != signal:
+        return None
+
+    return pydantic_model(
+        signal=signal,
+        confidence=round(confidence, 1),
+        reasoning=f"Rule-based {signal} signal: deterministic score {score:g}/{max_score:g} ({ratio:.0%}) is {comparison} the decisive threshold of {threshold:.0%}.",
+    )
@@ -0,0 +1,104 @@
+"""Latency SLO controls for LLM calls: per-call timeouts, hedged requests and run deadlines"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from pydantic import BaseModel
+
+
+class LatencyPolicy(BaseModel):
+    """
+    Latency limits applied to every `call_llm` / `acall_llm` made while the policy is active.
+
+    - `timeout`: seconds a single call may take, retries and backoff included, before it falls back
+      to its default response
+    - `hedge_after`: seconds after which a second request is sent to `hedge_model`;
+      whichever response arrives first is used
+    - `deadline`: `time.monotonic()` value after which no new LLM calls are made and
+      agents fall back to their default responses
+    """
+    timeout: Optional[float] = None
+    hedge_after: Optional[float] = None
+    hedge_model: Optional[str] = None
+    hedge_provider: Optional[str] = None
+    deadline: Optional[float] = None
+
+    def remaining(self, call_started: Optional[float] = None) -> Optional[float]:
+        """
+        Seconds left for a call started at `call_started` (a `time.monotonic()` value):
+        the per-call timeout capped by the run deadline. None when neither is set.
+        """
+        now = time.monotonic()
+        limits = []
+        if self.deadline is not None:
+            limits.append(self.deadline - now)
+        if self.timeout is not None and call_started is not None:
+            limits.append(call_started + self.timeout - now)
+        return max(0.0, min(limits)) if limits else None
+
+    def expired(self, call_started: Optional[float] = None) -> bool:
+        """Whether the run deadline (or the call's timeout) has passed."""
+        remaining = self.remaining(call_started)
+        return remaining is not None and remaining <= 0
+
+    def should_hedge(self) -> bool:
+        return self.hedge_model is not None and self.hedge_after is not None
+
+
+_latency_policy: ContextVar[Optional[LatencyPolicy]] = ContextVar("llm_latency_policy", default=None)
+
+
+def get_latency_policy() -> Optional[LatencyPolicy]:
+    """Get the latency policy for the current run, or None if calls are unbounded."""
+    return _latency_policy.get()
+
+
+@contextmanager
+def llm_latency_policy(
+    timeout: Optional[float] = None,
+    hedge_after: Optional[float] = None,
+    hedge_model: Optional[str] = None,
+    run_timeout: Optional[float] = None,
+) -> Iterator[Optional[LatencyPolicy]]:
+    """
+    Applies a latency policy to the LLM calls made inside the block.
+
+    The policy is held in a context variable, so concurrent runs (e.g. API requests)
+    each keep their own deadline. With no limits given, calls are left unbounded.
+
+    Args:
+        timeout: Seconds each LLM call may take, retries and backoff included, before it
+            falls back to its default response
+        hedge_after: Seconds to wait before hedging to the backup model
+        hedge_model: Backup model name from AVAILABLE_MODELS
+        run_timeout: Seconds from now until the run deadline
+    """
+    if timeout is None and hedge_model is None and run_timeout is None:
+        yield None
+        return
+
+    hedge_provider = None
+    if hedge_model is not None:
+        from llm.models import get_model_info
+
+        model_info = get_model_info(hedge_model)
+        if model_info is None:
+            raise ValueError(f"Unknown hedge model: {hedge_model}")
+        hedge_provider = model_info.provider.value
+        if hedge_after is None:
+            hedge_after = timeout / 2 if timeout else 10.0
+
+    policy = LatencyPolicy(
+        timeout=timeout,
+        hedge_after=hedge_after,
+        hedge_model=hedge_model,
+        hedge_provider=hedge_provider,
+        deadline=time.monotonic() + run_timeout if run_timeout is not None else None,
+    )
+    token = _latency_policy.set(policy)
+    try:
+        yield policy
+    finally:
+        _latency_policy.reset(token)
@@ -0,0 +1,163 @@
+"""Per-call latency and token instrumentation for LLM calls"""
+
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Optional
+
+from colorama import Fore, Style
+from pydantic import BaseModel
+from tabulate import tabulate
+
+
+class LLMCallRecord(BaseModel):
+    """Structured record of a single call_llm / acall_llm invocation."""
+    agent_name: Optional[str]
+    ticker: Optional[str]
+    model_name: str
+    model_provider: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    latency: float = 0.0  # seconds, including retries and backoff
+    retries: int = 0
+    used_default: bool = False
+    cache_hit: bool = False
+    hedged: bool = False  # answered by the hedge model rather than the requested one
+    timed_out: bool = False  # fell back to the default because the call's timeout or the run deadline ran out
+    started_at: float
+
+
+class LLMCall:
+    """Accumulates usage for one in-flight LLM call and records it when finished."""
+
+    def __init__(self, collector: "LLMMetrics", agent_name: Optional[str], ticker: Optional[str], model_name: str, model_provider: str):
+        self.collector = collector
+        self.agent_name = agent_name
+        self.ticker = ticker
+        self.model_name = model_name
+        self.model_provider = str(getattr(model_provider, "value", model_provider))
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.hedged = False
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+
+    def add_usage(self, message: Any):
+        """Add the token usage reported on a raw LLM message (if the provider reports it)."""
+        usage = getattr(message, "usage_metadata", None)
+        if usage:
+            self.prompt_tokens += usage.get("input_tokens", 0) or 0
+            self.completion_tokens += usage.get("output_tokens", 0) or 0
+            return
+
+        token_usage = (getattr(message, "response_metadata", None) or {}).get("token_usage") or {}
+        self.prompt_tokens += token_usage.get("prompt_tokens", 0) or 0
+        self.completion_tokens += token_usage.get("completion_tokens", 0) or 0
+
+    def finish(self, result: Any, retries: int = 0, used_default: bool = False, cache_hit: bool = False, timed_out: bool = False) -> Any:
+        """Record the call and pass `result` through, so callers can `return call.finish(result)`."""
+        self.collector.record(
+            LLMCallRecord(
+                agent_name=self.agent_name,
+                ticker=self.ticker,
+                model_name=self.model_name,
+                model_provider=self.model_provider,
+                prompt_tokens=self.prompt_tokens,
+                completion_tokens=self.completion_tokens,
+                latency=time.perf_counter() - self._start,
+                retries=retries,
+                used_default=used_default,
+                cache_hit=cache_hit,
+                hedged=self.hedged,
+                timed_out=timed_out,
+                started_at=self.started_at,
+            )
+        )
+        return result
+
+
+class LLMMetrics:
+    """Thread-safe in-memory collector of LLM call records."""
+
+    def __init__(self):
+        self._records: list[LLMCallRecord] = []
+        self._lock = threading.Lock()
+
+    def start_call(self, agent_name: Optional[str], ticker: Optional[str], model_name: str, model_provider: str) -> LLMCall:
+        """Begin tracking a call; finish it with `LLMCall.finish`."""
+        return LLMCall(self, agent_name, ticker, model_name, model_provider)
+
+    def record(self, record: LLMCallRecord):
+        """Add a finished call record."""
+        with self._lock:
+            self._records.append(record)
+
+    def records(self) -> list[LLMCallRecord]:
+        """Get a snapshot of all records collected so far."""
+        with self._lock:
+            return list(self._records)
+
+    def clear(self):
+        """Drop all collected records."""
+        with self._lock:
+            self._records.clear()
+
+    def export_jsonl(self, path: str) -> int:
+        """Write one JSON object per call to `path`. Returns the number of records written."""
+        records = self.records()
+        with open(path, "w") as f:
+            for record in records:
+                f.write(record.model_dump_json() + "\n")
+        return len(records)
+
+    def summarize(self) -> list[dict[str, Any]]:
+        """Aggregate records per agent, sorted by total latency (highest first)."""
+        totals = defaultdict(lambda: {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "latency": 0.0, "max_latency": 0.0, "retries": 0, "defaults": 0, "cache_hits": 0})
+        for record in self.records():
+            agent = totals[record.agent_name or "unknown"]
+            agent["calls"] += 1
+            agent["prompt_tokens"] += record.prompt_tokens
+            agent["completion_tokens"] += record.completion_tokens
+            agent["latency"] += record.latency
+            agent["max_latency"] = max(agent["max_latency"], record.latency)
+            agent["retries"] += record.retries
+            agent["defaults"] += int(record.used_default)
+            agent["cache_hits"] += int(record.cache_hit)
+
+        rows = [{"agent_name": name, **values} for name, values in totals.items()]
+        return sorted(rows, key=lambda row: row["latency"], reverse=True)
+
+    def print_summary(self):
+        """Print a per-agent table of LLM calls, tokens and latency."""
+        rows = self.summarize()
+        if not rows:
+            return
+
+        table = [
+            [
+                f"{Fore.CYAN}{row['agent_name'].replace('_agent', '').replace('_', ' ').title()}{Style.RESET_ALL}",
+                row["calls"],
+                f"{row['prompt_tokens']:,}",
+                f"{row['completion_tokens']:,}",
+                f"{row['latency']:.1f}s",
+                f"{row['latency'] / row['calls']:.2f}s",
+                f"{row['max_latency']:.2f}s",
+                row["retries"],
+                row["defaults"],
+                row["cache_hits"],
+            ]
+            for row in rows
+        ]
+        print(f"\n{Fore.WHITE}{Style.BRIGHT}LLM USAGE SUMMARY:{Style.RESET_ALL}")
+        print(
+            tabulate(
+                table,
+                headers=["Agent", "Calls", "Prompt Tokens", "Completion Tokens", "Total Latency", "Avg Latency", "Max Latency", "Retries", "Defaults", "Cache Hits"],
+                tablefmt="grid",
+                colalign=("left", "right", "right", "right", "right", "right", "right", "right", "right", "right"),
+            )
+        )
+
+
+# Create a global instance
+llm_metrics = LLMMetrics()
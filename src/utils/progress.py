@@ -3,49 +3,168 @@ from rich.live import Live
 from rich.table import Table
 from rich.style import Style
 from rich.text import Text
-from typing import Dict, Optional
+from typing import Callable, Dict, Optional
 from datetime import datetime
+from pydantic import BaseModel
+import os
+import queue
+import threading
 
 console = Console()
 
 
+class ProgressEvent(BaseModel):
+    """A single agent status change, as delivered to progress subscribers."""
+    agent_name: str
+    ticker: Optional[str] = None
+    status: str
+    timestamp: datetime
+
+
 class AgentProgress:
-    """Manages progress tracking for multiple agents."""
+    """
+    Manages progress tracking for multiple agents.
 
-    def __init__(self):
+    Status updates only record state and notify subscribers, so they are cheap and safe
+    to call from any agent thread. In "live" mode a rich display redraws the table at
+    most `refresh_per_second` times a second, coalescing all updates in between. In
+    "headless" mode nothing is rendered. The default "auto" mode renders only when the
+    console is a terminal; set HEDGE_FUND_PROGRESS=live|headless to override it.
+    """
+
+    def __init__(self, mode: Optional[str] = None, refresh_per_second: float = 4):
         self.agent_status: Dict[str, Dict[str, str]] = {}
-        self.table = Table(show_header=False, box=None, padding=(0, 1))
-        self.live = Live(self.table, console=console, refresh_per_second=4)
         self.started = False
+        self._active_runs = 0
+        self._lock = threading.Lock()
+        self._subscribers: list[Callable[[ProgressEvent], None]] = []
+        self._table: Optional[Table] = None
+        self.live: Optional[Live] = None
+        self.configure(mode or os.getenv("HEDGE_FUND_PROGRESS", "auto"), refresh_per_second)
+
+    def configure(self, mode: str = "auto", refresh_per_second: float = 4):
+        """Set the display mode ("auto", "live" or "headless") and the live refresh rate."""
+        if mode not in ("auto", "live", "headless"):
+            raise ValueError(f"Unknown progress mode: {mode}")
+        if self.started:
+            self._active_runs = 1
+            self.stop()
+        self.mode = mode
+        self.refresh_per_second = refresh_per_second
+
+    @property
+    def headless(self) -> bool:
+        if self.mode == "auto":
+            return not console.is_terminal
+        return self.mode == "headless"
 
     def start(self):
-        """Start the progress display."""
-        if not self.started:
-            self.live.start()
+        """Start the progress display. Concurrent runs share it; it stays up until the last one stops."""
+        with self._lock:
+            self._active_runs += 1
+            if self.started:
+                return
             self.started = True
+        if not self.headless:
+            self.live = Live(console=console, refresh_per_second=self.refresh_per_second, get_renderable=self._render)
+            self.live.start()
 
     def stop(self):
-        """Stop the progress display."""
-        if self.started:
-            self.live.stop()
+        """Stop the progress display once every run that started it has stopped."""
+        with self._lock:
+            self._active_runs = max(self._active_runs - 1, 0)
+            if not self.started or self._active_runs > 0:
+                return
             self.started = False
+        if self.live is not None:
+            # Stopping draws the final state once more
+            self.live.stop()
+            self.live = None
 
-    def update_status(self, agent_name: str, ticker: Optional[str] = None, status: str = ""):
-        """Update the status of an agent."""
-        if agent_name not in self.agent_status:
-            self.agent_status[agent_name] = {"status": "", "ticker": None}
+    def subscribe(self, callback: Callable[[ProgressEvent], None]) -> Callable[[], None]:
+        """
+        Call `callback` with every status update (from the updating agent's thread).
+
+        Returns a function that removes the subscription.
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+        return lambda: self.unsubscribe(callback)
 
-        if ticker:
-            self.agent_status[agent_name]["ticker"] = ticker
-        if status:
-            self.agent_status[agent_name]["status"] = status
+    def unsubscribe(self, callback: Callable[[ProgressEvent], None]):
+        """Remove a subscription; unknown callbacks are ignored."""
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
 
-        self._refresh_display()
+    def subscribe_queue(self, maxsize: int = 1000) -> tuple[queue.Queue, Callable[[], None]]:
+        """
+        Subscribe a queue that receives every event, e.g. for streaming to a web client.
 
-    def _refresh_display(self):
-        """Refresh the progress display."""
-        self.table.columns.clear()
-        self.table.add_column(width=100)
+        Events are dropped rather than blocking agents when a slow consumer lets the
+        queue fill up. Returns the queue and a function that removes the subscription.
+        """
+        events: queue.Queue = queue.Queue(maxsize=maxsize)
+
+        def enqueue(event: ProgressEvent):
+            try:
+                events.put_nowait(event)
+            except queue.Full:
+                pass
+
+        return events, self.subscribe(enqueue)
+
+    def log_to_file(self, path: str) -> Callable[[], None]:
+        """Append every event to `path` as one JSON object per line. Returns a function that stops logging and closes the file."""
+        log_file = open(path, "a")
+        write_lock = threading.Lock()
+
+        def write(event: ProgressEvent):
+            with write_lock:
+                if not log_file.closed:
+                    log_file.write(event.model_dump_json() + "\n")
+                    log_file.flush()
+
+        unsubscribe = self.subscribe(write)
+
+        def close():
+            unsubscribe()
+            with write_lock:
+                log_file.close()
+
+        return close
+
+    def update_status(self, agent_name: str, ticker: Optional[str] = None, status: str = ""):
+        """Update the status of an agent."""
+        with self._lock:
+            if agent_name not in self.agent_status:
+                self.agent_status[agent_name] = {"status": "", "ticker": None}
+
+            if ticker:
+                self.agent_status[agent_name]["ticker"] = ticker
+            if status:
+                self.agent_status[agent_name]["status"] = status
+
+            # The live display rebuilds its table on the next refresh
+            self._table = None
+            subscribers = list(self._subscribers)
+
+        if subscribers:
+            event = ProgressEvent(agent_name=agent_name, ticker=ticker, status=status, timestamp=datetime.now())
+            for callback in subscribers:
+                callback(event)
+
+    def _render(self) -> Table:
+        """Build the status table, reusing the last one if nothing changed since."""
+        with self._lock:
+            if self._table is None:
+                self._table = self._build_table(dict(self.agent_status))
+            return self._table
+
+    def _build_table(self, agent_status: Dict[str, Dict[str, str]]) -> Table:
+        """Build the progress table from a snapshot of agent statuses."""
+        table = Table(show_header=False, box=None, padding=(0, 1))
+        table.add_column(width=100)
 
         # Sort agents with Risk Management and Portfolio Management at the bottom
         def sort_key(item):
@@ -57,12 +176,12 @@ class AgentProgress:
             else:
                 return (1, agent_name)
 
-        for agent_name, info in sorted(self.agent_status.items(), key=sort_key):
+        for agent_name, info in sorted(agent_status.items(), key=sort_key):
             status = info["status"]
             ticker = info["ticker"]
 
             # Create the status text with appropriate styling
-            if status.lower() == "done":
+            if status.lower().startswith("done"):
                 style = Style(color="green", bold=True)
                 symbol = "✓"
             elif status.lower() == "error":
@@ -81,7 +200,9 @@ class AgentProgress:
                 status_text.append(f"[{ticker}] ", style=Style(color="cyan"))
             status_text.append(status, style=style)
 
-            self.table.add_row(status_text)
+            table.add_row(status_text)
+
+        return table
 
 
 # Create a global instance
@@ -0,0 +1,94 @@
+"""Compact encoding of analysis payloads for LLM prompts"""
+
+import json
+import math
+from typing import Any
+
+# Decimal places kept for floats in prompt payloads
+DEFAULT_PRECISION = 3
+
+# Rough upper bound on the tokens one ticker's analysis may take up in a prompt
+DEFAULT_TOKEN_BUDGET = 1500
+
+# Progressively shorter limits applied to strings when a payload is over budget
+STRING_LIMITS = (240, 120, 60)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (about 4 characters per token for English and JSON)."""
+    return len(text) // 4 + 1
+
+
+def round_numbers(value: Any, precision: int = DEFAULT_PRECISION) -> Any:
+    """Recursively round floats to `precision` decimals, mapping NaN/inf to None."""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, float):
+        if math.isnan(value) or math.isinf(value):
+            return None
+        rounded = round(value, precision)
+        return int(rounded) if rounded.is_integer() and abs(rounded) < 1e15 else rounded
+    if isinstance(value, dict):
+        return {key: round_numbers(item, precision) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [round_numbers(item, precision) for item in value]
+    return value
+
+
+def truncate_strings(value: Any, limit: int | None) -> Any:
+    """Recursively shorten strings to at most `limit` characters; `None` drops non-essential strings."""
+    if isinstance(value, str):
+        if limit is None:
+            return None
+        return value if len(value) <= limit else value[: limit - 3] + "..."
+    if isinstance(value, dict):
+        truncated = {}
+        for key, item in value.items():
+            # The deterministic signal is always kept
+            item = item if key == "signal" else truncate_strings(item, limit)
+            if item is not None:
+                truncated[key] = item
+        return truncated
+    if isinstance(value, (list, tuple)):
+        return [truncate_strings(item, limit) for item in value if not (limit is None and isinstance(item, str))]
+    return value
+
+
+def compact_json(value: Any) -> str:
+    """Serialize without pretty-printing whitespace."""
+    return json.dumps(value, separators=(",", ":"), default=str)
+
+
+def encode_analysis_data(
+    analysis_data: dict[str, Any],
+    precision: int = DEFAULT_PRECISION,
+    token_budget: int | None = DEFAULT_TOKEN_BUDGET,
+) -> str:
+    """
+    Encodes a ticker's analysis data compactly for a persona prompt.
+
+    Numbers are rounded to `precision` decimals and the JSON is emitted without
+    indentation. If the result is still larger than `token_budget`, detail strings
+    are shortened step by step and finally dropped, leaving scores and the signal.
+    """
+    payload = round_numbers(analysis_data, precision)
+    encoded = compact_json(payload)
+    if token_budget is None or estimate_tokens(encoded) <= token_budget:
+        return encoded
+
+    for limit in (*STRING_LIMITS, None):
+        encoded = compact_json(truncate_strings(payload, limit))
+        if estimate_tokens(encoded) <= token_budget:
+            break
+    return encoded
+
+
+def encode_batch_analysis_data(
+    analysis_data: dict[str, dict[str, Any]],
+    tickers: list[str],
+    precision: int = DEFAULT_PRECISION,
+    token_budget: int | None = DEFAULT_TOKEN_BUDGET,
+) -> str:
+    """Encodes several tickers' analysis data as one JSON object, applying the token budget per ticker."""
+    entries = [f"{json.dumps(ticker)}:{encode_analysis_data(analysis_data[ticker], precision, token_budget)}" for ticker in tickers]
+    return "{" + ",".join(entries) + "}"
@@ -0,0 +1,128 @@
+"""Rebalance schedules: on which trading days the agents run"""
+
+from datetime import timedelta
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+from pandas.tseries.holiday import (
+    AbstractHolidayCalendar,
+    GoodFriday,
+    Holiday,
+    USLaborDay,
+    USMartinLutherKingJr,
+    USMemorialDay,
+    USPresidentsDay,
+    USThanksgivingDay,
+    nearest_workday,
+    sunday_to_monday,
+)
+from pandas.tseries.offsets import CustomBusinessDay
+
+REBALANCE_FREQUENCIES = ("daily", "weekly", "monthly", "filings")
+
+
+class USMarketHolidayCalendar(AbstractHolidayCalendar):
+    """The regular full-day closures of the US stock exchanges (one-off closures are not included)."""
+    rules = [
+        # The exchanges stay open on Friday when New Year's Day falls on a Saturday
+        Holiday("New Year's Day", month=1, day=1, observance=sunday_to_monday),
+        USMartinLutherKingJr,
+        USPresidentsDay,
+        GoodFriday,
+        USMemorialDay,
+        Holiday("Juneteenth", month=6, day=19, start_date="2022-01-01", observance=nearest_workday),
+        Holiday("Independence Day", month=7, day=4, observance=nearest_workday),
+        USLaborDay,
+        USThanksgivingDay,
+        Holiday("Christmas Day", month=12, day=25, observance=nearest_workday),
+    ]
+
+
+US_TRADING_DAY = CustomBusinessDay(calendar=USMarketHolidayCalendar())
+
+
+def rebalance_mask(dates: pd.DatetimeIndex, frequency: str = "daily", filing_dates: Iterable[str] = (), include_first: bool = True) -> np.ndarray:
+    """
+    Flag the trading days on which the agents should run.
+
+    - "daily": every day
+    - "weekly": the first trading day of each week
+    - "monthly": the first trading day of each month
+    - "filings": the first trading day on or after each filing date, i.e. when new
+      fundamentals become visible to the agents
+
+    The first day is always flagged when `include_first` is set, so a backtest opens
+    its positions right away.
+    """
+    if frequency not in REBALANCE_FREQUENCIES:
+        raise ValueError(f"Unknown rebalance frequency: {frequency}")
+
+    mask = np.zeros(len(dates), dtype=bool)
+    if len(dates) == 0:
+        return mask
+
+    if frequency == "daily":
+        mask[:] = True
+    elif frequency == "weekly":
+        # ISO (year, week) pairs; a new pair starts a new week
+        weeks = dates.isocalendar()
+        period = (weeks["year"].to_numpy() * 100 + weeks["week"].to_numpy()).astype(np.int64)
+        mask[1:] = period[1:] != period[:-1]
+    elif frequency == "monthly":
+        period = dates.year * 100 + dates.month
+        mask[1:] = np.asarray(period[1:] != period[:-1])
+    else:
+        day_strs = dates.strftime("%Y-%m-%d").to_numpy(dtype=str)
+        filings = np.unique(np.array([date for date in filing_dates if date], dtype=str))
+        # Trigger on the first trading day on or after each filing (after the previous trading day)
+        previous_day_strs = np.concatenate((["0000-00-00"], day_strs[:-1]))
+        mask = np.searchsorted(filings, day_strs, side="right") > np.searchsorted(filings, previous_day_strs, side="right")
+
+    if include_first:
+        mask[0] = True
+    return mask
+
+
+def filing_limit(start_date: str, end_date: str, minimum: int = 10) -> int:
+    """
+    How many financial metrics to fetch per ticker so their report periods cover the window:
+    one per quarter, plus the last period before `start_date`.
+    """
+    days = (pd.Timestamp(end_date) - pd.Timestamp(start_date)).days
+    return max(minimum, days // 91 + 2)
+
+
+def filing_dates(tickers: list[str], end_date: str, start_date: str | None = None) -> list[str]:
+    """
+    The report periods of the tickers' financial metrics up to `end_date`, going back to
+    `start_date` if given (served from the cache after a pre-fetch).
+    """
+    from tools.api import get_financial_metrics
+
+    limit = filing_limit(start_date, end_date) if start_date else 10
+    dates = set()
+    for ticker in tickers:
+        try:
+            dates.update(metric.report_period for metric in get_financial_metrics(ticker, end_date, limit=limit))
+        except Exception as e:
+            print(f"Error fetching financial metrics for {ticker}: {e}")
+    return sorted(dates)
+
+
+def is_rebalance_day(date: str, frequency: str, tickers: list[str] = ()) -> bool:
+    """
+    Whether the agents should run on `date` under a schedule, for production runs started
+    every business day (e.g. by cron). Weekends and market holidays are never rebalance days.
+
+    The schedule is evaluated over the US market's trading days, as the backtester does over
+    the dates it has prices for, so a week or month starting on a holiday rebalances on its
+    first trading day.
+    """
+    day = pd.Timestamp(date)
+    if not US_TRADING_DAY.is_on_offset(day):
+        return False
+    # Enough trading days back to see the start of the current week or month
+    dates = pd.date_range(day - timedelta(days=31), day, freq=US_TRADING_DAY)
+    filings = filing_dates(list(tickers), date) if frequency == "filings" else ()
+    return bool(rebalance_mask(dates, frequency, filings, include_first=False)[-1])
@@ -0,0 +1,256 @@
+"""Lightweight span tracing for graph nodes, data fetches and LLM calls"""
+
+import functools
+import inspect
+import itertools
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, Optional
+
+from colorama import Fore, Style
+from pydantic import BaseModel
+from tabulate import tabulate
+
+
+class SpanRecord(BaseModel):
+    """A finished span. Times are in seconds; `start` is relative to when tracing was enabled."""
+    span_id: int
+    parent_id: Optional[int]
+    name: str
+    category: str
+    ticker: Optional[str]
+    start: float
+    wall_time: float
+    cpu_time: float  # CPU time of the span's own thread
+    thread_id: int
+    args: dict[str, Any] = {}
+
+
+class Tracer:
+    """
+    Collects nested spans across threads and async tasks.
+
+    The current span is kept in a context variable, so spans opened inside LangGraph
+    nodes (which run with a copy of the caller's context) nest under the run's span.
+    When tracing is disabled, `span` does no work beyond a single flag check.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._spans: list[SpanRecord] = []
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._origin = time.perf_counter()
+        self._current: ContextVar[Optional[int]] = ContextVar("trace_span", default=None)
+
+    def enable(self):
+        """Start collecting spans (clearing any collected before)."""
+        self.clear()
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def clear(self):
+        with self._lock:
+            self._spans.clear()
+        self._origin = time.perf_counter()
+
+    @contextmanager
+    def span(self, name: str, category: str = "function", ticker: Optional[str] = None, **args) -> Iterator[None]:
+        """Time the enclosed block as a span nested under the current one."""
+        if not self.enabled:
+            yield
+            return
+
+        span_id = next(self._ids)
+        parent_id = self._current.get()
+        token = self._current.set(span_id)
+        start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            yield
+        finally:
+            wall_time = time.perf_counter() - start
+            cpu_time = time.thread_time() - cpu_start
+            self._current.reset(token)
+            record = SpanRecord(
+                span_id=span_id,
+                parent_id=parent_id,
+                name=name,
+                category=category,
+                ticker=ticker,
+                start=start - self._origin,
+                wall_time=wall_time,
+                cpu_time=cpu_time,
+                thread_id=threading.get_ident(),
+                args=args,
+            )
+            with self._lock:
+                self._spans.append(record)
+
+    def spans(self) -> list[SpanRecord]:
+        """Get a snapshot of the finished spans, ordered by start time."""
+        with self._lock:
+            return sorted(self._spans, key=lambda span: span.start)
+
+    def export_chrome_trace(self, path: str) -> int:
+        """
+        Write the spans in Chrome trace event format (open in chrome://tracing or Perfetto).
+
+        Returns the number of spans written.
+        """
+        spans = self.spans()
+        events = [
+            {
+                "name": span.name if span.ticker is None else f"{span.name} [{span.ticker}]",
+                "cat": span.category,
+                "ph": "X",
+                "ts": round(span.start * 1e6, 3),
+                "dur": round(span.wall_time * 1e6, 3),
+                "pid": os.getpid(),
+                "tid": span.thread_id,
+                "args": {"ticker": span.ticker, "cpu_ms": round(span.cpu_time * 1000, 3), "span_id": span.span_id, "parent_id": span.parent_id, **span.args},
+            }
+            for span in spans
+        ]
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, default=str)
+        return len(events)
+
+    def summarize(self) -> list[dict[str, Any]]:
+        """Aggregate spans per (category, name), sorted by total wall time (highest first)."""
+        totals = defaultdict(lambda: {"count": 0, "wall_time": 0.0, "max_wall_time": 0.0, "cpu_time": 0.0})
+        for span in self.spans():
+            row = totals[(span.category, span.name)]
+            row["count"] += 1
+            row["wall_time"] += span.wall_time
+            row["max_wall_time"] = max(row["max_wall_time"], span.wall_time)
+            row["cpu_time"] += span.cpu_time
+
+        rows = [{"category": category, "name": name, **values} for (category, name), values in totals.items()]
+        return sorted(rows, key=lambda row: row["wall_time"], reverse=True)
+
+    def critical_path(self) -> list[SpanRecord]:
+        """
+        The chain of spans that determined the longest run's duration.
+
+        Starting from the child of the longest root span that finished last, walk back
+        through the siblings: each step is the one that finished last before the next
+        started. For a fanned-out graph this names the slowest analyst, followed by the
+        risk and portfolio nodes that waited on it.
+        """
+        spans = self.spans()
+        children = defaultdict(list)
+        for span in spans:
+            children[span.parent_id].append(span)
+        if not children[None]:
+            return []
+
+        root = max(children[None], key=lambda s: s.wall_time)
+        siblings = children[root.span_id]
+        path = [root]
+        chain = []
+        remaining = siblings
+        while remaining:
+            step = max(remaining, key=lambda s: s.start + s.wall_time)
+            chain.append(step)
+            remaining = [s for s in siblings if s.start + s.wall_time <= step.start]
+        return path + chain[::-1]
+
+    def print_summary(self):
+        """Print a per-span table of wall and CPU time, followed by the critical path."""
+        rows = self.summarize()
+        if not rows:
+            return
+
+        table = [
+            [
+                row["category"],
+                f"{Fore.CYAN}{row['name']}{Style.RESET_ALL}",
+                row["count"],
+                f"{row['wall_time']:.2f}s",
+                f"{row['wall_time'] / row['count'] * 1000:.1f}ms",
+                f"{row['max_wall_time'] * 1000:.1f}ms",
+                f"{row['cpu_time']:.2f}s",
+            ]
+            for row in rows
+        ]
+        print(f"\n{Fore.WHITE}{Style.BRIGHT}PROFILE SUMMARY:{Style.RESET_ALL}")
+        print(
+            tabulate(
+                table,
+                headers=["Category", "Span", "Count", "Total Wall", "Avg Wall", "Max Wall", "Total CPU"],
+                tablefmt="grid",
+                colalign=("left", "left", "right", "right", "right", "right", "right"),
+            )
+        )
+
+        path = self.critical_path()
+        if path:
+            root, steps = path[0], [f"{span.name}{f' [{span.ticker}]' if span.ticker else ''} ({span.wall_time:.2f}s)" for span in path[1:]]
+            print(f"{Fore.WHITE}{Style.BRIGHT}Critical path of {root.name} ({root.wall_time:.2f}s):{Style.RESET_ALL} {' -> '.join(steps)}")
+
+
+def traced(name: Optional[str] = None, category: str = "function", arg_names: tuple[str, ...] = ()) -> Callable:
+    """
+    Decorator that records each call of a function (sync or async) as a span.
+
+    If the function takes a `ticker` argument, its value is recorded on the span, as
+    are any keyword arguments listed in `arg_names`.
+    """
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__name__
+        parameters = list(inspect.signature(func).parameters)
+        ticker_index = parameters.index("ticker") if "ticker" in parameters else None
+
+        def span_for(args, kwargs):
+            if "ticker" in kwargs:
+                ticker = kwargs["ticker"]
+            elif ticker_index is not None and ticker_index < len(args):
+                ticker = args[ticker_index]
+            else:
+                ticker = None
+            return tracer.span(span_name, category, ticker=ticker, **{arg: kwargs[arg] for arg in arg_names if arg in kwargs})
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if not tracer.enabled:
+                    return await func(*args, **kwargs)
+                with span_for(args, kwargs):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+            with span_for(args, kwargs):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def trace_node(node_name: str, node_func: Callable) -> Callable:
+    """Wrap a graph node function so each invocation is recorded as a "node" span."""
+    @functools.wraps(node_func)
+    def wrapper(state):
+        if not tracer.enabled:
+            return node_func(state)
+        with tracer.span(node_name, "node"):
+            return node_func(state)
+
+    return wrapper
+
+
+# Create a global instance
+tracer = Tracer()